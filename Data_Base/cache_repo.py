@@ -1,6 +1,25 @@
 from datetime import datetime, timedelta
 
-from Data_Base.db import get_cache_collection
+from Data_Base.db import get_async_cache_collection, get_cache_collection
+
+
+def _entry_update(
+    namespace: str,
+    request_fingerprint: dict,
+    response: dict,
+    ttl_seconds: int,
+) -> dict:
+    now = datetime.utcnow()
+    return {
+        "$set": {
+            "namespace": namespace,
+            "request_fingerprint": request_fingerprint,
+            "response": response,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=ttl_seconds),
+        },
+        "$setOnInsert": {"hit_count": 0},
+    }
 
 
 def get_cache_entry(cache_key: str) -> dict | None:
@@ -22,18 +41,32 @@ def upsert_cache_entry(
     response: dict,
     ttl_seconds: int,
 ) -> None:
-    now = datetime.utcnow()
     get_cache_collection().update_one(
         {"cache_key": cache_key},
-        {
-            "$set": {
-                "namespace": namespace,
-                "request_fingerprint": request_fingerprint,
-                "response": response,
-                "created_at": now,
-                "expires_at": now + timedelta(seconds=ttl_seconds),
-            },
-            "$setOnInsert": {"hit_count": 0},
-        },
+        _entry_update(namespace, request_fingerprint, response, ttl_seconds),
+        upsert=True,
+    )
+
+
+async def get_cache_entry_async(cache_key: str) -> dict | None:
+    collection = get_async_cache_collection()
+    document = await collection.find_one_and_update(
+        {"cache_key": cache_key, "expires_at": {"$gt": datetime.utcnow()}},
+        {"$inc": {"hit_count": 1}},
+        projection={"_id": 0},
+    )
+    return document
+
+
+async def upsert_cache_entry_async(
+    cache_key: str,
+    namespace: str,
+    request_fingerprint: dict,
+    response: dict,
+    ttl_seconds: int,
+) -> None:
+    await get_async_cache_collection().update_one(
+        {"cache_key": cache_key},
+        _entry_update(namespace, request_fingerprint, response, ttl_seconds),
         upsert=True,
     )
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+from pymongo import ReturnDocument
+
+from Data_Base.db import get_catalog_meta_collection
+
+_CATALOG_ID = "products"
+
+# how long a process trusts its last read of the catalog version
+VERSION_POLL_SECONDS = float(os.getenv("CATALOG_VERSION_POLL_SECONDS", "2"))
+
+_VERSION_LOCK = threading.Lock()
+_cached_version = None
+_checked_at = 0.0
+
+
+def _remember_version(version: int) -> None:
+    global _cached_version, _checked_at
+
+    with _VERSION_LOCK:
+        _cached_version = version
+        _checked_at = time.monotonic()
+
+
+def get_catalog_version() -> int:
+    document = get_catalog_meta_collection().find_one({"_id": _CATALOG_ID}, {"version": 1})
+    version = int(document.get("version", 0)) if document else 0
+
+    _remember_version(version)
+
+    return version
+
+
+def current_catalog_version(max_age: float = VERSION_POLL_SECONDS) -> int:
+    """
+    Catalog version read at most once per max_age seconds per process.
+
+    Writes from this process are seen immediately; writes from other
+    processes (e.g. a scraper run) within max_age.
+    """
+    with _VERSION_LOCK:
+        if _cached_version is not None and time.monotonic() - _checked_at < max_age:
+            return _cached_version
+
+    return get_catalog_version()
+
+
+def bump_catalog_version() -> int:
+    document = get_catalog_meta_collection().find_one_and_update(
+        {"_id": _CATALOG_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    version = int(document["version"])
+
+    _remember_version(version)
+
+    return version
@@ -2,7 +2,8 @@
 
 from typing import Optional
 
-from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient, MongoClient
+from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.collection import Collection
 from pymongo.errors import OperationFailure
 
@@ -18,8 +19,18 @@ _CACHE_COLLECTION: Optional[Collection] = None
 _FEEDBACK_COLLECTION: Optional[Collection] = None
 _SEARCH_SESSIONS_COLLECTION: Optional[Collection] = None
 _SEARCH_HISTORY_COLLECTION: Optional[Collection] = None
+_CATALOG_META_COLLECTION: Optional[Collection] = None
 _INDEX_READY = False
 
+# collection names shared by the sync and async getters
+USERS_COLLECTION_NAME = "users"
+SESSIONS_COLLECTION_NAME = "sessions"
+MESSAGES_COLLECTION_NAME = "messages"
+CACHE_COLLECTION_NAME = "api_cache"
+
+# async handlers use a separate client; it binds to the server's event loop
+_ASYNC_CLIENT: Optional[AsyncMongoClient] = None
+
 
 def _create_client() -> MongoClient:
     return MongoClient(get_mongo_uri(), serverSelectionTimeoutMS=5000)
@@ -34,6 +45,35 @@ def _get_client() -> MongoClient:
     return _CLIENT
 
 
+def _get_async_client() -> AsyncMongoClient:
+    global _ASYNC_CLIENT
+
+    if _ASYNC_CLIENT is None:
+        _ASYNC_CLIENT = AsyncMongoClient(get_mongo_uri(), serverSelectionTimeoutMS=5000)
+
+    return _ASYNC_CLIENT
+
+
+def _get_async_collection(name: str) -> AsyncCollection:
+    return _get_async_client()[DB_NAME][name]
+
+
+def get_async_users_collection() -> AsyncCollection:
+    return _get_async_collection(USERS_COLLECTION_NAME)
+
+
+def get_async_sessions_collection() -> AsyncCollection:
+    return _get_async_collection(SESSIONS_COLLECTION_NAME)
+
+
+def get_async_messages_collection() -> AsyncCollection:
+    return _get_async_collection(MESSAGES_COLLECTION_NAME)
+
+
+def get_async_cache_collection() -> AsyncCollection:
+    return _get_async_collection(CACHE_COLLECTION_NAME)
+
+
 def _has_unique_link_index(collection: Collection) -> bool:
     for index in collection.list_indexes():
         key_items = list(index.get("key", {}).items())
@@ -73,7 +113,7 @@ def get_users_collection() -> Collection:
     global _USERS_COLLECTION
 
     if _USERS_COLLECTION is None:
-        _USERS_COLLECTION = _get_client()[DB_NAME]["users"]
+        _USERS_COLLECTION = _get_client()[DB_NAME][USERS_COLLECTION_NAME]
 
     return _USERS_COLLECTION
 
@@ -82,7 +122,7 @@ def get_sessions_collection() -> Collection:
     global _SESSIONS_COLLECTION
 
     if _SESSIONS_COLLECTION is None:
-        _SESSIONS_COLLECTION = _get_client()[DB_NAME]["sessions"]
+        _SESSIONS_COLLECTION = _get_client()[DB_NAME][SESSIONS_COLLECTION_NAME]
 
     return _SESSIONS_COLLECTION
 
@@ -91,7 +131,7 @@ def get_messages_collection() -> Collection:
     global _MESSAGES_COLLECTION
 
     if _MESSAGES_COLLECTION is None:
-        _MESSAGES_COLLECTION = _get_client()[DB_NAME]["messages"]
+        _MESSAGES_COLLECTION = _get_client()[DB_NAME][MESSAGES_COLLECTION_NAME]
 
     return _MESSAGES_COLLECTION
 
@@ -100,7 +140,7 @@ def get_cache_collection() -> Collection:
     global _CACHE_COLLECTION
 
     if _CACHE_COLLECTION is None:
-        _CACHE_COLLECTION = _get_client()[DB_NAME]["api_cache"]
+        _CACHE_COLLECTION = _get_client()[DB_NAME][CACHE_COLLECTION_NAME]
 
     return _CACHE_COLLECTION
 
@@ -132,11 +172,59 @@ def get_search_history_collection() -> Collection:
     return _SEARCH_HISTORY_COLLECTION
 
 
+def get_catalog_meta_collection() -> Collection:
+    global _CATALOG_META_COLLECTION
+
+    if _CATALOG_META_COLLECTION is None:
+        _CATALOG_META_COLLECTION = _get_client()[DB_NAME]["catalog_meta"]
+
+    return _CATALOG_META_COLLECTION
+
+
 def product_exists(link: str) -> bool:
     return get_collection().find_one({"product.link": link}, {"_id": 1}) is not None
 
 
+def ensure_product_indexes(collection: Collection) -> None:
+    """
+    Retrieval indexes on the products collection.
+
+    Every retrieval query filters on product.embedding existing, so the
+    retrieval indexes are partial on that predicate: products still waiting for an
+    embedding are not indexed, and the planner can use them for any query
+    that includes the same $exists filter.
+    """
+    embedded = {"product.embedding": {"$exists": True}}
+
+    indexes = [
+        (
+            [("product.product_type", ASCENDING), ("product.price", ASCENDING)],
+            "product_type_price_embedded",
+        ),
+        ([("product.price", ASCENDING)], "product_price_embedded"),
+    ]
+
+    for keys, name in indexes:
+        _create_index(collection, keys, name=name, partialFilterExpression=embedded)
+
+    # ingestion looks up near-duplicate candidates by LSH band key
+    _create_index(
+        collection, [("product.lsh_bands", ASCENDING)], name="product_lsh_bands", sparse=True
+    )
+
+
+def _create_index(collection: Collection, keys, **options) -> None:
+    try:
+        collection.create_index(keys, **options)
+    except OperationFailure as exc:
+        # 85/86: an equivalent index already exists under other options/name
+        if exc.code not in (85, 86):
+            raise
+
+
 def init_collections() -> None:
+    ensure_product_indexes(get_collection())
+
     profiles = get_profile_collection()
     profiles.create_index([("user_id", ASCENDING)], unique=True)
 
@@ -176,7 +264,7 @@ def close_client() -> None:
     global _CLIENT, _COLLECTION, _PROFILE_COLLECTION, _USERS_COLLECTION
     global _SESSIONS_COLLECTION, _MESSAGES_COLLECTION, _CACHE_COLLECTION
     global _FEEDBACK_COLLECTION, _SEARCH_SESSIONS_COLLECTION
-    global _SEARCH_HISTORY_COLLECTION, _INDEX_READY
+    global _SEARCH_HISTORY_COLLECTION, _CATALOG_META_COLLECTION, _INDEX_READY
 
     if _CLIENT is not None:
         _CLIENT.close()
@@ -191,4 +279,14 @@ def close_client() -> None:
     _FEEDBACK_COLLECTION = None
     _SEARCH_SESSIONS_COLLECTION = None
     _SEARCH_HISTORY_COLLECTION = None
+    _CATALOG_META_COLLECTION = None
     _INDEX_READY = False
+
+
+async def close_async_client() -> None:
+    global _ASYNC_CLIENT
+
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.close()
+
+    _ASYNC_CLIENT = None
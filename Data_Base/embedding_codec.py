@@ -0,0 +1,106 @@
+"""Packed binary storage for product embeddings (float16 or int8 + scale)."""
+
+import os
+import struct
+from typing import Any, Iterable
+
+import numpy as np
+from bson.binary import USER_DEFINED_SUBTYPE, Binary
+
+STORAGE_FORMATS = ("float16", "int8")
+STORAGE_FORMAT = os.getenv("EMBEDDING_STORAGE_FORMAT", "float16").strip().lower()
+
+# <codec:uint8><reserved:uint8><dim:uint16><scale:float32>, then the values.
+# 8 bytes keeps the payload aligned for float16 reads.
+_HEADER = struct.Struct("<BBHf")
+_FLOAT16 = 1
+_INT8 = 2
+
+
+def encode_embedding(vector: Any, storage_format: str | None = None) -> Binary:
+    """
+    Pack an embedding into BSON Binary.
+
+    float16 keeps ~3 significant digits; int8 stores round(v / scale) with a
+    per-vector scale, which is plenty for normalized cosine vectors.
+    """
+    storage_format = (storage_format or STORAGE_FORMAT).lower()
+
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown embedding storage format: {storage_format}")
+
+    values = np.asarray(vector, dtype=np.float32).ravel()
+
+    if storage_format == "float16":
+        header = _HEADER.pack(_FLOAT16, 0, len(values), 1.0)
+        payload = values.astype("<f2").tobytes()
+    else:
+        peak = float(np.abs(values).max()) if len(values) else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        quantized = np.clip(np.rint(values / scale), -127, 127).astype(np.int8)
+        header = _HEADER.pack(_INT8, 0, len(values), scale)
+        payload = quantized.tobytes()
+
+    return Binary(header + payload, USER_DEFINED_SUBTYPE)
+
+
+def is_packed(value: Any) -> bool:
+    """Return True for packed Binary (BSON binary decodes to bytes)."""
+    return isinstance(value, (bytes, bytearray, memoryview))
+
+
+def _packed_view(value: bytes) -> tuple[np.ndarray, float]:
+    """
+    Zero-copy view over the stored values, plus the int8 scale.
+    """
+    codec, _, dim, scale = _HEADER.unpack_from(value)
+
+    if codec == _FLOAT16:
+        return np.frombuffer(value, dtype="<f2", count=dim, offset=_HEADER.size), 1.0
+
+    if codec == _INT8:
+        return np.frombuffer(value, dtype=np.int8, count=dim, offset=_HEADER.size), scale
+
+    raise ValueError(f"Unknown embedding codec: {codec}")
+
+
+def decode_embedding(value: Any) -> np.ndarray:
+    """
+    Return a float32 vector from packed Binary or a legacy float array.
+    """
+    if is_packed(value):
+        packed, scale = _packed_view(value)
+        vector = packed.astype(np.float32)
+
+        if scale != 1.0:
+            vector *= scale
+
+        return vector
+
+    return np.asarray(value, dtype=np.float32)
+
+
+def decode_embeddings(values: Iterable[Any]) -> np.ndarray:
+    """
+    Decode many embeddings into one float32 matrix (one copy per row).
+    """
+    values = list(values)
+
+    if not values:
+        return np.empty((0, 0), dtype=np.float32)
+
+    first = decode_embedding(values[0])
+    matrix = np.empty((len(values), len(first)), dtype=np.float32)
+    matrix[0] = first
+
+    for row, value in enumerate(values[1:], start=1):
+        if is_packed(value):
+            packed, scale = _packed_view(value)
+            matrix[row] = packed
+
+            if scale != 1.0:
+                matrix[row] *= scale
+        else:
+            matrix[row] = value
+
+    return matrix
@@ -1,15 +1,30 @@
 """Record ingestion pipeline responsible for validating and upserting product records into MongoDB."""
 
 from datetime import datetime
+import logging
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
 
+from bson.binary import Binary
 from pymongo.errors import PyMongoError
+from agents.recommendation.bm25_index import update_bm25_index
 from agents.recommendation.embedding_model import get_embedding_model
-
+from agents.recommendation.near_duplicates import (
+    ClusterIndex,
+    band_keys,
+    minhash_signature,
+    pack_signature,
+    product_shingles,
+    unpack_signature,
+)
+
+from .catalog_repo import bump_catalog_version
 from .db import get_collection
+from .embedding_codec import encode_embedding
 from tools.product_classifier import classify_product_type
 
+logger = logging.getLogger(__name__)
+
 
 def _is_blank(value: Any) -> bool:
     """Return True when a required value is missing or empty."""
@@ -158,18 +173,119 @@ def _build_product_semantic_text(prepared: Dict[str, Any]) -> str:
     return "\n".join(parts)
 
 
-def _upsert_record(prepared: Dict[str, Any]) -> str:
+def _find_existing(
+    links: List[str], lsh_keys: Iterable[int] = ()
+) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Look up which links are already stored, plus stored products sharing
+    an LSH band with the batch, with one query per batch.
+
+    Returns (existing products by link, near-duplicate candidates).
+    """
+    if not links:
+        return {}, []
+
+    collection = get_collection()
+
+    query = {"product.link": {"$in": links}}
+    lsh_keys = list(lsh_keys)
+
+    if lsh_keys:
+        query = {"$or": [query, {"product.lsh_bands": {"$in": lsh_keys}}]}
+
+    cursor = collection.find(
+        query,
+        {
+            "_id": 0,
+            "product.link": 1,
+            "product.product_type": 1,
+            "product.minhash": 1,
+            "product.cluster_id": 1,
+        },
+    )
+
+    wanted = set(links)
+    existing, neighbours = {}, []
+
+    for doc in cursor:
+        product = doc["product"]
+
+        if product["link"] in wanted:
+            existing[product["link"]] = product
+
+        if product.get("minhash") is not None and product.get("cluster_id") is not None:
+            neighbours.append(product)
+
+    return existing, neighbours
+
+
+def _minhash_signatures(prepared_records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    MinHash signature per link (None when a product has no usable text).
+    """
+    return {
+        prepared["product"]["link"]: minhash_signature(product_shingles(prepared["product"]))
+        for prepared in prepared_records
+    }
+
+
+def _embed_new_products(prepared_records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Embed all new products of a batch in one batched model call.
+    """
+    texts = {}
+
+    for prepared in prepared_records:
+        semantic_text = _build_product_semantic_text(prepared)
+
+        if semantic_text.strip():
+            texts.setdefault(prepared["product"]["link"], semantic_text)
+
+    if not texts:
+        return {}
+
+    model = get_embedding_model()
+    embeddings = model.encode(list(texts.values()))
+
+    return dict(zip(texts.keys(), embeddings))
+
+
+def _assign_clusters(
+    prepared_records: List[Dict[str, Any]],
+    signatures: Dict[str, Any],
+    neighbours: List[Dict[str, Any]],
+) -> None:
+    """
+    Attach MinHash signatures, LSH band keys and near-duplicate cluster ids.
+
+    Batch records are clustered in order against the stored neighbours,
+    so variants within the same run join each other's cluster.
+    """
+    index = ClusterIndex()
+
+    for stored in neighbours:
+        index.add(stored["link"], unpack_signature(stored["minhash"]), stored["cluster_id"])
+
+    for prepared in prepared_records:
+        product = prepared["product"]
+        signature = signatures[product["link"]]
+
+        product["cluster_id"] = index.assign(product["link"], signature)
+
+        if signature is not None:
+            product["minhash"] = Binary(pack_signature(signature))
+            product["lsh_bands"] = band_keys(signature)
+
+
+def _upsert_record(prepared: Dict[str, Any], embedding: Any = None) -> str:
     """
     Upsert one normalized record.
-    If inserted → generate embedding.
-    If updated → do not re-embed (performance optimization).
+    New products carry the embedding computed for their batch;
+    updates do not re-embed (performance optimization).
     """
     collection = get_collection()
     link = prepared["product"]["link"]
 
-    # Check if product already exists
-    existing = collection.find_one({"product.link": link}, {"_id": 1})
-
     update_doc = {
         "$set": {
             "metadata.source": prepared["metadata"]["source"],
@@ -182,21 +298,20 @@ def _upsert_record(prepared: Dict[str, Any]) -> str:
             "product.seller_score": prepared["product"].get("seller_score"),
             "product.category": prepared["product"].get("category"),
             "product.product_type": prepared["product"].get("product_type"),
+            "product.cluster_id": prepared["product"].get("cluster_id"),
         },
         "$setOnInsert": {
             "product.link": link,
         },
     }
 
-    # If new product → generate embedding
-    if existing is None:
-        semantic_text = _build_product_semantic_text(prepared)
-
-        if semantic_text.strip():
-            model = get_embedding_model()
-            embedding = model.encode([semantic_text])[0].tolist()
+    if prepared["product"].get("minhash") is not None:
+        update_doc["$set"]["product.minhash"] = prepared["product"]["minhash"]
+        update_doc["$set"]["product.lsh_bands"] = prepared["product"]["lsh_bands"]
 
-            update_doc["$set"]["product.embedding"] = embedding
+    if embedding is not None:
+        # packed float16/int8 Binary instead of a float64 array
+        update_doc["$set"]["product.embedding"] = encode_embedding(embedding)
 
     result = collection.update_one({"product.link": link}, update_doc, upsert=True)
 
@@ -213,14 +328,77 @@ def ingest_records(records: List[Dict[str, Any]]) -> Dict[str, int]:
 
     summary = {"inserted": 0, "updated": 0, "failed": 0, "error_samples": []}
 
+    def record_failure(exc: Exception) -> None:
+        summary["failed"] += 1
+        if len(summary["error_samples"]) < 3:
+            summary["error_samples"].append(str(exc))
+
+    prepared_records = []
+
     for record in records:
         try:
-            prepared = _validate_and_prepare(record)
-            status = _upsert_record(prepared)
+            prepared_records.append(_validate_and_prepare(record))
+        except (ValueError, TypeError) as exc:
+            record_failure(exc)
+
+    written = []
+    previous_types = {}
+
+    signatures = _minhash_signatures(prepared_records)
+    lsh_keys = {
+        key
+        for signature in signatures.values()
+        if signature is not None
+        for key in band_keys(signature)
+    }
+
+    try:
+        existing, neighbours = _find_existing(
+            [p["product"]["link"] for p in prepared_records], lsh_keys
+        )
+    except PyMongoError as exc:
+        logger.error(f"[Ingestion] Existing product lookup failed: {exc}")
+        for _ in prepared_records:
+            record_failure(exc)
+        prepared_records = []
+        existing, neighbours = {}, []
+
+    _assign_clusters(prepared_records, signatures, neighbours)
+
+    # New products are embedded together; repeats of a link within the
+    # run are embedded once.
+    embeddings = _embed_new_products(
+        [p for p in prepared_records if p["product"]["link"] not in existing]
+    )
+
+    for prepared in prepared_records:
+        link = prepared["product"]["link"]
+
+        try:
+            status = _upsert_record(prepared, embeddings.pop(link, None))
             summary[status] += 1
+            written.append(prepared["product"])
+
+            previous_type = existing.get(link, {}).get("product_type")
+            if previous_type:
+                previous_types[link] = previous_type
+
+            existing.setdefault(link, prepared["product"])
         except (ValueError, TypeError, PyMongoError) as exc:
-            summary["failed"] += 1
-            if len(summary["error_samples"]) < 3:
-                summary["error_samples"].append(str(exc))
+            record_failure(exc)
+
+    # Keep the persisted BM25 shards in sync without a full rebuild.
+    # Index maintenance must never fail an ingestion run.
+    if written:
+        try:
+            update_bm25_index(written, previous_types)
+        except Exception as exc:
+            logger.error(f"[Ingestion] BM25 index update failed: {exc}")
+
+        # Version-keyed indexes (e.g. persisted FAISS) rebuild on next use.
+        try:
+            bump_catalog_version()
+        except PyMongoError as exc:
+            logger.error(f"[Ingestion] Catalog version bump failed: {exc}")
 
     return summary
@@ -1,21 +1,21 @@
 from datetime import datetime
 import uuid
 
-from Data_Base.db import get_messages_collection
-from Data_Base.session_repo import increment_message_counter
+from Data_Base.db import get_async_messages_collection, get_messages_collection
+from Data_Base.session_repo import increment_message_counter, increment_message_counter_async
 
 
-def add_message(
+def _message_document(
     user_id: str,
     session_id: str,
     agent_type: str,
+    sequence: int,
     role: str,
     content: str,
-    payload: object | None = None,
-    metadata: dict | None = None,
+    payload: object | None,
+    metadata: dict | None,
 ) -> dict:
-    sequence = increment_message_counter(user_id, session_id)
-    message = {
+    return {
         "message_id": f"msg_{uuid.uuid4().hex[:10]}",
         "user_id": user_id,
         "session_id": session_id,
@@ -27,6 +27,21 @@ def add_message(
         "metadata": metadata,
         "created_at": datetime.utcnow(),
     }
+
+
+def add_message(
+    user_id: str,
+    session_id: str,
+    agent_type: str,
+    role: str,
+    content: str,
+    payload: object | None = None,
+    metadata: dict | None = None,
+) -> dict:
+    sequence = increment_message_counter(user_id, session_id)
+    message = _message_document(
+        user_id, session_id, agent_type, sequence, role, content, payload, metadata
+    )
     get_messages_collection().insert_one(message)
     return message
 
@@ -60,3 +75,45 @@ def get_all_messages_limited(
     messages = list(collection.find(query, {"_id": 0}).sort("sequence", -1).limit(limit))
     messages.reverse()
     return messages
+
+
+# -----------------------------
+# Async (request path)
+# -----------------------------
+async def add_message_async(
+    user_id: str,
+    session_id: str,
+    agent_type: str,
+    role: str,
+    content: str,
+    payload: object | None = None,
+    metadata: dict | None = None,
+) -> dict:
+    sequence = await increment_message_counter_async(user_id, session_id)
+    message = _message_document(
+        user_id, session_id, agent_type, sequence, role, content, payload, metadata
+    )
+    await get_async_messages_collection().insert_one(message)
+    return message
+
+
+async def get_session_messages_async(
+    user_id: str, session_id: str, limit: int = 12
+) -> list[dict]:
+    return await get_all_messages_limited_async(user_id, session_id, limit=limit)
+
+
+async def get_all_messages_limited_async(
+    user_id: str,
+    session_id: str,
+    limit: int | None = None,
+) -> list[dict]:
+    collection = get_async_messages_collection()
+    query = {"user_id": user_id, "session_id": session_id}
+
+    if limit is None:
+        return await collection.find(query, {"_id": 0}).sort("sequence", 1).to_list()
+
+    messages = await collection.find(query, {"_id": 0}).sort("sequence", -1).limit(limit).to_list()
+    messages.reverse()
+    return messages
@@ -3,18 +3,17 @@ import uuid
 
 from pymongo import DESCENDING, ReturnDocument
 
-from Data_Base.db import get_sessions_collection
+from Data_Base.db import get_async_sessions_collection, get_sessions_collection
 
 
-def create_session(
+def _session_document(
     user_id: str,
     agent_type: str,
-    title: str | None = None,
-    agent_state: dict | None = None,
+    title: str | None,
+    agent_state: dict | None,
 ) -> dict:
-    collection = get_sessions_collection()
     now = datetime.utcnow()
-    session = {
+    return {
         "session_id": f"session_{uuid.uuid4().hex[:10]}",
         "user_id": user_id,
         "agent_type": agent_type,
@@ -30,7 +29,43 @@ def create_session(
         "updated_at": now,
         "last_message_at": now,
     }
-    collection.insert_one(session)
+
+
+def _state_update(
+    agent_state: dict,
+    last_response_type: str | None,
+    status: str | None,
+    last_error: str | None,
+) -> dict:
+    updates = {
+        "agent_state": agent_state,
+        "updated_at": datetime.utcnow(),
+        "last_error": last_error,
+    }
+    if last_response_type is not None:
+        updates["last_response_type"] = last_response_type
+    if status is not None:
+        updates["status"] = status
+
+    return {"$set": updates, "$inc": {"version": 1}}
+
+
+def _counter_update() -> dict:
+    now = datetime.utcnow()
+    return {
+        "$inc": {"last_sequence": 1, "message_count": 1},
+        "$set": {"updated_at": now, "last_message_at": now},
+    }
+
+
+def create_session(
+    user_id: str,
+    agent_type: str,
+    title: str | None = None,
+    agent_state: dict | None = None,
+) -> dict:
+    session = _session_document(user_id, agent_type, title, agent_state)
+    get_sessions_collection().insert_one(session)
     return session
 
 
@@ -58,32 +93,16 @@ def update_session_state(
     status: str | None = None,
     last_error: str | None = None,
 ) -> None:
-    updates = {
-        "agent_state": agent_state,
-        "updated_at": datetime.utcnow(),
-        "last_error": last_error,
-    }
-    if last_response_type is not None:
-        updates["last_response_type"] = last_response_type
-    if status is not None:
-        updates["status"] = status
-
     get_sessions_collection().update_one(
         {"user_id": user_id, "session_id": session_id},
-        {"$set": updates, "$inc": {"version": 1}},
+        _state_update(agent_state, last_response_type, status, last_error),
     )
 
 
 def increment_message_counter(user_id: str, session_id: str) -> int:
     result = get_sessions_collection().find_one_and_update(
         {"user_id": user_id, "session_id": session_id},
-        {
-            "$inc": {"last_sequence": 1, "message_count": 1},
-            "$set": {
-                "updated_at": datetime.utcnow(),
-                "last_message_at": datetime.utcnow(),
-            },
-        },
+        _counter_update(),
         projection={"last_sequence": 1},
         return_document=ReturnDocument.AFTER,
     )
@@ -99,3 +118,69 @@ def close_session(user_id: str, session_id: str) -> None:
         {"user_id": user_id, "session_id": session_id},
         {"$set": {"status": "closed", "updated_at": datetime.utcnow()}},
     )
+
+
+# -----------------------------
+# Async (request path)
+# -----------------------------
+async def create_session_async(
+    user_id: str,
+    agent_type: str,
+    title: str | None = None,
+    agent_state: dict | None = None,
+) -> dict:
+    session = _session_document(user_id, agent_type, title, agent_state)
+    await get_async_sessions_collection().insert_one(session)
+    return session
+
+
+async def get_session_async(user_id: str, session_id: str) -> dict | None:
+    return await get_async_sessions_collection().find_one(
+        {"user_id": user_id, "session_id": session_id},
+        {"_id": 0},
+    )
+
+
+async def list_user_sessions_async(user_id: str, limit: int = 20) -> list[dict]:
+    cursor = (
+        get_async_sessions_collection()
+        .find({"user_id": user_id}, {"_id": 0, "agent_state": 0})
+        .sort("updated_at", DESCENDING)
+        .limit(limit)
+    )
+    return await cursor.to_list()
+
+
+async def update_session_state_async(
+    user_id: str,
+    session_id: str,
+    agent_state: dict,
+    last_response_type: str | None = None,
+    status: str | None = None,
+    last_error: str | None = None,
+) -> None:
+    await get_async_sessions_collection().update_one(
+        {"user_id": user_id, "session_id": session_id},
+        _state_update(agent_state, last_response_type, status, last_error),
+    )
+
+
+async def increment_message_counter_async(user_id: str, session_id: str) -> int:
+    result = await get_async_sessions_collection().find_one_and_update(
+        {"user_id": user_id, "session_id": session_id},
+        _counter_update(),
+        projection={"last_sequence": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+    if not result:
+        raise ValueError(f"Session not found: {session_id}")
+
+    return result["last_sequence"]
+
+
+async def close_session_async(user_id: str, session_id: str) -> None:
+    await get_async_sessions_collection().update_one(
+        {"user_id": user_id, "session_id": session_id},
+        {"$set": {"status": "closed", "updated_at": datetime.utcnow()}},
+    )
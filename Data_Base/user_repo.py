@@ -4,7 +4,7 @@ import uuid
 from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 
-from Data_Base.db import get_users_collection
+from Data_Base.db import get_async_users_collection, get_users_collection
 
 
 def _guest_document(user_id: str) -> dict:
@@ -95,3 +95,24 @@ def upsert_guest_user(user_id: str) -> dict:
     user = _guest_document(user_id)
     collection.insert_one(user)
     return user
+
+
+async def upsert_guest_user_async(user_id: str) -> dict:
+    collection = get_async_users_collection()
+    updated = await collection.find_one_and_update(
+        {"user_id": user_id},
+        {"$set": {"last_seen_at": datetime.utcnow()}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+    if updated:
+        return updated
+
+    user = _guest_document(user_id)
+    try:
+        await collection.insert_one(user)
+    except DuplicateKeyError:
+        # a concurrent request created it first
+        return await collection.find_one({"user_id": user_id}, {"_id": 0}) or user
+    return user
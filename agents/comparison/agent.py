@@ -1,4 +1,3 @@
-from groq import Groq
 import os
 from dotenv import load_dotenv
 from tavily import TavilyClient
@@ -6,7 +5,9 @@ import requests
 from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
 import json
+from agents.shared.llm_clients import get_groq_client
 from agents.shared.product_name_extractor import extract_clean_product_mappings
+from agents.shared.progress import no_progress, stream_chat_completion
 
 # Load environment variables
 load_dotenv()
@@ -27,9 +28,11 @@ class ComparisonAgent:
         self.raw_contents = None
         self.comparison_result = None
 
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = get_groq_client("comparison.agent")
         self.tavily = TavilyClient(api_key=tavily_api_key)
         self.model = "llama-3.3-70b-versatile"
+        # stage / partial / token events for streaming endpoints
+        self.progress = no_progress
 
     def to_state(self) -> dict:
         return {
@@ -99,6 +102,7 @@ class ComparisonAgent:
         self.product_pairs = product_pairs
         self.products = [pair["product_clean"] for pair in product_pairs]
         self.comparison_active = True
+        self.progress("partial", {"products": self.product_pairs})
 
         # reset old state
         self.search_queries = []
@@ -165,13 +169,15 @@ RULES:
 - Use clean product names instead of long raw titles
 """
 
-        response = self.client.chat.completions.create(
+        self.progress("stage", {"stage": "answering"})
+
+        raw = stream_chat_completion(
+            self.client,
+            self.progress,
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
-        )
-
-        raw = response.choices[0].message.content.strip()
+        ).strip()
         try:
             start = raw.find("{")
             end = raw.rfind("}") + 1
@@ -467,13 +473,15 @@ RULES:
 - Avoid repeating long raw titles unless absolutely necessary
 """
 
-        response = self.client.chat.completions.create(
+        self.progress("stage", {"stage": "generating"})
+
+        raw = stream_chat_completion(
+            self.client,
+            self.progress,
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
-        )
-
-        raw = response.choices[0].message.content.strip()
+        ).strip()
         try:
             start = raw.find("{")
             end = raw.rfind("}") + 1
@@ -516,9 +524,14 @@ RULES:
 
         queries = self.generate_search_queries()
 
+        self.progress("stage", {"stage": "searching", "queries": queries})
+
         links = self.search_all_queries(queries)
         links = self.filter_links(links)
 
+        self.progress("partial", {"sources": [{"url": link} for link in links]})
+        self.progress("stage", {"stage": "fetching", "count": len(links)})
+
         contents = self.fetch_all_links(links)
 
         result = self.generate_comparison(contents)
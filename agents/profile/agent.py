@@ -1,11 +1,11 @@
 import os
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_core.output_parsers import PydanticOutputParser
 
 from agents.profile.prompts import SYSTEM_PROMPT
 from agents.profile.schemas import ProfileAgentOutput, UserProfile
+from agents.shared.llm_clients import get_chat_groq
 
 # Load environment variables
 load_dotenv()
@@ -13,7 +13,7 @@ load_dotenv()
 # Get API key
 groq_api_key = os.getenv("GROQ_API_KEY")
 
-llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0.2)
+llm = get_chat_groq("profile.agent", model="llama-3.3-70b-versatile", temperature=0.2)
 
 parser = PydanticOutputParser(pydantic_object=ProfileAgentOutput)
 
@@ -3,17 +3,25 @@ Recommendation Agent:
 Profile → Embedding → Retrieval → Ranking → Rerank
 """
 
-from typing import Dict, Any, List, final
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, final
+import logging
+import time
 
 from agents import profile
-from agents.recommendation.embedding_model import get_embedding_model
-from agents.recommendation.retriever import ProductRetriever
+from agents.recommendation.candidate_pool import CandidatePool
 from agents.recommendation.scorer import ProductScorer
-from agents.recommendation.bm25_index import BM25Index
-from agents.recommendation.llm_reranker import LLMReranker
+from agents.recommendation.engine import RecommendationEngine, get_recommendation_engine
+from agents.recommendation.fusion import reciprocal_rank_fusion
 from agents.recommendation.profile_adapter import adapt_profile
+from agents.shared.progress import no_progress
 from tools.product_classifier import classify_product_type
 
+logger = logging.getLogger(__name__)
+
+# BM25 (scipy) and FAISS release the GIL, so both retrievers run in parallel.
+_RETRIEVAL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
+
 
 # -----------------------------
 # Product type detection
@@ -37,16 +45,32 @@ def detect_product_type(profile: Dict[str, Any]) -> str:
     return classify_product_type(detection_text, normalized.get("category"))
 
 
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
 # -----------------------------
 # Recommendation Agent
 # -----------------------------
 class RecommendationAgent:
-    def __init__(self, user_id: str):
-        self.model = get_embedding_model()
-        self.retriever = ProductRetriever()
+    # per-retriever depth and fused candidate pool size
+    BM25_K = 30
+    VECTOR_K = 30
+    CANDIDATE_POOL = 40
+    # fewer must-have matches than this and the filter is not applied
+    MIN_MUST_HAVE_MATCHES = 5
+
+    def __init__(self, user_id: str, engine: Optional[RecommendationEngine] = None):
+        # per-request context: shared indexes/models/clients come from the engine
+        self.engine = engine or get_recommendation_engine()
+        self.model = self.engine.model
+        self.retriever = self.engine.retriever
+        self.reranker = self.engine.reranker
         self.scorer = ProductScorer(user_id)
-        self.bm25 = BM25Index()
-        self.reranker = LLMReranker()
+        # scored pool of the last recommend()/refine(), kept with the session
+        self.candidate_pool: Optional[CandidatePool] = None
+        # stage / partial events for streaming endpoints
+        self.progress = no_progress
 
     # -----------------------------
     # Build semantic text (for embedding)
@@ -116,41 +140,140 @@ class RecommendationAgent:
 
     def _apply_diversity(self, products, top_k):
         """
-        Diversity based ONLY on title similarity.
-        Domain-agnostic and robust.
+        Single pass: keep the first product of each near-duplicate cluster
+        (assigned at ingestion), then fill remaining slots with the skipped
+        duplicates. Products without a cluster id fall back to their first
+        title words.
         """
 
         diverse = []
-        used_signatures = []
+        duplicates = []
+        seen = set()
 
         for p in products:
-            title = (p.get("title") or "").lower()
-            tokens = title.split()
-
-            # signature = first meaningful words
-            signature = " ".join(
-                tokens[:4]
-            )  # the bigger the number the looser the diversity (e.g. 2 would be very strict, 5 would be more relaxed)
+            key = p.get("cluster_id")
 
-            # check similarity
-            is_duplicate = False
-            for sig in used_signatures:
-                if signature in sig or sig in signature:
-                    is_duplicate = True
-                    break
+            if key is None:
+                key = " ".join((p.get("title") or "").lower().split()[:4])
 
-            if not is_duplicate:
-                diverse.append(p)
-                used_signatures.append(signature)
+            if key in seen:
+                duplicates.append(p)
+                continue
 
-            # fallback to fill results
-            elif len(diverse) < top_k:
-                diverse.append(p)
+            seen.add(key)
+            diverse.append(p)
 
             if len(diverse) >= top_k:
-                break
+                return diverse
+
+        # fallback to fill results
+        return diverse + duplicates[: top_k - len(diverse)]
+
+    def _vector_links(self, user_embedding, product_type, indexes, rows=None):
+        try:
+            return self.retriever.vector_links(
+                user_embedding,
+                product_type=product_type,
+                top_k=self.VECTOR_K,
+                snapshot=indexes.catalog,
+                rows=rows,
+                vector_index=indexes.vector_index,
+            )
+        except Exception as e:
+            # keyword results alone are still a usable candidate pool
+            logger.warning(f"[Recommend] Vector search failed: {e}")
+            return []
+
+    def _retrieve_hybrid(
+        self,
+        query_text: str,
+        user_embedding,
+        product_type: str,
+        timings: Dict[str, float],
+        must_have: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run BM25 and FAISS concurrently and fuse their rankings.
+        Both search the same published IndexSnapshot and candidates are
+        hydrated from its catalog snapshot.
+
+        Must-have features are resolved against the snapshot's feature
+        index first; when enough products of the type have all of them,
+        both retrievers only consider those products.
+        """
+
+        def timed(stage, fn, *args):
+            started = time.perf_counter()
+            result = fn(*args)
+            timings[stage] = _elapsed_ms(started)
+            return result
+
+        # one reference for the whole request; a background rebuild swaps
+        # in a new snapshot without affecting this one
+        indexes = self.engine.indexes.current()
+        snapshot = indexes.catalog
+
+        required_rows = None
+        allowed_links = None
+
+        if must_have:
+            rows = timed("must_have", snapshot.rows_with_features, must_have, product_type)
+
+            # SOFT: only restrict when it cannot collapse the result set
+            if len(rows) >= self.MIN_MUST_HAVE_MATCHES:
+                required_rows = rows
+                allowed_links = {snapshot.links[row] for row in rows}
+
+            logger.info(
+                f"[Recommend] Must-have {must_have}: {len(rows)} matching products"
+                + ("" if required_rows is not None else ", not applied")
+            )
+
+        bm25 = indexes.bm25_index(product_type)
+
+        bm25_future = _RETRIEVAL_POOL.submit(
+            timed,
+            "bm25",
+            bm25.search_links if bm25 is not None else lambda *args: [],
+            query_text,
+            self.BM25_K,
+            allowed_links,
+        )
+        vector_future = _RETRIEVAL_POOL.submit(
+            timed,
+            "vector",
+            self._vector_links,
+            user_embedding,
+            product_type,
+            indexes,
+            required_rows,
+        )
+
+        bm25_links = bm25_future.result()
+        vector_links = vector_future.result()
+
+        started = time.perf_counter()
+
+        links = reciprocal_rank_fusion(
+            [bm25_links, vector_links], limit=self.CANDIDATE_POOL
+        )
+
+        # in-memory hydration; BM25 may know products newer than the snapshot
+        rows = [snapshot.row_of(link) for link in links]
+        candidates = [
+            {"product": p} for p in snapshot.products(r for r in rows if r is not None)
+        ]
+
+        timings["fuse+hydrate"] = _elapsed_ms(started)
+
+        logger.info(
+            f"[Recommend] Hybrid retrieval: bm25={len(bm25_links)} "
+            f"vector={len(vector_links)} "
+            f"overlap={len(set(bm25_links) & set(vector_links))} "
+            f"fused={len(candidates)}"
+        )
 
-        return diverse
+        return candidates
 
     # -----------------------------
     # Main pipeline
@@ -180,33 +303,37 @@ class RecommendationAgent:
         # -----------------------------
         # 2) Embedding
         # -----------------------------
+        timings = {}
+        started = time.perf_counter()
+
+        self.progress("stage", {"stage": "retrieving"})
+
         user_embedding = self.model.encode([user_text])[0]
 
+        timings["embed"] = _elapsed_ms(started)
+
         # -----------------------------
         # 3) Product type
         # -----------------------------
         product_type = detect_product_type(profile)
 
         # -----------------------------
-        # 4) BM25 Retrieval (WIDE)
+        # 4) Hybrid retrieval: BM25 + FAISS in parallel, fused with RRF,
+        #    restricted to must-have matches (SOFT, see _retrieve_hybrid)
         # -----------------------------
         query_text = self._build_bm25_query(profile)
 
-        self.bm25.build(product_type)
-
-        bm25_k = 40  # wider pool if you want better recall for the LLM reranker
-        bm25_results = self.bm25.search(query_text, top_k=bm25_k)
-
-        # print("\n[DEBUG] BM25 candidates (first 10):")
-        # for p in bm25_results[:10]:
-        #     print(f"- {p.get('price')} | {p.get('title')[:30]}")
+        candidates = self._retrieve_hybrid(
+            query_text,
+            user_embedding,
+            product_type,
+            timings,
+            must_have=profile.get("must_have_features") or [],
+        )
 
         # -----------------------------
-        # 5) Build candidates
+        # 5) Deduplicate
         # -----------------------------
-        candidates = [{"product": p} for p in bm25_results]
-
-        # Deduplicate
         unique = {}
         for item in candidates:
             product = item["product"]
@@ -214,51 +341,101 @@ class RecommendationAgent:
 
         candidates = list(unique.values())
 
+        self.candidate_pool = None
+
         if not candidates:
             return []
 
         # -----------------------------
-        # 6) Must-have filtering (SOFT)
+        # 6) Ranking (Scorer)
         # -----------------------------
-        must_have = profile.get("must_have_features") or []
-
-        if must_have:
-            filtered = []
+        started = time.perf_counter()
 
-            for item in candidates:
-                text = (item["product"].get("details_text") or "").lower()
+        self.progress("stage", {"stage": "scoring", "candidates": len(candidates)})
 
-                if all(f.lower() in text for f in must_have):
-                    filtered.append(item)
+        pool = self.scorer.score_pool([item["product"] for item in candidates], user_embedding)
+        self.candidate_pool = pool
 
-            # only apply if safe (avoid collapse)
-            if len(filtered) >= 5:
-                candidates = filtered
-
-        # -----------------------------
-        # 7) Ranking (Scorer)
-        # -----------------------------
-        ranked = self.scorer.rank_products(
-            candidates,
-            user_embedding,
+        ranked = self.scorer.rank_pool(
+            pool,
             user_price_min=profile.get("budget_min"),
             user_price_max=profile.get("budget_max"),
             priorities=profile.get("priorities"),
             top_k=25,  # give LLM more options
         )
 
+        timings["score"] = _elapsed_ms(started)
+
         if not ranked:
             return []
 
         # -----------------------------
-        # 8) LLM Reranking (SMART)
+        # 7) LLM Reranking (SMART)
         # -----------------------------
+        # provisional list while the LLM rerank runs; only streamed requests
+        # pay for building it
+        if self.progress is not no_progress:
+            self.progress("partial", {"products": self._finalize(ranked, profile, top_k)})
+        self.progress("stage", {"stage": "reranking"})
+
+        started = time.perf_counter()
+
         expanded = self.reranker.rerank(
             user_text, ranked, top_k=top_k * 4
         )  # keep more for final budget clipping
 
+        timings["rerank"] = _elapsed_ms(started)
+
+        logger.info(
+            "[Recommend] Stage timings (ms): "
+            + ", ".join(f"{stage}={ms:.1f}" for stage, ms in timings.items())
+        )
+
+        return self._finalize(expanded, profile, top_k)
+
+    def refine(
+        self,
+        profile: Dict[str, Any],
+        pool: CandidatePool,
+        top_k: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """
+        Re-rank a previously scored candidate pool after a budget or
+        priority change: only the price/penalty/weight math and the final
+        selection run again (no embedding, retrieval or LLM rerank).
+        """
+        profile = adapt_profile(profile)
+        started = time.perf_counter()
+
+        ranked = self.scorer.rank_pool(
+            pool,
+            user_price_min=profile.get("budget_min"),
+            user_price_max=profile.get("budget_max"),
+            priorities=profile.get("priorities"),
+            top_k=top_k * 4,  # same headroom the reranker keeps for clipping
+        )
+        self.candidate_pool = pool
+
+        final = self._finalize(ranked, profile, top_k)
+
+        logger.info(
+            f"[Recommend] Refined {len(pool)} pooled candidates in "
+            f"{_elapsed_ms(started):.1f} ms"
+        )
+
+        return final
+
+    def candidate_pool_state(self) -> Optional[Dict[str, Any]]:
+        return self.candidate_pool.to_state() if self.candidate_pool is not None else None
+
+    def _finalize(
+        self,
+        expanded: List[Dict[str, Any]],
+        profile: Dict[str, Any],
+        top_k: int,
+    ) -> List[Dict[str, Any]]:
         # -----------------------------
-        # 9) FINAL Budget Clipping
+        # 8) FINAL Budget Clipping
         # -----------------------------
         budget_max = profile.get("budget_max")
 
@@ -280,7 +457,7 @@ class RecommendationAgent:
             final = expanded
 
         # -----------------------------
-        # 10) Final Top-K and apply diversity
+        # 9) Final Top-K and apply diversity
         # -----------------------------
         final = self._apply_diversity(final, top_k)
         return final
@@ -1,105 +1,126 @@
 import logging
-from rank_bm25 import BM25Okapi
+
+import numpy as np
+
 from Data_Base.db import get_collection
+from agents.recommendation.bm25_store import BM25ShardStore, product_tokens, tokenize
+from agents.recommendation.catalog_stream import iter_catalog_batches, track_peak_memory
+from agents.recommendation.topk import top_k_indices
 
 logger = logging.getLogger(__name__)
 
+# One store per process so memory-mapped shards are shared by every index.
+_STORE = BM25ShardStore()
+
+
+def get_bm25_store() -> BM25ShardStore:
+    return _STORE
+
 
 class BM25Index:
     """
     BM25 keyword-based retrieval index.
     Works alongside FAISS for hybrid search.
+
+    The index lives on disk (see bm25_store.py) and is kept up to date by
+    Data_Base/ingestion.py; MongoDB is only scanned the first time a
+    product type is requested.
     """
 
     def __init__(self):
         self.collection = get_collection()
-        self.documents = []
-        self.products = []
-        self.cache = {}
-        self.bm25 = None
+        self.store = get_bm25_store()
+        self.shard = None
         self.current_type = None
 
-    def build(self, product_type=None):
+    def _bootstrap(self, product_type=None):
         """
-        Build BM25 index from product text.
-        Uses caching to avoid rebuilding.
+        Build the on-disk shard from MongoDB (first use only).
         """
-
-        # Use cache if available
-        if product_type in self.cache:
-            cached = self.cache[product_type]
-            self.bm25 = cached["bm25"]
-            self.documents = cached["documents"]
-            self.products = cached["products"]
-            logger.info(f"[BM25] Loaded from cache for type={product_type}")
-            return
-
-        # Prevent rebuild if already built
-        if self.bm25 is not None and self.current_type == product_type:
-            logger.info(f"[BM25] Reusing existing index for type={product_type}")
-            return
-
         logger.info(f"[BM25] Building index for type={product_type}")
 
-        self.current_type = product_type
-
         query = {"product.embedding": {"$exists": True}}
 
         if product_type:
             query["product.product_type"] = product_type
 
-        # limit for safety (important for scaling)
-        cursor = self.collection.find(query).limit(5000)
+        # only the indexed text fields; embeddings are never loaded here
+        projection = {
+            "_id": 0,
+            "product.link": 1,
+            "product.title": 1,
+            "product.details_text": 1,
+            "product.category": 1,
+        }
+
+        documents = (
+            (product["link"], product_tokens(product))
+            for batch in iter_catalog_batches(self.collection, query, projection)
+            for product in batch
+        )
 
-        self.documents = []
-        self.products = []
+        with track_peak_memory() as memory:
+            count = self.store.build(product_type, documents)
 
-        for doc in cursor:
-            product = doc["product"]
+        logger.info(f"[BM25] Index built with {count} products{memory.describe()}")
 
-            title = product.get("title") or ""
-            details = product.get("details_text") or ""
-            category = product.get("category") or ""
+    def build(self, product_type=None):
+        """
+        Load the persisted BM25 shard for a product type.
+        Builds it from MongoDB only if it has never been persisted.
+        """
 
-            text = f"{title} {details} {category}".lower()
+        shard = self.store.load(product_type)
 
-            tokens = text.split()
+        if shard is None:
+            self._bootstrap(product_type)
+            shard = self.store.load(product_type)
 
-            if not tokens:
-                continue
+        if shard is not None and not shard.num_docs:
+            shard = None
 
-            self.documents.append(tokens)
-            self.products.append(product)
+        # a single assignment: concurrent searches see the old or new shard
+        self.shard = shard
+        self.current_type = product_type
 
-        if not self.documents:
+        if shard is None:
             logger.warning("[BM25] No documents found, index not built")
-            self.bm25 = None
             return
 
-        self.bm25 = BM25Okapi(self.documents)
+        logger.info(
+            f"[BM25] Loaded index for type={product_type} "
+            f"({shard.num_docs} products)"
+        )
 
-        # Cache result
-        self.cache[product_type] = {
-            "bm25": self.bm25,
-            "documents": self.documents,
-            "products": self.products,
-        }
+    def hydrate(self, links):
+        """
+        Fetch full product dicts for ranked links, preserving rank order.
+        """
+        if not links:
+            return []
 
-        logger.info(f"[BM25] Index built with {len(self.products)} products")
+        cursor = self.collection.find(
+            {"product.link": {"$in": links}}, {"_id": 0, "product": 1}
+        )
 
-    def search(self, query_text, top_k=20):
+        by_link = {doc["product"]["link"]: doc["product"] for doc in cursor}
+
+        return [by_link[link] for link in links if link in by_link]
+
+    def search_links(self, query_text, top_k=20, allowed=None):
         """
-        Search products using keyword matching.
+        Rank products by keyword matching without loading them.
 
         Args:
-            query_text: user query string
-            top_k: number of results
+            allowed: optional container of links; other products are skipped
 
         Returns:
-            List of product dicts
+            List of product links, best first
         """
 
-        if not self.bm25:
+        shard = self.shard
+
+        if shard is None:
             logger.warning("[BM25] Search called before index built")
             return []
 
@@ -107,14 +128,79 @@ class BM25Index:
             logger.warning("[BM25] Empty query")
             return []
 
-        tokens = query_text.lower().split()
+        tokens = tokenize(query_text)
+
+        scores = shard.get_scores(tokens)
+
+        if allowed is None:
+            ranked = top_k_indices(scores, top_k)
+            return [shard.links[i] for i in ranked]
+
+        # walk matching documents best first until enough are allowed
+        matched = np.flatnonzero(scores > 0)
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+
+        results = []
+        for i in order:
+            link = shard.links[i]
+            if link in allowed:
+                results.append(link)
+                if len(results) >= top_k:
+                    break
+
+        return results
 
-        scores = self.bm25.get_scores(tokens)
+    def search(self, query_text, top_k=20):
+        """
+        Search products using keyword matching.
+
+        Args:
+            query_text: user query string
+            top_k: number of results
 
-        ranked = sorted(zip(self.products, scores), key=lambda x: x[1], reverse=True)
+        Returns:
+            List of product dicts
+        """
 
-        results = [p for p, _ in ranked[:top_k]]
+        results = self.hydrate(self.search_links(query_text, top_k))
 
         logger.info(f"[BM25] Returned {len(results)} results")
 
         return results
+
+
+def update_bm25_index(products, previous_types=None):
+    """
+    Apply inserted/updated products to the persisted BM25 shards.
+
+    Args:
+        products: prepared product dicts (must include link and product_type)
+        previous_types: link -> product_type before this write, used to
+            drop a product from its old shard when its type changed
+    """
+    store = get_bm25_store()
+    previous_types = previous_types or {}
+
+    # shard key -> (upserts, removals); one store.update() per shard
+    changes = {}
+
+    def shard(product_type):
+        return changes.setdefault(product_type, ([], []))
+
+    for product in products:
+        link = product["link"]
+        product_type = product.get("product_type")
+        document = (link, product_tokens(product))
+
+        shard(product_type)[0].append(document)
+
+        # the untyped shard covers every product
+        if product_type is not None:
+            shard(None)[0].append(document)
+
+        old_type = previous_types.get(link)
+        if old_type and old_type != product_type:
+            shard(old_type)[1].append(link)
+
+    for product_type, (upserts, removals) in changes.items():
+        store.update(product_type, upserts=upserts, removals=removals)
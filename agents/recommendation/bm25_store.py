@@ -0,0 +1,614 @@
+"""
+Persistent BM25 inverted index, sharded by product type.
+
+Each shard is stored as flat NumPy arrays that are memory-mapped on load:
+
+- doc-major term counts (`doc_ptr`, `doc_terms`, `doc_tfs`) used to apply
+  incremental updates without re-tokenizing the catalog
+- a term-document CSR matrix (`term_ptr`, `post_docs`, `post_weights`) whose
+  entries are the precomputed BM25 term weights, so scoring a query is a
+  single sparse vector-matrix product
+- the raw term frequencies of those postings (`post_tfs`) and document
+  lengths (`doc_lens`), used to rescore while a delta segment is pending
+
+Incremental updates don't rewrite that base segment. A new generation
+hard-links the base files and adds a small delta segment: the documents
+upserted since the base was written (`delta_*`) and the base documents
+they replaced or removed (`removed.npy`). Scores over base + delta are
+computed with the combined corpus statistics, so they match a full
+build. Once the delta grows past BM25_DELTA_MAX_RATIO of the base, the
+next update compacts everything into a new base.
+
+Weights follow rank_bm25.BM25Okapi (k1=1.5, b=0.75, epsilon=0.25), so scores
+match the previous in-memory implementation up to float32 rounding.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from agents.recommendation.disk_store import INDEX_ROOT, GenerationStore, safe_name
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 3
+
+K1 = 1.5
+B = 0.75
+EPSILON = 0.25
+
+BM25_ROOT = INDEX_ROOT / "bm25"
+
+# delta documents + removals, relative to the base, before an update compacts
+DELTA_MAX_RATIO = float(os.getenv("BM25_DELTA_MAX_RATIO", "0.1"))
+
+BASE_FILES = (
+    "doc_ptr.npy",
+    "doc_terms.npy",
+    "doc_tfs.npy",
+    "doc_lens.npy",
+    "term_ptr.npy",
+    "post_docs.npy",
+    "post_tfs.npy",
+    "post_weights.npy",
+    "vocab.json",
+    "links.json",
+)
+
+# (link, tokens)
+Document = Tuple[str, List[str]]
+
+
+def tokenize(text: str) -> List[str]:
+    return text.lower().split()
+
+
+def product_tokens(product: Dict) -> List[str]:
+    """
+    Tokens indexed for one product (title + details + category).
+    """
+    title = product.get("title") or ""
+    details = product.get("details_text") or ""
+    category = product.get("category") or ""
+
+    return tokenize(f"{title} {details} {category}")
+
+
+def _compute_idf(df: np.ndarray, num_docs: int) -> np.ndarray:
+    """
+    BM25Okapi idf with negative values floored to epsilon * average idf.
+    """
+    idf = np.zeros(len(df), dtype=np.float64)
+
+    present = df > 0
+    if not present.any():
+        return idf
+
+    raw = np.log(num_docs - df[present] + 0.5) - np.log(df[present] + 0.5)
+
+    eps = EPSILON * (raw.sum() / len(raw))
+    raw[raw < 0] = eps
+
+    idf[present] = raw
+    return idf
+
+
+def _term_weights(
+    idf: np.ndarray, tfs: np.ndarray, doc_lens: np.ndarray, avgdl: float
+) -> np.ndarray:
+    """
+    BM25 weight of each (term, document) entry; `idf` is per entry.
+    """
+    tfs = tfs.astype(np.float64)
+    norm = K1 * (1 - B + B * doc_lens / avgdl) if avgdl else tfs
+
+    return idf * (tfs * (K1 + 1) / (tfs + norm))
+
+
+class UnsupportedShardFormat(ValueError):
+    pass
+
+
+class BM25Shard:
+    """
+    Read-only view over one persisted shard (base segment + optional delta).
+
+    `links` and the arrays returned by `get_scores()` only cover live
+    documents: base documents that were not removed, then the delta.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta.get("format") != FORMAT_VERSION:
+            raise UnsupportedShardFormat(f"Unsupported BM25 shard format in {path}")
+
+        with open(path / "vocab.json", encoding="utf-8") as f:
+            self.tokens: List[str] = json.load(f)
+
+        with open(path / "links.json", encoding="utf-8") as f:
+            self.base_links: List[str] = json.load(f)
+
+        self.base_docs = len(self.base_links)
+        self.base_terms = len(self.tokens)
+
+        def load(name):
+            return np.load(path / f"{name}.npy", mmap_mode="r")
+
+        self.doc_ptr = load("doc_ptr")
+        self.doc_terms = load("doc_terms")
+        self.doc_tfs = load("doc_tfs")
+        self.doc_lens = load("doc_lens")
+        self.term_ptr = load("term_ptr")
+        self.post_docs = load("post_docs")
+        self.post_tfs = load("post_tfs")
+
+        # rows = token ids, columns = documents; arrays stay memory-mapped
+        self.matrix = csr_matrix(
+            (load("post_weights"), self.post_docs, self.term_ptr),
+            shape=(self.base_terms, self.base_docs),
+            copy=False,
+        )
+
+        if meta.get("delta"):
+            with open(path / "delta_vocab.json", encoding="utf-8") as f:
+                self.tokens = self.tokens + json.load(f)
+
+            with open(path / "delta_links.json", encoding="utf-8") as f:
+                self.delta_links: List[str] = json.load(f)
+
+            self.delta_ptr = np.load(path / "delta_doc_ptr.npy")
+            self.delta_terms = np.load(path / "delta_doc_terms.npy")
+            self.delta_tfs = np.load(path / "delta_doc_tfs.npy")
+            self.removed = np.load(path / "removed.npy")
+        else:
+            self.delta_links = []
+            self.delta_ptr = np.zeros(1, dtype=np.int64)
+            self.delta_terms = np.empty(0, dtype=np.int32)
+            self.delta_tfs = np.empty(0, dtype=np.int32)
+            self.removed = np.empty(0, dtype=np.int64)
+
+        self.vocab = {token: i for i, token in enumerate(self.tokens)}
+        self.has_delta = bool(self.delta_links) or bool(len(self.removed))
+
+        if self.has_delta:
+            self._prepare_delta()
+        else:
+            self.links = self.base_links
+
+        self.num_docs = len(self.links)
+
+    def _prepare_delta(self) -> None:
+        """
+        Corpus statistics over live base + delta documents, and the delta
+        documents' weights under them.
+        """
+        vocab_size = len(self.tokens)
+
+        live = np.ones(self.base_docs, dtype=bool)
+        live[self.removed] = False
+        live_base = np.flatnonzero(live)
+
+        delta_docs = len(self.delta_links)
+        delta_lengths = np.diff(self.delta_ptr)
+        delta_ids = np.repeat(np.arange(delta_docs), delta_lengths)
+        delta_lens = np.bincount(delta_ids, weights=self.delta_tfs, minlength=delta_docs)
+
+        removed_terms = (
+            np.concatenate(
+                [self.doc_terms[self.doc_ptr[i] : self.doc_ptr[i + 1]] for i in self.removed]
+            )
+            if len(self.removed)
+            else np.empty(0, dtype=np.int32)
+        )
+
+        df = np.zeros(vocab_size, dtype=np.int64)
+        df[: self.base_terms] = np.diff(self.term_ptr)
+        df -= np.bincount(removed_terms, minlength=vocab_size)
+        df += np.bincount(self.delta_terms, minlength=vocab_size)
+
+        num_docs = len(live_base) + delta_docs
+        total_len = (
+            float(self.doc_lens.sum())
+            - float(self.doc_lens[self.removed].sum())
+            + float(delta_lens.sum())
+        )
+
+        self.idf = _compute_idf(df, num_docs)
+        self.avgdl = total_len / num_docs if num_docs else 0.0
+
+        delta_weights = _term_weights(
+            self.idf[self.delta_terms], self.delta_tfs, delta_lens[delta_ids], self.avgdl
+        )
+        self.delta_matrix = csr_matrix(
+            (delta_weights, (self.delta_terms, delta_ids)), shape=(vocab_size, delta_docs)
+        )
+
+        # score positions (base + delta) in `links` order
+        self.live = np.concatenate(
+            [live_base, self.base_docs + np.arange(delta_docs)]
+        )
+        self.links = [self.base_links[i] for i in live_base] + self.delta_links
+
+    def query_vector(self, query_tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map query tokens to (token ids, counts); unknown tokens are dropped.
+        Repeated tokens count multiple times, as in BM25Okapi.get_scores.
+        """
+        counts = Counter(
+            self.vocab[token] for token in query_tokens if token in self.vocab
+        )
+
+        ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+
+        return ids, weights
+
+    def get_scores(self, query_tokens: List[str]) -> np.ndarray:
+        ids, weights = self.query_vector(query_tokens)
+
+        if not self.num_docs or not len(ids):
+            return np.zeros(self.num_docs, dtype=np.float32)
+
+        if not self.has_delta:
+            # only the query rows participate: (k x N)^T . (k,) -> (N,)
+            return self.matrix[ids].T.dot(weights)
+
+        # base weights baked in the old statistics: rescore the query's postings
+        scores = np.zeros(self.base_docs + len(self.delta_links), dtype=np.float64)
+
+        for term, count in zip(ids, weights):
+            if term >= self.base_terms:
+                continue
+
+            start, end = self.term_ptr[term], self.term_ptr[term + 1]
+            docs = self.post_docs[start:end]
+
+            scores[docs] += count * _term_weights(
+                self.idf[term], self.post_tfs[start:end], self.doc_lens[docs], self.avgdl
+            )
+
+        scores[self.base_docs :] += self.delta_matrix[ids].T.dot(weights)
+
+        return scores[self.live].astype(np.float32)
+
+
+def _write_shard(
+    path: Path,
+    tokens: List[str],
+    links: List[str],
+    doc_ptr: np.ndarray,
+    doc_terms: np.ndarray,
+    doc_tfs: np.ndarray,
+) -> None:
+    """
+    Persist doc-major counts and derive the weighted term-document matrix.
+    """
+    num_docs = len(links)
+    nnz = len(doc_terms)
+
+    # scipy keeps index arrays as-is (no copy) only if both share a dtype
+    index_dtype = np.int32 if max(nnz, num_docs) < np.iinfo(np.int32).max else np.int64
+
+    doc_ids = np.repeat(
+        np.arange(num_docs, dtype=index_dtype), np.diff(doc_ptr).astype(np.int64)
+    )
+
+    doc_lens = np.bincount(doc_ids, weights=doc_tfs, minlength=num_docs)
+    avgdl = doc_lens.sum() / num_docs if num_docs else 0.0
+
+    term_counts = np.bincount(doc_terms, minlength=len(tokens))
+    idf = _compute_idf(term_counts, num_docs)
+
+    weights = _term_weights(idf[doc_terms], doc_tfs, doc_lens[doc_ids], avgdl)
+
+    order = np.argsort(doc_terms, kind="stable")
+
+    term_ptr = np.zeros(len(tokens) + 1, dtype=index_dtype)
+    np.cumsum(term_counts, out=term_ptr[1:])
+
+    np.save(path / "doc_ptr.npy", doc_ptr.astype(np.int64))
+    np.save(path / "doc_terms.npy", doc_terms.astype(np.int32))
+    np.save(path / "doc_tfs.npy", doc_tfs.astype(np.int32))
+    np.save(path / "doc_lens.npy", doc_lens.astype(np.int32))
+    np.save(path / "term_ptr.npy", term_ptr)
+    np.save(path / "post_docs.npy", doc_ids[order])
+    np.save(path / "post_tfs.npy", doc_tfs[order].astype(np.int32))
+    np.save(path / "post_weights.npy", weights[order].astype(np.float32))
+
+    with open(path / "vocab.json", "w", encoding="utf-8") as f:
+        json.dump(tokens, f)
+
+    with open(path / "links.json", "w", encoding="utf-8") as f:
+        json.dump(links, f)
+
+    with open(path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"format": FORMAT_VERSION, "num_docs": len(links)}, f)
+
+
+def _write_delta(
+    path: Path,
+    base: Path,
+    delta_tokens: List[str],
+    links: List[str],
+    doc_ptr: np.ndarray,
+    doc_terms: np.ndarray,
+    doc_tfs: np.ndarray,
+    removed: np.ndarray,
+) -> None:
+    """
+    Link the base segment of `base` into `path` and write a delta on top.
+    """
+    for name in BASE_FILES:
+        try:
+            os.link(base / name, path / name)
+        except OSError:
+            # filesystems without hard links
+            shutil.copy2(base / name, path / name)
+
+    np.save(path / "delta_doc_ptr.npy", doc_ptr.astype(np.int64))
+    np.save(path / "delta_doc_terms.npy", doc_terms.astype(np.int32))
+    np.save(path / "delta_doc_tfs.npy", doc_tfs.astype(np.int32))
+    np.save(path / "removed.npy", removed.astype(np.int64))
+
+    with open(path / "delta_vocab.json", "w", encoding="utf-8") as f:
+        json.dump(delta_tokens, f)
+
+    with open(path / "delta_links.json", "w", encoding="utf-8") as f:
+        json.dump(links, f)
+
+    with open(path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format": FORMAT_VERSION,
+                "num_docs": len(links),
+                "delta": True,
+                "removed": len(removed),
+            },
+            f,
+        )
+
+
+def _encode_documents(
+    documents: Iterable[Document],
+    tokens: List[str],
+    vocab: Dict[str, int],
+) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert (link, tokens) pairs into CSR rows, extending the vocabulary.
+
+    Rows are appended to compact typed buffers, so `documents` can be a
+    stream over the whole catalog: per-document Python objects are
+    released as soon as the row is encoded.
+    """
+    links: List[str] = []
+    lengths = array("q")
+    terms = array("i")
+    tfs = array("i")
+
+    for link, doc_tokens in documents:
+        if not doc_tokens:
+            continue
+
+        counts = Counter(doc_tokens)
+
+        for token in counts:
+            if token not in vocab:
+                vocab[token] = len(tokens)
+                tokens.append(token)
+
+        row = sorted((vocab[token], count) for token, count in counts.items())
+
+        links.append(link)
+        lengths.append(len(row))
+        terms.extend(t for t, _ in row)
+        tfs.extend(c for _, c in row)
+
+    return (
+        links,
+        np.frombuffer(lengths, dtype=np.int64),
+        np.frombuffer(terms, dtype=np.int32),
+        np.frombuffer(tfs, dtype=np.int32),
+    )
+
+
+class BM25ShardStore:
+    """
+    Reads and writes BM25 shards under BM25_ROOT/<product_type>/.
+
+    Shards are keyed by product type; `None` is the shard covering all types.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        max_open_shards: int = 8,
+        max_delta_ratio: float = DELTA_MAX_RATIO,
+    ):
+        self.root = Path(root) if root is not None else BM25_ROOT
+        self.max_open_shards = max_open_shards
+        self.max_delta_ratio = max_delta_ratio
+        self._open: "OrderedDict[Tuple[str, str], BM25Shard]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, product_type: Optional[str]) -> GenerationStore:
+        return GenerationStore(self.root / safe_name(product_type))
+
+    def exists(self, product_type: Optional[str]) -> bool:
+        return self._store(product_type).current_path() is not None
+
+    def load(self, product_type: Optional[str]) -> Optional[BM25Shard]:
+        """
+        Return the current shard (memory-mapped), or None if never built.
+        """
+        store = self._store(product_type)
+        path = store.current_path()
+
+        if path is None:
+            return None
+
+        key = (safe_name(product_type), path.name)
+
+        with self._lock:
+            shard = self._open.get(key)
+            if shard is not None:
+                self._open.move_to_end(key)
+                return shard
+
+        try:
+            shard = BM25Shard(path)
+        except UnsupportedShardFormat:
+            logger.warning(f"[BM25] Ignoring shard in old format: {path}")
+            return None
+
+        with self._lock:
+            self._open[key] = shard
+            while len(self._open) > self.max_open_shards:
+                self._open.popitem(last=False)
+
+        return shard
+
+    def build(self, product_type: Optional[str], documents: Iterable[Document]) -> int:
+        """
+        Replace the shard with a full build from `documents`.
+        """
+        tokens: List[str] = []
+        vocab: Dict[str, int] = {}
+
+        links, lengths, terms, tfs = _encode_documents(documents, tokens, vocab)
+
+        doc_ptr = np.zeros(len(links) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=doc_ptr[1:])
+
+        store = self._store(product_type)
+
+        with store.lock():
+            store.publish(
+                lambda path: _write_shard(path, tokens, links, doc_ptr, terms, tfs)
+            )
+
+        return len(links)
+
+    def update(
+        self,
+        product_type: Optional[str],
+        upserts: Iterable[Document] = (),
+        removals: Iterable[str] = (),
+    ) -> bool:
+        """
+        Incrementally upsert/remove documents in an existing shard.
+
+        The base segment is reused as-is; the change is written as a delta
+        segment until the delta outgrows `max_delta_ratio` of the base, at
+        which point the shard is compacted into a new base.
+
+        Shards that were never built are left alone: the first `build()`
+        bootstraps them from MongoDB and will include these documents.
+        """
+        upserts = list(upserts)
+        removals = set(removals)
+
+        if not upserts and not removals:
+            return False
+
+        store = self._store(product_type)
+
+        with store.lock():
+            path = store.current_path()
+
+            if path is None:
+                return False
+
+            try:
+                current = BM25Shard(path)
+            except UnsupportedShardFormat:
+                # rebuilt from MongoDB on next use
+                return False
+
+            tokens = list(current.tokens)
+            vocab = dict(current.vocab)
+
+            replaced = removals | {link for link, _ in upserts}
+
+            removed = np.union1d(
+                current.removed,
+                [i for i, link in enumerate(current.base_links) if link in replaced],
+            ).astype(np.int64)
+
+            # the previous delta, minus documents replaced again
+            kept = np.array(
+                [link not in replaced for link in current.delta_links], dtype=bool
+            )
+            kept_lengths = np.diff(current.delta_ptr)
+            kept_entries = np.repeat(kept, kept_lengths)
+
+            new_links, new_lengths, new_terms, new_tfs = _encode_documents(
+                upserts, tokens, vocab
+            )
+
+            links = [link for link, k in zip(current.delta_links, kept) if k] + new_links
+
+            doc_ptr = np.zeros(len(links) + 1, dtype=np.int64)
+            np.cumsum(np.concatenate([kept_lengths[kept], new_lengths]), out=doc_ptr[1:])
+
+            doc_terms = np.concatenate([current.delta_terms[kept_entries], new_terms])
+            doc_tfs = np.concatenate([current.delta_tfs[kept_entries], new_tfs])
+
+            compact = len(links) + len(removed) > self.max_delta_ratio * current.base_docs
+
+            if compact:
+                keep = np.ones(current.base_docs, dtype=bool)
+                keep[removed] = False
+
+                base_lengths = np.diff(current.doc_ptr)
+                entry_mask = np.repeat(keep, base_lengths)
+
+                links = [
+                    link for link, k in zip(current.base_links, keep) if k
+                ] + links
+
+                all_lengths = np.concatenate([base_lengths[keep], np.diff(doc_ptr)])
+                doc_ptr = np.zeros(len(links) + 1, dtype=np.int64)
+                np.cumsum(all_lengths, out=doc_ptr[1:])
+
+                doc_terms = np.concatenate([current.doc_terms[entry_mask], doc_terms])
+                doc_tfs = np.concatenate([current.doc_tfs[entry_mask], doc_tfs])
+
+                store.publish(
+                    lambda target: _write_shard(
+                        target, tokens, links, doc_ptr, doc_terms, doc_tfs
+                    )
+                )
+            else:
+                store.publish(
+                    lambda target: _write_delta(
+                        target,
+                        path,
+                        tokens[current.base_terms :],
+                        links,
+                        doc_ptr,
+                        doc_terms,
+                        doc_tfs,
+                        removed,
+                    )
+                )
+
+        logger.info(
+            f"[BM25] Shard type={product_type} updated "
+            f"(+{len(new_links)} docs, {len(replaced)} replaced/removed, "
+            f"{'compacted' if compact else f'delta of {len(links)} docs'})"
+        )
+
+        return True
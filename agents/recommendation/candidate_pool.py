@@ -0,0 +1,69 @@
+"""
+Scored candidate pool kept with a recommendation session.
+
+Retrieval does not depend on the budget or on priority weights, and the
+semantic score only depends on the query embedding, so a budget or
+preference refinement can re-rank the pool from the previous turn
+instead of re-running embedding, BM25/FAISS and the LLM rerank.
+
+The pool is stored in the session's agent_state as plain JSON-compatible
+columns (agent_state is returned by the sessions API). Product
+embeddings are not copied: the semantic scores computed from them are
+all the re-ranking math needs.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+STATE_FORMAT = 1
+
+# product fields kept for re-ranked results
+POOL_FIELDS = ("title", "price", "link", "category", "cluster_id")
+
+
+@dataclass(frozen=True)
+class CandidatePool:
+    products: List[Dict[str, Any]]
+    # float32 cosine similarity to the query embedding, one per product
+    semantic: np.ndarray
+    # float64, NaN where the product has no price
+    prices: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    @classmethod
+    def from_products(cls, products: List[Dict[str, Any]], semantic: np.ndarray) -> "CandidatePool":
+        kept = [{name: product.get(name) for name in POOL_FIELDS} for product in products]
+
+        prices = np.array(
+            [np.nan if product["price"] is None else product["price"] for product in kept],
+            dtype=np.float64,
+        )
+
+        return cls(products=kept, semantic=np.asarray(semantic, dtype=np.float32), prices=prices)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "format": STATE_FORMAT,
+            "products": self.products,
+            "semantic": [float(score) for score in self.semantic],
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> Optional["CandidatePool"]:
+        """
+        Pool saved by to_state(), or None if missing or unusable.
+        """
+        if not state or state.get("format") != STATE_FORMAT:
+            return None
+
+        products = state.get("products") or []
+        semantic = state.get("semantic") or []
+
+        if not products or len(products) != len(semantic):
+            return None
+
+        return cls.from_products(products, np.array(semantic, dtype=np.float32))
@@ -0,0 +1,547 @@
+"""
+Columnar, immutable snapshot of the embedded product catalog.
+
+One snapshot per catalog version is shared by every recommendation stage:
+the FAISS index uses its rows as vector ids, retrieval filters on its
+price/type arrays, and candidates are hydrated from it instead of MongoDB.
+
+Rows are ordered by product type and then link, so every type is a
+contiguous row range and a given catalog always produces the same row
+numbers in every process.
+
+With CATALOG_SNAPSHOT_SHARED (default on) the first worker to see a new
+catalog version publishes the numeric columns as .npy files in a
+GenerationStore; every worker, including the publisher, then memory-maps
+them read-only, so the embedding matrix is held once in the page cache
+no matter how many uvicorn workers run. String columns are small and are
+loaded per worker.
+
+The snapshot also carries an inverted index of normalized feature terms
+(word unigrams and bigrams of `details_text`) so must-have features are
+resolved with posting-list intersections over a whole product type.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from Data_Base.catalog_repo import current_catalog_version
+from Data_Base.db import get_collection
+from Data_Base.embedding_codec import decode_embeddings
+from agents.recommendation.catalog_stream import iter_catalog_batches, track_peak_memory
+from agents.recommendation.disk_store import INDEX_ROOT, GenerationStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ROOT = INDEX_ROOT / "snapshot"
+SHARED = os.getenv("CATALOG_SNAPSHOT_SHARED", "1").strip().lower() not in ("0", "false", "no")
+
+FORMAT_VERSION = 3
+
+_ARRAYS = (
+    "type_ids",
+    "prices",
+    "seller_scores",
+    "cluster_ids",
+    "embeddings",
+    "feature_ptr",
+    "feature_rows",
+)
+
+NO_CLUSTER = -1
+_STRINGS = ("links", "titles", "categories", "details", "type_names", "feature_terms")
+
+# numbers and letters are split apart, so "16GB" and "16 gb" normalize alike
+_FEATURE_TOKEN_RE = re.compile(r"\d+(?:\.\d+)?|[^\W\d_]+")
+
+
+def feature_tokens(text: Optional[str]) -> List[str]:
+    """
+    Normalized tokens used by the must-have feature index.
+    """
+    return _FEATURE_TOKEN_RE.findall((text or "").lower())
+
+
+def phrase_terms(text: Optional[str]) -> List[str]:
+    """
+    Index terms for a text or a must-have phrase: unigrams for a single
+    token, adjacent-token bigrams otherwise.
+    """
+    tokens = feature_tokens(text)
+
+    if len(tokens) <= 1:
+        return tokens
+
+    return [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _document_terms(text: Optional[str]) -> set:
+    tokens = feature_tokens(text)
+    return set(tokens).union(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+
+def build_feature_index(texts: List[Optional[str]]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Term -> rows postings in CSR form: (terms, ptr, rows).
+
+    Rows inside each posting list are ascending.
+    """
+    vocab: Dict[str, int] = {}
+    terms: List[str] = []
+    term_ids = array("i")
+    rows = array("i")
+
+    for row, text in enumerate(texts):
+        for term in _document_terms(text):
+            term_id = vocab.get(term)
+            if term_id is None:
+                term_id = vocab[term] = len(terms)
+                terms.append(term)
+
+            term_ids.append(term_id)
+            rows.append(row)
+
+    term_ids = np.frombuffer(term_ids, dtype=np.int32)
+    rows = np.frombuffer(rows, dtype=np.int32)
+
+    # stable: rows were appended in ascending order
+    order = np.argsort(term_ids, kind="stable")
+
+    ptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=ptr[1:])
+
+    return terms, ptr, rows[order]
+
+
+SNAPSHOT_QUERY = {"product.embedding": {"$exists": True}}
+
+SNAPSHOT_PROJECTION = {
+    "_id": 0,
+    "product.link": 1,
+    "product.title": 1,
+    "product.category": 1,
+    "product.details_text": 1,
+    "product.price": 1,
+    "product.seller_score": 1,
+    "product.product_type": 1,
+    "product.cluster_id": 1,
+    "product.embedding": 1,
+}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _to_float(value):
+    return np.nan if value is None else value
+
+
+def _from_float(value):
+    return None if np.isnan(value) else float(value)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    links: List[str]
+    titles: List[Optional[str]]
+    categories: List[Optional[str]]
+    details: List[Optional[str]]
+    type_names: List[Optional[str]]
+    # row-aligned columns
+    type_ids: np.ndarray
+    prices: np.ndarray
+    seller_scores: np.ndarray
+    embeddings: np.ndarray
+    # near-duplicate cluster per row, NO_CLUSTER when not assigned yet
+    cluster_ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    type_ranges: Dict[Optional[str], Tuple[int, int]] = field(default_factory=dict)
+    row_by_link: Dict[str, int] = field(default_factory=dict)
+    # must-have feature index (CSR postings over rows)
+    feature_terms: List[str] = field(default_factory=list)
+    feature_ptr: np.ndarray = field(default_factory=lambda: np.zeros(1, dtype=np.int64))
+    feature_rows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    feature_vocab: Dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+    @property
+    def dim(self) -> int:
+        return self.embeddings.shape[1] if self.embeddings.ndim == 2 else 0
+
+    def row_of(self, link: str) -> Optional[int]:
+        return self.row_by_link.get(link)
+
+    def type_range(self, product_type: Optional[str]) -> Optional[Tuple[int, int]]:
+        return self.type_ranges.get(product_type)
+
+    def rows_for(
+        self,
+        product_type: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Rows matching the type/price filters, in row order.
+        """
+        if product_type:
+            span = self.type_range(product_type)
+            if span is None:
+                return np.empty(0, dtype=np.int64)
+            start, end = span
+        else:
+            start, end = 0, len(self)
+
+        if price_min is None and price_max is None:
+            return np.arange(start, end, dtype=np.int64)
+
+        prices = self.prices[start:end]
+        mask = np.ones(end - start, dtype=bool)
+
+        # NaN (missing) prices never satisfy a price restriction
+        if price_min is not None:
+            mask &= prices >= price_min
+        if price_max is not None:
+            mask &= prices <= price_max
+
+        return np.flatnonzero(mask).astype(np.int64) + start
+
+    def _postings(self, term: str) -> np.ndarray:
+        term_id = self.feature_vocab.get(term)
+
+        if term_id is None:
+            return np.empty(0, dtype=np.int32)
+
+        return self.feature_rows[self.feature_ptr[term_id] : self.feature_ptr[term_id + 1]]
+
+    def rows_with_features(
+        self,
+        features: List[str],
+        product_type: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Rows whose details contain every feature, as ascending int64 rows.
+
+        A multi-word feature matches products containing all of its
+        adjacent word pairs, which is exact for two-word phrases and a
+        close approximation for longer ones. Features with no indexable
+        tokens are ignored.
+        """
+        if product_type:
+            span = self.type_range(product_type)
+            if span is None:
+                return np.empty(0, dtype=np.int64)
+        else:
+            span = (0, len(self))
+
+        # rarest terms first keeps the running intersection small
+        postings = sorted(
+            (self._postings(term) for f in features for term in phrase_terms(f)),
+            key=len,
+        )
+
+        rows = np.arange(*span, dtype=np.int64)
+
+        for posting in postings:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, posting, assume_unique=True)
+
+        return rows.astype(np.int64, copy=False)
+
+    def cluster_of(self, row: int) -> Optional[int]:
+        if row >= len(self.cluster_ids) or self.cluster_ids[row] == NO_CLUSTER:
+            return None
+        return int(self.cluster_ids[row])
+
+    def product(self, row: int) -> Dict[str, Any]:
+        """
+        Product dict in the shape stored under `product` in MongoDB.
+        The embedding is a read-only float32 view into the snapshot.
+        """
+        return {
+            "link": self.links[row],
+            "title": self.titles[row],
+            "category": self.categories[row],
+            "details_text": self.details[row],
+            "price": _from_float(self.prices[row]),
+            "seller_score": _from_float(self.seller_scores[row]),
+            "product_type": self.type_names[self.type_ids[row]],
+            "cluster_id": self.cluster_of(row),
+            "embedding": self.embeddings[row],
+        }
+
+    def products(self, rows) -> List[Dict[str, Any]]:
+        return [self.product(int(row)) for row in rows]
+
+    def memory_mb(self) -> float:
+        arrays = (
+            self.type_ids,
+            self.prices,
+            self.seller_scores,
+            self.cluster_ids,
+            self.embeddings,
+            self.feature_ptr,
+            self.feature_rows,
+        )
+        return sum(a.nbytes for a in arrays) / (1024 * 1024)
+
+    @property
+    def shared(self) -> bool:
+        """
+        True when the embedding matrix is a memory-mapped published file.
+        """
+        return isinstance(self.embeddings, np.memmap)
+
+
+def _type_sort_key(product_type):
+    # untyped products first, then alphabetical
+    return (product_type is not None, product_type or "")
+
+
+def build_snapshot(collection, version: int) -> CatalogSnapshot:
+    """
+    Stream the embedded catalog from MongoDB into a CatalogSnapshot.
+    """
+    # distinct() skips products without a product_type; querying None
+    # matches them along with explicit nulls, so they form the untyped block
+    product_types = sorted(
+        set(collection.distinct("product.product_type", SNAPSHOT_QUERY)) | {None},
+        key=_type_sort_key,
+    )
+
+    links, titles, categories, details = [], [], [], []
+    type_ids, prices, seller_scores, cluster_ids = [], [], [], []
+    type_names, type_ranges = [], {}
+    blocks = []
+
+    with track_peak_memory() as memory:
+        for product_type in product_types:
+            type_id = len(type_names)
+            type_names.append(_intern(product_type))
+            start = len(links)
+
+            query = dict(SNAPSHOT_QUERY, **{"product.product_type": product_type})
+
+            # link order inside a type keeps row numbers stable across
+            # processes; the server sorts on the unique product.link index
+            # so each batch is decoded and dropped as it arrives
+            batches = iter_catalog_batches(
+                collection, query, SNAPSHOT_PROJECTION, sort="product.link"
+            )
+
+            for batch in batches:
+                batch = [
+                    product
+                    for product in batch
+                    if product.get("link") and product.get("embedding") is not None
+                ]
+
+                for product in batch:
+                    links.append(_intern(product["link"]))
+                    titles.append(product.get("title"))
+                    categories.append(_intern(product.get("category")))
+                    details.append(product.get("details_text"))
+                    prices.append(_to_float(product.get("price")))
+                    seller_scores.append(_to_float(product.get("seller_score")))
+                    cluster_id = product.get("cluster_id")
+                    cluster_ids.append(NO_CLUSTER if cluster_id is None else cluster_id)
+                    type_ids.append(type_id)
+
+                if batch:
+                    blocks.append(decode_embeddings(p["embedding"] for p in batch))
+
+            if len(links) > start:
+                type_ranges[product_type] = (start, len(links))
+
+    embeddings = (
+        np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+    )
+    embeddings.setflags(write=False)
+
+    terms, feature_ptr, feature_rows = build_feature_index(details)
+
+    snapshot = CatalogSnapshot(
+        version=version,
+        links=links,
+        titles=titles,
+        categories=categories,
+        details=details,
+        type_names=type_names,
+        type_ids=np.asarray(type_ids, dtype=np.int32),
+        prices=np.asarray(prices, dtype=np.float64),
+        seller_scores=np.asarray(seller_scores, dtype=np.float64),
+        cluster_ids=np.asarray(cluster_ids, dtype=np.int64),
+        embeddings=embeddings,
+        type_ranges=type_ranges,
+        row_by_link={link: row for row, link in enumerate(links)},
+        feature_terms=terms,
+        feature_ptr=feature_ptr,
+        feature_rows=feature_rows,
+        feature_vocab={term: i for i, term in enumerate(terms)},
+    )
+
+    logger.info(
+        f"[Snapshot] Catalog v{version}: {len(snapshot)} products in "
+        f"{len(type_ranges)} types, {len(terms)} feature terms, "
+        f"arrays {snapshot.memory_mb():.1f} MB{memory.describe()}"
+    )
+
+    return snapshot
+
+
+def write_snapshot(path: Path, snapshot: CatalogSnapshot) -> None:
+    """
+    Persist a snapshot into an (empty) generation directory.
+    """
+    for name in _ARRAYS:
+        np.save(path / f"{name}.npy", getattr(snapshot, name))
+
+    with open(path / "columns.json", "w", encoding="utf-8") as f:
+        json.dump({name: getattr(snapshot, name) for name in _STRINGS}, f)
+
+    # type_ranges keys may be None, so they are stored as a list
+    meta = {
+        "format": FORMAT_VERSION,
+        "version": snapshot.version,
+        "type_ranges": [
+            [product_type, start, end]
+            for product_type, (start, end) in snapshot.type_ranges.items()
+        ],
+    }
+
+    with open(path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _read_meta(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return meta if meta.get("format") == FORMAT_VERSION else None
+
+
+def load_snapshot(path: Path, meta: Optional[Dict[str, Any]] = None) -> CatalogSnapshot:
+    """
+    Attach to a published snapshot; numeric columns are memory-mapped read-only.
+    """
+    meta = meta or _read_meta(path)
+
+    if meta is None:
+        raise ValueError(f"Unsupported catalog snapshot in {path}")
+
+    with open(path / "columns.json", encoding="utf-8") as f:
+        columns = json.load(f)
+
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+
+    links = [sys.intern(link) for link in columns["links"]]
+
+    return CatalogSnapshot(
+        version=meta["version"],
+        links=links,
+        titles=columns["titles"],
+        categories=[_intern(c) for c in columns["categories"]],
+        details=columns["details"],
+        type_names=[_intern(t) for t in columns["type_names"]],
+        type_ranges={t: (start, end) for t, start, end in meta["type_ranges"]},
+        row_by_link={link: row for row, link in enumerate(links)},
+        feature_terms=columns["feature_terms"],
+        feature_vocab={term: i for i, term in enumerate(columns["feature_terms"])},
+        **arrays,
+    )
+
+
+def _attach_published(store: GenerationStore, version: int) -> Optional[CatalogSnapshot]:
+    """
+    Current published snapshot if it is at least `version`.
+
+    A newer one is accepted: this worker's version poll may simply lag
+    behind the worker that published it.
+    """
+    path = store.current_path()
+
+    if path is None:
+        return None
+
+    meta = _read_meta(path)
+
+    if meta is None or meta["version"] < version:
+        return None
+
+    try:
+        return load_snapshot(path, meta)
+    except (OSError, ValueError) as e:
+        logger.warning(f"[Snapshot] Could not attach {path}: {e}")
+        return None
+
+
+def load_or_build_snapshot(version: int) -> CatalogSnapshot:
+    """
+    Attach to the published snapshot for `version`, building and
+    publishing it first if no worker has done so yet.
+    """
+    if not SHARED:
+        return build_snapshot(get_collection(), version)
+
+    store = GenerationStore(SNAPSHOT_ROOT)
+
+    snapshot = _attach_published(store, version)
+    if snapshot is not None:
+        return snapshot
+
+    with store.lock():
+        # another worker may have published it while we waited
+        snapshot = _attach_published(store, version)
+        if snapshot is not None:
+            return snapshot
+
+        built = build_snapshot(get_collection(), version)
+        path = store.publish(lambda target: write_snapshot(target, built))
+
+    # re-attach so this worker also reads the shared pages, not a private copy
+    snapshot = load_snapshot(path)
+
+    logger.info(f"[Snapshot] Published catalog v{version} to {path}")
+
+    return snapshot
+
+
+_SNAPSHOT: Optional[CatalogSnapshot] = None
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """
+    Process-wide snapshot for the current catalog version.
+
+    Swapped (once, under a lock) when ingestion has bumped the version;
+    callers keep whatever snapshot they already hold until they ask again.
+    """
+    global _SNAPSHOT
+
+    version = current_catalog_version()
+    snapshot = _SNAPSHOT
+
+    if snapshot is not None and snapshot.version >= version:
+        return snapshot
+
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT is None or _SNAPSHOT.version < version:
+            _SNAPSHOT = load_or_build_snapshot(version)
+
+        return _SNAPSHOT
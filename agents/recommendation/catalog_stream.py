@@ -0,0 +1,113 @@
+"""
+Streaming access to the product catalog for index builds.
+
+Builds read the full catalog through a projected, batched cursor so only
+one batch of (small) documents is alive at a time: the memory a build
+holds beyond its output is bounded by INDEX_BUILD_BATCH_SIZE, not by the
+catalog size.
+
+INDEX_BUILD_TRACE_MEMORY=1 makes builds also report the peak memory they
+allocated. It is off by default because tracemalloc hooks every
+allocation in the process, including the threads serving requests.
+"""
+
+import os
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from pymongo.collection import Collection
+
+BUILD_BATCH_SIZE = int(os.getenv("INDEX_BUILD_BATCH_SIZE", "1000"))
+TRACE_BUILD_MEMORY = os.getenv("INDEX_BUILD_TRACE_MEMORY", "0").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+def iter_catalog_batches(
+    collection: Collection,
+    query: Dict[str, Any],
+    projection: Dict[str, Any],
+    batch_size: int = BUILD_BATCH_SIZE,
+    sort: Optional[str] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield lists of at most `batch_size` projected product dicts, in
+    ascending `sort` field order when one is given.
+    """
+    cursor = collection.find(query, projection)
+
+    if sort is not None:
+        cursor = cursor.sort(sort)
+
+    cursor = cursor.batch_size(batch_size)
+
+    batch = []
+
+    for doc in cursor:
+        batch.append(doc["product"])
+
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+@dataclass
+class BuildMemory:
+    # None when the build ran without tracing
+    peak_bytes: Optional[int] = None
+
+    @property
+    def peak_mb(self) -> Optional[float]:
+        if self.peak_bytes is None:
+            return None
+
+        return self.peak_bytes / (1024 * 1024)
+
+    def describe(self) -> str:
+        """
+        " (peak build memory N MB)" for log lines, or "" when not traced.
+        """
+        if self.peak_bytes is None:
+            return ""
+
+        return f" (peak build memory {self.peak_mb:.1f} MB)"
+
+
+@contextmanager
+def track_peak_memory(enabled: bool = TRACE_BUILD_MEMORY) -> Iterator[BuildMemory]:
+    """
+    Measure peak Python/NumPy heap allocated inside the block.
+
+    Does nothing unless `enabled` (INDEX_BUILD_TRACE_MEMORY) or tracemalloc
+    is already running, e.g. under a benchmark. Memory held by native
+    libraries (e.g. FAISS) is not visible to tracemalloc; callers add
+    their index size when reporting.
+    """
+    stats = BuildMemory()
+
+    if not enabled and not tracemalloc.is_tracing():
+        yield stats
+        return
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    try:
+        yield stats
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        stats.peak_bytes = max(0, peak - baseline)
+
+        if started:
+            tracemalloc.stop()
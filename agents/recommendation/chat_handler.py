@@ -3,14 +3,15 @@ Recommendation Mode Chat Handler.
 Handles refinement vs new search cleanly.
 """
 
-import os
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
-from groq import Groq
 
-from agents.recommendation.intent_router import RecommendationIntentRouter
 from agents.recommendation.agent import RecommendationAgent
+from agents.recommendation.candidate_pool import CandidatePool
+from agents.recommendation.engine import RecommendationEngine, get_recommendation_engine
+from agents.shared.concurrency import run_blocking
+from agents.shared.progress import astream_chat_completion, no_progress
 
 load_dotenv()
 
@@ -42,25 +43,41 @@ def adjust_budget_from_preferences(profile, recommendations, preferences):
 
 
 class RecommendationChatHandler:
-    def __init__(self, user_id: str):
-        self.router = RecommendationIntentRouter(api_key=os.getenv("GROQ_API_KEY"))
-        self.rec_agent = RecommendationAgent(user_id)
-        self.llm = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    def __init__(self, user_id: str, engine: Optional[RecommendationEngine] = None):
+        engine = engine or get_recommendation_engine()
+        self.router = engine.intent_router
+        self.rec_agent = RecommendationAgent(user_id, engine)
+        self.llm = engine.chat_client
         self.model = "llama-3.3-70b-versatile"
+        # stage / partial / token events for streaming endpoints
+        self.progress = no_progress
 
-    def handle(
+    async def handle(
         self,
         user_message: str,
         current_profile: Dict[str, Any],
         current_recommendations: List[Dict[str, Any]],
         conversation_history: List[Dict[str, str]] | None = None,
+        candidate_pool: Dict[str, Any] | None = None,
     ) -> Dict[str, Any]:
+        """
+        `candidate_pool` is the pool state saved with the session; budget
+        and preference refinements re-rank it instead of re-retrieving.
+        Recommendation updates return the pool to save as `candidate_pool`.
+
+        LLM calls are awaited; a from-scratch recommend() runs on the
+        blocking pool.
+        """
         conversation_history = conversation_history or []
+        self.rec_agent.progress = self.progress
 
-        intent_data = self.router.route(user_message, current_recommendations)
+        self.progress("stage", {"stage": "routing"})
+
+        intent_data = await self.router.route(user_message, current_recommendations)
         intent = intent_data.get("intent")
 
         logger.info(f"[ChatHandler] Intent: {intent}")
+        self.progress("stage", {"stage": "intent", "intent": intent})
 
         # -----------------------------
         # 🔴 0️⃣ NEW SEARCH (RESET)
@@ -87,8 +104,9 @@ class RecommendationChatHandler:
 
             return {
                 "type": "recommendation_update",
-                "data": self.rec_agent.recommend(current_profile),
+                "data": await self._rerank(current_profile, candidate_pool),
                 "profile": current_profile,
+                "candidate_pool": self.rec_agent.candidate_pool_state(),
             }
 
         # -----------------------------
@@ -115,14 +133,15 @@ class RecommendationChatHandler:
             )
 
             # -------------------------
-            # Re-run recommendation
+            # Re-rank the pooled candidates
             # -------------------------
-            new_recs = self.rec_agent.recommend(current_profile)
+            new_recs = await self._rerank(current_profile, candidate_pool)
 
             return {
                 "type": "recommendation_update",
                 "data": new_recs,
                 "profile": current_profile,
+                "candidate_pool": self.rec_agent.candidate_pool_state(),
             }
 
         # -------------------------
@@ -177,7 +196,7 @@ class RecommendationChatHandler:
         if intent == "ask_explanation":
             return {
                 "type": "message",
-                "data": self._generate_explanation(
+                "data": await self._generate_explanation(
                     current_profile, current_recommendations, conversation_history
                 ),
             }
@@ -188,7 +207,7 @@ class RecommendationChatHandler:
         if intent == "general_question":
             return {
                 "type": "message",
-                "data": self._answer_general_question(
+                "data": await self._answer_general_question(
                     user_message, current_recommendations, conversation_history
                 ),
             }
@@ -201,10 +220,22 @@ class RecommendationChatHandler:
             "data": "Could you clarify what you'd like to change?",
         }
 
+    # ------------------------------------
+    # Refinement
+    # ------------------------------------
+    async def _rerank(self, profile, candidate_pool):
+        pool = CandidatePool.from_state(candidate_pool)
+
+        if pool is None:
+            # sessions saved before pools were kept
+            return await run_blocking(self.rec_agent.recommend, profile)
+
+        return self.rec_agent.refine(profile, pool)
+
     # ------------------------------------
     # Explanation
     # ------------------------------------
-    def _generate_explanation(self, profile, recommendations, conversation_history):
+    async def _generate_explanation(self, profile, recommendations, conversation_history):
         history_block = "\n".join(
             f"{item['role']}: {item['content']}" for item in conversation_history[-6:]
         )
@@ -223,13 +254,15 @@ Top products:
 Explain briefly why these match the user.
 """
 
-            response = self.llm.chat.completions.create(
+            text = await astream_chat_completion(
+                self.llm,
+                self.progress,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.5,
             )
 
-            return response.choices[0].message.content.strip()
+            return text.strip()
 
         except Exception:
             return "These products were selected based on your preferences."
@@ -237,7 +270,7 @@ Explain briefly why these match the user.
     # ------------------------------------
     # General Q&A
     # ------------------------------------
-    def _answer_general_question(
+    async def _answer_general_question(
         self, user_message, recommendations, conversation_history
     ):
         history_block = "\n".join(
@@ -258,13 +291,15 @@ User question:
 Answer clearly.
 """
 
-            response = self.llm.chat.completions.create(
+            text = await astream_chat_completion(
+                self.llm,
+                self.progress,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.5,
             )
 
-            return response.choices[0].message.content.strip()
+            return text.strip()
 
         except Exception:
             return "I can help compare these products if you'd like."
@@ -0,0 +1,127 @@
+"""
+Versioned on-disk storage for recommendation index artifacts.
+
+Every store directory holds immutable generation folders plus a CURRENT
+pointer file. Writers build a new generation and swap the pointer with
+an atomic rename, so readers (possibly in other worker processes) never
+observe a half-written index.
+"""
+
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Callable, Optional
+
+from filelock import FileLock
+
+logger = logging.getLogger(__name__)
+
+INDEX_ROOT = Path(os.getenv("RECOMMENDATION_INDEX_DIR", "data/indexes"))
+
+_POINTER = "CURRENT"
+_LOCK = ".lock"
+_GENERATION_RE = re.compile(r"^gen-(\d{8})$")
+
+
+def safe_name(value: Optional[str], default: str = "_all") -> str:
+    """
+    Turn an arbitrary key (e.g. a product type) into a directory name.
+    """
+    if not value:
+        return default
+
+    return re.sub(r"[^\w.-]", "_", str(value))
+
+
+class GenerationStore:
+    """
+    Directory of immutable index generations with an atomic CURRENT pointer.
+    """
+
+    def __init__(self, path: Path, keep: int = 2):
+        self.path = Path(path)
+        self.keep = keep
+
+    def lock(self) -> FileLock:
+        """
+        Inter-process lock that serializes writers of this store.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        return FileLock(str(self.path / _LOCK))
+
+    def current_generation(self) -> Optional[str]:
+        try:
+            name = (self.path / _POINTER).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+
+        return name or None
+
+    def current_path(self) -> Optional[Path]:
+        name = self.current_generation()
+
+        if name is None:
+            return None
+
+        path = self.path / name
+        return path if path.is_dir() else None
+
+    def _next_generation(self) -> str:
+        numbers = [0]
+
+        if self.path.is_dir():
+            for entry in self.path.iterdir():
+                match = _GENERATION_RE.match(entry.name)
+                if match:
+                    numbers.append(int(match.group(1)))
+
+        return f"gen-{max(numbers) + 1:08d}"
+
+    def publish(self, write: Callable[[Path], None]) -> Path:
+        """
+        Write a new generation and make it current.
+
+        The caller is expected to hold `lock()`; `write` receives the empty
+        generation directory and must create every file the reader needs.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        name = self._next_generation()
+        target = self.path / name
+        target.mkdir()
+
+        try:
+            write(target)
+        except Exception:
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+
+        pointer_tmp = self.path / f"{_POINTER}.{os.getpid()}.tmp"
+        pointer_tmp.write_text(name, encoding="utf-8")
+        os.replace(pointer_tmp, self.path / _POINTER)
+
+        self._cleanup(current=name)
+
+        logger.info(f"[IndexStore] Published {target}")
+
+        return target
+
+    def _cleanup(self, current: str) -> None:
+        """
+        Remove old generations, keeping the newest `keep` for readers that
+        still have the previous one open.
+        """
+        generations = sorted(
+            entry.name
+            for entry in self.path.iterdir()
+            if _GENERATION_RE.match(entry.name) and entry.name != current
+        )
+
+        stale = generations[: max(0, len(generations) - (self.keep - 1))]
+
+        for name in stale:
+            # Memory-mapped files can't be removed on Windows while open;
+            # they are retried on the next publish.
+            shutil.rmtree(self.path / name, ignore_errors=True)
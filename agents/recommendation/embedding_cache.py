@@ -0,0 +1,213 @@
+"""
+Persistent embedding cache shared by every process on the machine.
+
+Embeddings are stored in a SQLite database in WAL mode, so uvicorn
+workers and scraper runs can read concurrently while one of them writes.
+Keys are xxhash digests of the model name plus the normalized text.
+Eviction is approximate LRU: hits refresh a coarse last-used timestamp,
+and when the table grows past its limit the oldest rows are dropped.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import xxhash
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite3")
+MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# evict down to this fraction of MAX_ENTRIES, so eviction runs rarely
+EVICT_TO = 0.9
+# check the table size after this many inserts
+EVICT_CHECK_EVERY = 1000
+# last_used resolution; hits inside the same window are not rewritten
+TOUCH_SECONDS = 3600
+
+# SQLite limits bound parameters per statement
+_SQL_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, model_name: str) -> str:
+    payload = f"{model_name}\0{normalize_text(text)}".encode("utf-8")
+    return xxhash.xxh3_128_hexdigest(payload)
+
+
+class EmbeddingDiskCache:
+    """
+    File-backed text -> embedding store with size-bounded eviction.
+
+    Errors from SQLite are logged and treated as cache misses; the cache
+    never fails an encode call.
+    """
+
+    def __init__(self, path=None, model_name="", max_entries=MAX_ENTRIES):
+        self.path = Path(path or CACHE_PATH)
+        self.model_name = model_name
+        self.max_entries = max_entries
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_used INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used"
+                " ON embeddings (last_used)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+    def _count(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get_many(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Return {text: embedding} for the texts found in the cache.
+        """
+        keys = {cache_key(text, self.model_name): text for text in texts}
+        found = {}
+
+        try:
+            conn = self._connection()
+            key_list = list(keys)
+            stale = []
+            cutoff = int(time.time()) - TOUCH_SECONDS
+
+            for start in range(0, len(key_list), _SQL_CHUNK):
+                chunk = key_list[start : start + _SQL_CHUNK]
+                rows = conn.execute(
+                    "SELECT key, dim, vector, last_used FROM embeddings"
+                    f" WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+
+                for key, dim, blob, last_used in rows:
+                    found[keys[key]] = np.frombuffer(blob, dtype=np.float32, count=dim)
+
+                    if last_used < cutoff:
+                        stale.append(key)
+
+            if stale:
+                with conn:
+                    conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(int(time.time()), key) for key in stale],
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"[EmbeddingCache] Read failed: {e}")
+
+        self._count(len(found), len(keys) - len(found))
+
+        return found
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray) -> None:
+        now = int(time.time())
+
+        rows = [
+            (
+                cache_key(text, self.model_name),
+                len(embedding),
+                np.asarray(embedding, dtype=np.float32).tobytes(),
+                now,
+            )
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_used)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"[EmbeddingCache] Write failed: {e}")
+            return
+
+        with self._lock:
+            self._inserts += len(rows)
+            check = self._inserts >= EVICT_CHECK_EVERY
+            if check:
+                self._inserts = 0
+
+        if check:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop least recently used rows once the table exceeds max_entries.
+        """
+        try:
+            conn = self._connection()
+            (size,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+            if size <= self.max_entries:
+                return 0
+
+            excess = size - int(self.max_entries * EVICT_TO)
+
+            with conn:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    " SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"[EmbeddingCache] Eviction failed: {e}")
+            return 0
+
+        logger.info(f"[EmbeddingCache] Evicted {excess} embeddings")
+
+        return excess
+
+    def __len__(self) -> int:
+        (size,) = self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return size
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.path),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -3,14 +3,73 @@ Embedding service using Sentence Transformers.
 Loads model once and exposes clean encode interface.
 """
 
-from typing import List
+from typing import Dict, List
 from sentence_transformers import SentenceTransformer
 import numpy as np
+import os
+import torch
+import sqlite3
 import threading
 import logging
 
+from agents.recommendation.embedding_cache import CACHE_PATH, EmbeddingDiskCache
+from agents.shared.lru_cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+ENCODE_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+
+# opt-in int8 dynamic quantization for CPU inference
+QUANTIZE = os.getenv("EMBEDDING_QUANTIZE", "0").strip().lower() in ("1", "true", "int8")
+# torch intra-op threads; 0 keeps the torch default
+THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+
+
+def configure_threads(threads: int = THREADS) -> None:
+    """
+    Pin torch CPU thread counts (intra-op and inter-op).
+    """
+    if threads <= 0:
+        return
+
+    torch.set_num_threads(threads)
+
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # can only be set before the first parallel op runs
+        pass
+
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Apply dynamic int8 quantization to every nn.Linear (CPU only).
+    """
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """
+    Compare two embedding matrices row by row; drift is 1 - cosine.
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    cosines = np.sum(reference * candidate, axis=1) / np.maximum(norms, 1e-12)
+    drift = 1.0 - cosines
+
+    return {
+        "mean": float(drift.mean()),
+        "p95": float(np.percentile(drift, 95)),
+        "max": float(drift.max()),
+    }
+
 
 class EmbeddingModel:
     """
@@ -36,39 +95,88 @@ class EmbeddingModel:
         """
         logger.info("[Embedding] Loading model...")
 
+        configure_threads()
+
         # You can switch model here easily later
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.quantized = QUANTIZE
+        self.model = SentenceTransformer(
+            MODEL_NAME, device="cpu" if self.quantized else None
+        )
+
+        if self.quantized:
+            self.model = quantize_model(self.model)
+            logger.info("[Embedding] Using int8 dynamic quantization")
 
-        # simple in-memory cache
-        self.cache = {}
+        # cached vectors are only valid for the inference mode that made them
+        self.model_key = f"{MODEL_NAME}+int8" if self.quantized else MODEL_NAME
+
+        # bounded in-memory cache (text -> embedding)
+        self.cache = LRUCache(CACHE_SIZE)
+
+        # persistent cache shared with other workers / scraper runs
+        self.disk_cache = None
+
+        if CACHE_PATH:
+            try:
+                self.disk_cache = EmbeddingDiskCache(model_name=self.model_key)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"[Embedding] Persistent cache disabled: {e}")
 
         logger.info("[Embedding] Model loaded successfully")
 
-    def encode(self, texts: List[str]) -> np.ndarray:
+    def encode(self, texts: List[str], batch_size: int | None = None) -> np.ndarray:
         """
         Generate embeddings for list of texts.
-        Uses caching for repeated inputs.
+        Looks texts up in the in-memory LRU, then the persistent cache;
+        the rest are encoded together in one batched model call.
         """
 
-        results = []
+        results = [self.cache.get(text) for text in texts]
+
+        # unique uncached texts, in first-seen order
+        missing = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
 
-        for text in texts:
-            if text in self.cache:
-                results.append(self.cache[text])
-                continue
+        if missing and self.disk_cache is not None:
+            stored = self.disk_cache.get_many(missing)
 
-            embedding = self.model.encode(
-                text,
+            for text, embedding in stored.items():
+                self.cache.put(text, embedding)
+
+            results = [stored.get(t) if r is None else r for t, r in zip(texts, results)]
+            missing = [t for t in missing if t not in stored]
+
+        if missing:
+            embeddings = self.model.encode(
+                missing,
+                batch_size=batch_size or ENCODE_BATCH_SIZE,
                 convert_to_numpy=True,
                 normalize_embeddings=True,
                 show_progress_bar=False,
             )
 
-            self.cache[text] = embedding
-            results.append(embedding)
+            computed = dict(zip(missing, embeddings))
+
+            for text, embedding in computed.items():
+                self.cache.put(text, embedding)
+
+            if self.disk_cache is not None:
+                self.disk_cache.put_many(missing, embeddings)
+
+            results = [computed[t] if r is None else r for t, r in zip(texts, results)]
+
+        if not results:
+            return np.empty(
+                (0, self.model.get_sentence_embedding_dimension()), dtype=np.float32
+            )
 
         return np.array(results)
 
+    def cache_stats(self) -> dict:
+        return {
+            "memory": self.cache.stats(),
+            "disk": self.disk_cache.stats() if self.disk_cache is not None else None,
+        }
+
 
 # Global accessor
 def get_embedding_model() -> EmbeddingModel:
@@ -0,0 +1,63 @@
+"""
+Process-wide recommendation engine.
+
+Owns everything that is expensive to build and safe to share between
+requests: the embedding model, the retriever (filter cache), the Groq
+clients and the IndexBuilder publishing immutable BM25/FAISS snapshots
+(index_snapshot.py). Requests use lightweight RecommendationAgent /
+RecommendationChatHandler contexts that only add user-specific state
+(the scorer) on top.
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from agents.recommendation.embedding_model import get_embedding_model
+from agents.recommendation.index_snapshot import get_index_builder
+from agents.recommendation.intent_classifier import ENABLED as INTENT_CLASSIFIER_ENABLED
+from agents.recommendation.intent_classifier import IntentClassifier
+from agents.recommendation.intent_router import RecommendationIntentRouter
+from agents.recommendation.llm_reranker import LLMReranker
+from agents.recommendation.retriever import ProductRetriever
+from agents.shared.llm_clients import get_async_groq_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationEngine:
+    """
+    Shared indexes, models and clients. Thread-safe.
+    """
+
+    def __init__(self):
+        self.model = get_embedding_model()
+        self.retriever = ProductRetriever()
+        self.reranker = LLMReranker()
+        # confident chat turns are classified locally, the rest by the LLM
+        self.intent_router = RecommendationIntentRouter(
+            classifier=IntentClassifier(self.model) if INTENT_CLASSIFIER_ENABLED else None
+        )
+        # chat replies are awaited by the async chat handler
+        self.chat_client = get_async_groq_client("recommendation.chat")
+        self.indexes = get_index_builder()
+
+
+_ENGINE: Optional[RecommendationEngine] = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_recommendation_engine() -> RecommendationEngine:
+    global _ENGINE
+
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                logger.info("[Engine] Creating shared recommendation engine")
+                _ENGINE = RecommendationEngine()
+
+    return _ENGINE
@@ -0,0 +1,31 @@
+"""
+Rank fusion for hybrid (BM25 + vector) retrieval.
+"""
+
+from typing import Hashable, List, Sequence
+
+# Standard RRF constant (Cormack et al.); damps the weight of top ranks.
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Hashable]],
+    k: int = RRF_K,
+    limit: int | None = None,
+) -> List[Hashable]:
+    """
+    Merge ranked lists by summing 1 / (k + rank) per item.
+
+    Rank is 1-based. Items found by several retrievers rise to the top;
+    ties keep the order in which items were first seen.
+    """
+    scores = {}
+
+    for ranked in ranked_lists:
+        for rank, item in enumerate(ranked, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+
+    # sorted() is stable, so equal scores keep first-seen order
+    fused = sorted(scores, key=scores.__getitem__, reverse=True)
+
+    return fused[:limit] if limit is not None else fused
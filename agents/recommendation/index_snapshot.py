@@ -0,0 +1,251 @@
+"""
+Immutable retrieval index snapshots, rebuilt in the background.
+
+An IndexSnapshot bundles everything a recommendation request searches for
+one catalog version: the catalog snapshot, the FAISS index built for its
+rows and one loaded BM25 shard per product type. Nothing in it changes
+after construction.
+
+IndexBuilder owns the current snapshot. A daemon thread polls the catalog
+version and, when ingestion has bumped it, builds a complete new snapshot
+off the request path and publishes it with one reference assignment.
+Requests take the reference once and use it throughout, so they never
+wait for a rebuild and never mix indexes from two versions. A replaced
+snapshot is freed (and its memory maps closed) by reference counting as
+soon as the last in-flight request holding it finishes; status() reports
+how many retired snapshots are still alive.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from Data_Base.catalog_repo import current_catalog_version
+from agents.recommendation.bm25_index import BM25Index
+from agents.recommendation.catalog_snapshot import CatalogSnapshot, get_catalog_snapshot
+from agents.recommendation.vector_index import ProductVectorIndex
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = float(os.getenv("INDEX_REFRESH_SECONDS", "30"))
+
+
+@dataclass(frozen=True, eq=False)
+class IndexSnapshot:
+    catalog: CatalogSnapshot
+    vector_index: ProductVectorIndex
+    # product type (None = all types) -> BM25 index over its shard
+    bm25: Dict[Optional[str], BM25Index] = field(repr=False)
+    built_at: float
+    build_seconds: float
+
+    @property
+    def version(self) -> int:
+        return self.catalog.version
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.built_at
+
+    def bm25_index(self, product_type: Optional[str]) -> Optional[BM25Index]:
+        return self.bm25.get(product_type)
+
+
+def build_index_snapshot(progress=None) -> IndexSnapshot:
+    """
+    Build every index for the current catalog version.
+
+    `progress(stage, done, total)` is called as the build advances.
+    """
+    progress = progress or (lambda stage, done, total: None)
+    started = time.perf_counter()
+
+    progress("catalog", 0, 1)
+    catalog = get_catalog_snapshot()
+
+    progress("faiss", 0, 1)
+    vector_index = ProductVectorIndex()
+    vector_index.build(snapshot=catalog)
+
+    # None is the catalog-wide BM25 shard; type_names already lists it
+    # for untyped products, so dedupe while keeping it first
+    types: List[Optional[str]] = list(dict.fromkeys([None, *catalog.type_names]))
+    bm25 = {}
+
+    for done, product_type in enumerate(types):
+        progress("bm25", done, len(types))
+        index = BM25Index()
+        index.build(product_type)
+        bm25[product_type] = index
+
+    return IndexSnapshot(
+        catalog=catalog,
+        vector_index=vector_index,
+        bm25=bm25,
+        built_at=time.time(),
+        build_seconds=time.perf_counter() - started,
+    )
+
+
+class IndexBuilder:
+    """
+    Holds the current IndexSnapshot and replaces it in the background.
+    """
+
+    def __init__(self, build=build_index_snapshot, interval: float = REFRESH_SECONDS):
+        self.interval = interval
+        self._build = build
+        self._current: Optional[IndexSnapshot] = None
+        # serializes builds only; readers never take it once warm
+        self._build_lock = threading.Lock()
+        self._retired: List[weakref.ref] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._status_lock = threading.Lock()
+        self._status: Dict[str, Any] = {
+            "state": "idle",
+            "stage": None,
+            "stage_done": 0,
+            "stage_total": 0,
+            "build_started_at": None,
+            "builds": 0,
+            "failures": 0,
+            "last_error": None,
+        }
+
+    def current(self) -> IndexSnapshot:
+        """
+        The published snapshot. Only a cold process builds inline.
+        """
+        snapshot = self._current
+
+        if snapshot is None:
+            snapshot = self.refresh()
+
+        return snapshot
+
+    def _update_status(self, **values) -> None:
+        with self._status_lock:
+            self._status.update(values)
+
+    def _progress(self, stage: str, done: int, total: int) -> None:
+        self._update_status(stage=stage, stage_done=done, stage_total=total)
+
+    def refresh(self, force: bool = False) -> IndexSnapshot:
+        """
+        Build and publish a new snapshot if the catalog version moved.
+        On failure the previous snapshot stays published.
+        """
+        with self._build_lock:
+            current = self._current
+
+            if (
+                not force
+                and current is not None
+                and current.version >= current_catalog_version()
+            ):
+                return current
+
+            self._update_status(state="building", build_started_at=time.time(), last_error=None)
+
+            try:
+                snapshot = self._build(self._progress)
+            except Exception as e:
+                with self._status_lock:
+                    self._status.update(state="failed", stage=None, last_error=str(e))
+                    self._status["failures"] += 1
+                logger.error(f"[Indexes] Rebuild failed: {e}")
+
+                if current is None:
+                    raise
+                return current
+
+            # the swap: requests that already hold `current` keep using it
+            self._current = snapshot
+
+            with self._status_lock:
+                if current is not None:
+                    self._retired.append(weakref.ref(current))
+                self._status.update(state="idle", stage=None, stage_done=0, stage_total=0)
+                self._status["builds"] += 1
+
+            logger.info(
+                f"[Indexes] Published catalog v{snapshot.version} indexes "
+                f"in {snapshot.build_seconds:.1f}s"
+            )
+
+            return snapshot
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                # e.g. MongoDB unreachable; retry on the next tick
+                logger.warning(f"[Indexes] Refresh skipped: {e}")
+
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """
+        Start the background refresh thread (idempotent).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="index-builder", daemon=True)
+        self._thread.start()
+
+        logger.info(f"[Indexes] Background refresh every {self.interval:.0f}s")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Rebuild progress, current snapshot age and retired snapshots
+        still referenced by in-flight requests.
+        """
+        snapshot = self._current
+
+        with self._status_lock:
+            self._retired = [ref for ref in self._retired if ref() is not None]
+            retired_alive = len(self._retired)
+            status = dict(self._status)
+
+        status.update(
+            running=self._thread is not None and self._thread.is_alive(),
+            refresh_seconds=self.interval,
+            version=snapshot.version if snapshot is not None else None,
+            built_at=snapshot.built_at if snapshot is not None else None,
+            age_seconds=round(snapshot.age_seconds, 1) if snapshot is not None else None,
+            build_seconds=round(snapshot.build_seconds, 2) if snapshot is not None else None,
+            retired_alive=retired_alive,
+        )
+
+        return status
+
+
+_BUILDER: Optional[IndexBuilder] = None
+_BUILDER_LOCK = threading.Lock()
+
+
+def get_index_builder() -> IndexBuilder:
+    global _BUILDER
+
+    if _BUILDER is None:
+        with _BUILDER_LOCK:
+            if _BUILDER is None:
+                _BUILDER = IndexBuilder()
+
+    return _BUILDER
@@ -0,0 +1,417 @@
+"""
+Local intent classifier for recommendation chat turns.
+
+Nearest-centroid matching over the shared EmbeddingModel: every intent's
+labelled example utterances (INTENT_EXAMPLES) are embedded once and
+averaged into a unit centroid; a message gets the intent whose centroid
+has the highest cosine similarity. Budgets, brands and preference
+keywords are pulled out with regular expressions, so a confident
+prediction produces the same dict as RecommendationIntentRouter's LLM
+call without the round trip.
+
+A prediction is confident when:
+
+- the best similarity is at least INTENT_CLASSIFIER_MIN_SCORE
+- it beats the runner-up by at least INTENT_CLASSIFIER_MIN_MARGIN
+- the slot the intent needs was extracted (numbers for refine_budget, a
+  brand for refine_brand, a known preference for refine_preferences)
+
+Anything else is left to the LLM router. A message with a budget stated
+as one ("under 900", "between 10k and 20k", or a bare "$800", read as a
+maximum) is refine_budget when that intent is among the two best matches
+and scores at least INTENT_CLASSIFIER_MIN_SCORE; bare numbers (years,
+specs) never decide.
+
+Off by default: the thresholds still have to be calibrated against the
+real embedding model (benchmarks/intent_classifier.py) before
+INTENT_CLASSIFIER_ENABLED=1 lets a local prediction skip the LLM; a
+wrong new_search resets the user's session.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ENABLED = os.getenv("INTENT_CLASSIFIER_ENABLED", "0").strip().lower() in ("1", "true", "yes")
+MIN_SCORE = float(os.getenv("INTENT_CLASSIFIER_MIN_SCORE", "0.5"))
+MIN_MARGIN = float(os.getenv("INTENT_CLASSIFIER_MIN_MARGIN", "0.05"))
+
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "refine_budget": [
+        "under 15000",
+        "keep it below 20k",
+        "my budget is 1000 dollars",
+        "between 10k and 20k",
+        "nothing over 800",
+        "max 25000 EGP",
+        "less than 1500 please",
+        "show me options from 500 to 700",
+        "I can spend up to 30000",
+        "at least 2000, I want something decent",
+        "can you stay within 900",
+        "price range 5000-7000",
+    ],
+    "refine_preferences": [
+        "make it cheaper",
+        "I want better performance",
+        "something with a good camera",
+        "longer battery life please",
+        "I need something lighter",
+        "more powerful for gaming",
+        "good camera and battery",
+        "prefer a bigger screen",
+        "more storage",
+        "something more affordable",
+        "faster processor",
+        "I care more about build quality",
+    ],
+    "refine_brand": [
+        "I want Dell",
+        "only show Apple",
+        "do you have Samsung ones",
+        "I prefer Lenovo",
+        "show me HP laptops",
+        "any Asus options",
+        "Xiaomi only please",
+        "I like Sony",
+        "switch to Acer",
+        "stick to Huawei",
+    ],
+    "ask_explanation": [
+        "why these?",
+        "why did you pick these",
+        "why did you recommend this one",
+        "explain your choices",
+        "how did you choose these products",
+        "what makes these a good match for me",
+        "why is the first one ranked higher",
+        "why not something else",
+        "what is the reasoning behind these",
+        "why are these good for me",
+    ],
+    "general_question": [
+        "does the second one have a backlit keyboard",
+        "how much RAM does the first one have",
+        "which one has the best battery",
+        "is the Lenovo good for programming",
+        "what is the difference between the first two",
+        "does it support 5G",
+        "which of these is lightest",
+        "can the first one run games",
+        "how big is the screen on the third one",
+        "is there a warranty",
+        "which is better for students",
+        "what processor does it have",
+    ],
+    "new_search": [
+        "I want a phone instead",
+        "forget that, show me TVs",
+        "actually I need headphones",
+        "let's look for a tablet now",
+        "start over, I want a smartwatch",
+        "never mind laptops, find me a monitor",
+        "show me cameras instead",
+        "I changed my mind, I need a printer",
+        "new search for gaming consoles",
+        "can we search for earbuds",
+    ],
+}
+
+BRANDS = (
+    "acer",
+    "apple",
+    "asus",
+    "dell",
+    "google",
+    "honor",
+    "hp",
+    "huawei",
+    "infinix",
+    "lenovo",
+    "lg",
+    "microsoft",
+    "motorola",
+    "msi",
+    "nokia",
+    "oneplus",
+    "oppo",
+    "realme",
+    "samsung",
+    "sony",
+    "tecno",
+    "toshiba",
+    "vivo",
+    "xiaomi",
+)
+
+# priority key -> phrases, weighted like the router prompt's examples
+PREFERENCE_KEYWORDS = {
+    "price": (
+        "cheaper",
+        "cheap",
+        "affordable",
+        "less expensive",
+        "lower price",
+        "inexpensive",
+        "save money",
+    ),
+    "performance": (
+        "performance",
+        "faster",
+        "powerful",
+        "speed",
+        "gaming",
+        "processor",
+    ),
+    "battery": ("battery",),
+    "camera": ("camera", "photos", "photography"),
+    "build_quality": (
+        "lighter",
+        "lightweight",
+        "portable",
+        "build quality",
+        "durable",
+        "thinner",
+    ),
+    "display": ("screen", "display"),
+    "storage": ("storage", "ssd"),
+}
+PREFERENCE_WEIGHT = 0.9
+
+# smaller numbers are counts or ordinals ("the first 2 and 3"), not prices
+MIN_BUDGET_AMOUNT = 50
+
+_BRAND_PATTERN = re.compile(r"\b(" + "|".join(BRANDS) + r")\b", re.IGNORECASE)
+
+_CURRENCY = r"[$€£]|\b(?:egp|le|usd|eur|dollars?|pounds?|euros?)\b"
+_NUMBER = r"(?<![\w.])(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k|thousand)?\b"
+_AMOUNT = (
+    r"(?:\$|egp|le|usd|eur|€|£)?\s*"
+    rf"{_NUMBER}"
+    r"(?!\s*(?:gb|tb|mb|inch|inches|hz|mp|mah|w|gen|cores?|%)\b)"
+    r"\s*(?:\$|egp|le|usd|eur|dollars?|pounds?|euros?)?"
+)
+_RANGE = re.compile(
+    rf"(?:between|from|range)?\s*{_AMOUNT}\s*(?:-|–|to|and)\s*{_AMOUNT}", re.IGNORECASE
+)
+_MAX = re.compile(
+    r"(?:under|below|less than|cheaper than|lower than|max(?:imum)?|up to|"
+    r"no more than|not more than|nothing over|within|at most|budget(?: is| of)?)"
+    rf"\s*:?\s*{_AMOUNT}",
+    re.IGNORECASE,
+)
+_MIN = re.compile(
+    r"(?:(?<!nothing )over|above|(?<!no )(?<!not )more than|at least|min(?:imum)?|"
+    r"starting (?:at|from))"
+    rf"\s*:?\s*{_AMOUNT}",
+    re.IGNORECASE,
+)
+# a bare price with a currency ("$800", "900 dollars") is read as a maximum
+_PRICE = re.compile(
+    rf"(?:{_CURRENCY})\s*{_NUMBER}|(?<![\w.]){_NUMBER}\s*(?:{_CURRENCY})", re.IGNORECASE
+)
+_YEAR = re.compile(r"(?:19|20)\d\d")
+
+# words and currency marks that make a number a price, not a year or a spec
+_BUDGET_CUE = re.compile(
+    r"[$€£]|\d\s*(?:k|thousand)\b|\b(?:budget|price|cost|spend|afford|pay|egp|le|usd|eur|"
+    r"dollars?|pounds?|euros?|under|below|over|above|between|within|range|max(?:imum)?|"
+    r"min(?:imum)?|up to|at most|at least|less than|more than|cheaper than|lower than)\b",
+    re.IGNORECASE,
+)
+
+
+def _amount(match: re.Match, group: int) -> Optional[float]:
+    value = float(match.group(group).replace(",", ""))
+
+    if match.group(group + 1):
+        value *= 1000
+
+    return value if value >= MIN_BUDGET_AMOUNT else None
+
+
+def _is_year(match: re.Match, group: int) -> bool:
+    return not match.group(group + 1) and bool(_YEAR.fullmatch(match.group(group)))
+
+
+def extract_budget(text: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    (budget_min, budget_max) stated in `text`: "under 20k" -> (None, 20000),
+    "between 10k and 20k" -> (10000, 20000), "$800" -> (None, 800).
+    (None, None) when absent; a pair of years without a currency ("the
+    2020 and 2021 models") is not a range.
+    """
+    match = _RANGE.search(text)
+    if match and not (
+        _is_year(match, 1)
+        and _is_year(match, 3)
+        and not re.search(_CURRENCY, match.group(0), re.IGNORECASE)
+    ):
+        low, high = _amount(match, 1), _amount(match, 3)
+        if low is not None and high is not None:
+            return min(low, high), max(low, high)
+
+    match = _MIN.search(text)
+    budget_min = _amount(match, 1) if match else None
+
+    match = _MAX.search(text)
+    budget_max = _amount(match, 1) if match else None
+
+    if budget_min is None and budget_max is None:
+        match = _PRICE.search(text)
+        if match:
+            group = 1 if match.group(1) else 3
+            budget_max = _amount(match, group)
+
+    return budget_min, budget_max
+
+
+def extract_brand(text: str) -> Optional[str]:
+    match = _BRAND_PATTERN.search(text)
+
+    return match.group(1).lower() if match else None
+
+
+def extract_preferences(text: str) -> Dict[str, float]:
+    lowered = text.lower()
+
+    return {
+        key: PREFERENCE_WEIGHT
+        for key, phrases in PREFERENCE_KEYWORDS.items()
+        if any(re.search(rf"\b{re.escape(phrase)}\b", lowered) for phrase in phrases)
+    }
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    intent: str
+    # cosine similarity to the intent centroid, and lead over the runner-up
+    score: float
+    margin: float
+    confident: bool
+    budget_min: Optional[float] = None
+    budget_max: Optional[float] = None
+    brand: Optional[str] = None
+    preferences: Dict[str, float] = field(default_factory=dict)
+
+    def route(self) -> Dict[str, Any]:
+        """
+        The RecommendationIntentRouter result for this prediction.
+        """
+        return {
+            "intent": self.intent,
+            "budget_min": self.budget_min,
+            "budget_max": self.budget_max,
+            "brand": self.brand,
+            "preferences": dict(self.preferences),
+        }
+
+
+class IntentClassifier:
+    """
+    Nearest-centroid intent classifier. Thread-safe; centroids are built
+    on first use from the encoder (anything with EmbeddingModel.encode()).
+    """
+
+    def __init__(
+        self,
+        encoder,
+        examples: Optional[Dict[str, List[str]]] = None,
+        min_score: float = MIN_SCORE,
+        min_margin: float = MIN_MARGIN,
+    ):
+        self.encoder = encoder
+        self.examples = examples or INTENT_EXAMPLES
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+        self._lock = threading.Lock()
+        self._labels: List[str] = []
+        self._centroids: Optional[np.ndarray] = None
+
+    def _unit(self, vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+        return vectors / np.maximum(norms, 1e-12)
+
+    def centroids(self) -> Tuple[List[str], np.ndarray]:
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    labels = list(self.examples)
+                    rows = []
+
+                    for label in labels:
+                        vectors = np.asarray(
+                            self.encoder.encode(self.examples[label]), dtype=np.float32
+                        )
+                        rows.append(self._unit(vectors).mean(axis=0))
+
+                    self._labels = labels
+                    self._centroids = self._unit(np.stack(rows))
+
+        return self._labels, self._centroids
+
+    def _slots_filled(self, intent: str, budget: tuple, brand, preferences) -> bool:
+        if intent == "refine_budget":
+            return any(value is not None for value in budget)
+        if intent == "refine_brand":
+            return brand is not None
+        if intent == "refine_preferences":
+            return bool(preferences)
+        return True
+
+    def classify(self, text: str) -> IntentPrediction:
+        labels, centroids = self.centroids()
+
+        vector = self._unit(np.asarray(self.encoder.encode([text])[0], dtype=np.float32))
+        scores = centroids @ vector
+        order = np.argsort(-scores)
+
+        best, runner_up = int(order[0]), int(order[1])
+        intent = labels[best]
+        score = float(scores[best])
+        margin = float(scores[best] - scores[runner_up])
+
+        budget = extract_budget(text)
+        brand = extract_brand(text)
+        preferences = extract_preferences(text)
+
+        stated_budget = any(value is not None for value in budget) and bool(
+            _BUDGET_CUE.search(text)
+        )
+        budget_score = (
+            float(scores[labels.index("refine_budget")]) if "refine_budget" in labels else 0.0
+        )
+
+        if (
+            stated_budget
+            and "refine_budget" in (labels[best], labels[runner_up])
+            and budget_score >= self.min_score
+        ):
+            # a stated budget settles budget vs. preference/question
+            intent = "refine_budget"
+            confident = True
+        else:
+            confident = (
+                score >= self.min_score
+                and margin >= self.min_margin
+                and self._slots_filled(intent, budget, brand, preferences)
+            )
+
+        return IntentPrediction(
+            intent=intent,
+            score=round(score, 4),
+            margin=round(margin, 4),
+            confident=confident,
+            budget_min=budget[0],
+            budget_max=budget[1],
+            brand=brand if intent == "refine_brand" else None,
+            preferences=preferences if intent == "refine_preferences" else {},
+        )
@@ -1,22 +1,128 @@
 import json
 import logging
-from typing import Dict, Any
-from groq import Groq
+import threading
+import time
+from typing import Dict, Any, Optional
+from agents.recommendation.intent_classifier import IntentClassifier
 from agents.recommendation.prompts import system_prompt
+from agents.shared.concurrency import run_blocking
+from agents.shared.llm_cache import acached_chat_completion
+from agents.shared.llm_clients import get_async_groq_client
 
 logger = logging.getLogger(__name__)
 
 
+class RoutingMetrics:
+    """
+    How many turns the local classifier answered vs. the LLM router.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local = 0
+        self.llm = 0
+        self.local_ms = 0.0
+
+    def record(self, name: str, elapsed_ms: float = 0.0) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            if name == "local":
+                self.local_ms += elapsed_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            turns = self.local + self.llm
+
+            return {
+                "local": self.local,
+                "llm": self.llm,
+                # share of turns that skipped the LLM call
+                "local_rate": round(self.local / turns, 3) if turns else None,
+                "local_avg_ms": round(self.local_ms / self.local, 2) if self.local else None,
+            }
+
+
+_METRICS = RoutingMetrics()
+
+
+def intent_routing_stats() -> Dict[str, Any]:
+    return _METRICS.snapshot()
+
+
+def parse_route(content: str) -> Dict[str, Any]:
+    """
+    Router result from the LLM's answer, with every key present.
+    Raises ValueError when the answer holds no JSON object.
+    """
+    content = content.strip()
+
+    # -------------------------
+    # Extract JSON safely
+    # -------------------------
+    start = content.find("{")
+    end = content.rfind("}") + 1
+
+    if start != -1 and end != -1:
+        content = content[start:end]
+
+    parsed = json.loads(content)
+
+    if not isinstance(parsed, dict):
+        raise ValueError("Intent router answer is not a JSON object")
+
+    # -------------------------
+    # Ensure required keys exist
+    # -------------------------
+    return {
+        "intent": parsed.get("intent", "general_question"),
+        "budget_min": parsed.get("budget_min"),
+        "budget_max": parsed.get("budget_max"),
+        "brand": parsed.get("brand"),
+        "preferences": parsed.get("preferences", {}),
+    }
+
+
 class RecommendationIntentRouter:
     """
-    Uses LLM to detect user intent during recommendation conversation.
+    Detects user intent during recommendation conversation: the local
+    IntentClassifier answers confident turns, the LLM the rest.
     """
 
-    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile"):
-        self.client = Groq(api_key=api_key)
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "llama-3.3-70b-versatile",
+        classifier: Optional[IntentClassifier] = None,
+    ):
+        self.client = get_async_groq_client("recommendation.intent_router", api_key)
         self.model = model
+        self.classifier = classifier
+
+    async def _classify_locally(self, user_message: str) -> Optional[Dict[str, Any]]:
+        if self.classifier is None:
+            return None
+
+        started = time.perf_counter()
+
+        try:
+            # encoding is synchronous model inference
+            prediction = await run_blocking(self.classifier.classify, user_message)
+        except Exception as e:
+            logger.warning(f"[IntentRouter] Local classifier failed: {e}")
+            return None
+
+        if not prediction.confident:
+            return None
+
+        _METRICS.record("local", (time.perf_counter() - started) * 1000)
+        logger.info(
+            f"[IntentRouter] Local: {prediction.intent} "
+            f"(score={prediction.score}, margin={prediction.margin})"
+        )
+
+        return prediction.route()
 
-    def route(
+    async def route(
         self,
         user_message: str,
         current_recommendations: list,
@@ -32,6 +138,12 @@ class RecommendationIntentRouter:
         }
         """
 
+        local = await self._classify_locally(user_message)
+        if local is not None:
+            return local
+
+        _METRICS.record("llm")
+
         SYSTEM_PROMPT = system_prompt.strip()
 
         # -------------------------
@@ -54,7 +166,11 @@ Return ONLY a valid JSON object.
 """
 
         try:
-            response = self.client.chat.completions.create(
+            content = await acached_chat_completion(
+                "recommendation.intent_router",
+                self.client,
+                # malformed JSON is retried next time, not cached
+                validate=parse_route,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": SYSTEM_PROMPT},
@@ -63,29 +179,7 @@ Return ONLY a valid JSON object.
                 temperature=0,
             )
 
-            content = response.choices[0].message.content.strip()
-
-            # -------------------------
-            # Extract JSON safely
-            # -------------------------
-            start = content.find("{")
-            end = content.rfind("}") + 1
-
-            if start != -1 and end != -1:
-                content = content[start:end]
-
-            parsed = json.loads(content)
-
-            # -------------------------
-            # Ensure required keys exist
-            # -------------------------
-            return {
-                "intent": parsed.get("intent", "general_question"),
-                "budget_min": parsed.get("budget_min"),
-                "budget_max": parsed.get("budget_max"),
-                "brand": parsed.get("brand"),
-                "preferences": parsed.get("preferences", {}),
-            }
+            return parse_route(content)
 
         except Exception as e:
             logger.error(f"[IntentRouter] Failed: {e}")
@@ -1,8 +1,9 @@
 import logging
-import os
-from groq import Groq
 from dotenv import load_dotenv
 
+from agents.shared.llm_cache import cached_chat_completion
+from agents.shared.llm_clients import get_groq_client
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -10,9 +11,25 @@ logger = logging.getLogger(__name__)
 MODEL = "llama-3.3-70b-versatile"
 
 
+def parse_selection(text, count):
+    """
+    0-based product indices from a "1,4,7" answer; out-of-range and
+    non-numeric entries are dropped.
+    """
+    indices = []
+
+    for x in text.replace(" ", "").split(","):
+        if x.isdigit():
+            idx = int(x) - 1
+            if 0 <= idx < count:
+                indices.append(idx)
+
+    return indices
+
+
 class LLMReranker:
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = get_groq_client("recommendation.reranker")
 
     def rerank(self, user_query, products, top_k=4):
         """
@@ -79,24 +96,20 @@ Return ONLY product numbers like:
             # -------------------------
             # LLM call
             # -------------------------
-            response = self.client.chat.completions.create(
+            text = cached_chat_completion(
+                "recommendation.reranker",
+                self.client,
+                # unparseable answers are retried next time, not cached
+                validate=lambda answer: parse_selection(answer.strip(), len(products)),
                 model=MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0,
-            )
-
-            text = response.choices[0].message.content.strip()
+            ).strip()
 
             # -------------------------
             # Parse output safely
             # -------------------------
-            indices = []
-
-            for x in text.replace(" ", "").split(","):
-                if x.isdigit():
-                    idx = int(x) - 1
-                    if 0 <= idx < len(products):
-                        indices.append(idx)
+            indices = parse_selection(text, len(products))
 
             # fallback if parsing fails
             if not indices:
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from agents.profile.agent import run_profile_agent
@@ -23,7 +24,7 @@ def print_recommendations(recs):
         print()
 
 
-def main():
+def main(runner: asyncio.Runner):
     print("\n🛒 AI Shopping Assistant")
     print("Type 'exit' to quit")
     print("Type 'reset' to start a new search\n")
@@ -99,10 +100,12 @@ def main():
         # -----------------------------
         # FOLLOW-UP → Chat Handler
         # -----------------------------
-        response = chat_handler.handle(
-            user_message=user_input,
-            current_profile=current_profile_data,
-            current_recommendations=current_recommendations,
+        response = runner.run(
+            chat_handler.handle(
+                user_message=user_input,
+                current_profile=current_profile_data,
+                current_recommendations=current_recommendations,
+            )
         )
 
         response_type = response.get("type")
@@ -129,4 +132,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # one event loop per session, so async clients keep their connections
+    with asyncio.Runner() as runner:
+        main(runner)
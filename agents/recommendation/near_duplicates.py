@@ -0,0 +1,205 @@
+"""
+MinHash/LSH near-duplicate clustering of catalog products.
+
+Products that differ only in variant attributes (colour, storage or RAM
+capacity) or in seller wording get the same `cluster_id` at ingestion,
+so diversity selection can skip a cluster once one member is shown.
+
+Signatures hash title word unigrams and bigrams, after dropping variant
+tokens, plus model-number-like tokens from the specs. With BANDS x ROWS
+banding, pairs whose estimated Jaccard similarity is above ~0.5 share at
+least one band key with high probability; candidates sharing a band are
+confirmed against SIMILARITY_THRESHOLD.
+"""
+
+import os
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import xxhash
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+SIMILARITY_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.7"))
+
+# fixed seed: signatures are persisted and compared across processes
+_rng = np.random.default_rng(20240601)
+# multiply-shift hashing: odd 64-bit multipliers, wrapping uint64 arithmetic
+_A = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_CAPACITY_RE = re.compile(r"^\d+(?:\.\d+)?(?:gb|tb|mb|mah|w)$")
+_CAPACITY_UNITS = {"gb", "tb", "mb", "mah", "w"}
+_MODEL_RE = re.compile(r"^(?=.*\d)(?=.*[a-z])[a-z\d]{3,}$")
+
+COLOURS = {
+    "black", "white", "silver", "gray", "grey", "blue", "red", "green", "gold",
+    "pink", "purple", "yellow", "orange", "beige", "brown", "navy", "midnight",
+    "starlight", "graphite", "titanium", "natural", "space", "rose", "sky",
+    "lavender", "mint", "cream", "teal", "violet", "bronze", "champagne",
+}
+STOPWORDS = {"and", "with", "for", "the", "of", "in", "a", "an", "by", "new", "version"}
+
+_MAX_SPEC_TOKENS = 20
+
+
+def _title_tokens(title: str) -> List[str]:
+    tokens = _WORD_RE.findall(title.lower())
+    kept = []
+
+    for i, token in enumerate(tokens):
+        following = tokens[i + 1] if i + 1 < len(tokens) else ""
+
+        if token in COLOURS or token in STOPWORDS or _CAPACITY_RE.match(token):
+            continue
+
+        # "256 GB" is a capacity just like "256GB"
+        if token.isdigit() and following in _CAPACITY_UNITS:
+            continue
+        if token in _CAPACITY_UNITS and i and tokens[i - 1].isdigit():
+            continue
+
+        kept.append(token)
+
+    return kept
+
+
+def product_shingles(product: Dict[str, Any]) -> Set[str]:
+    """
+    Shingles describing a product independently of its variant.
+    """
+    tokens = _title_tokens(product.get("title") or "")
+    shingles = set(tokens)
+    shingles.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    # model numbers in the specs (e.g. "i7", "13620h", "rtx4060")
+    specs = _WORD_RE.findall((product.get("details_text") or "").lower())
+    models = [t for t in specs if _MODEL_RE.match(t) and not _CAPACITY_RE.match(t)]
+    shingles.update(f"#{token}" for token in models[:_MAX_SPEC_TOKENS])
+
+    return shingles
+
+
+def minhash_signature(shingles: Iterable[str]) -> Optional[np.ndarray]:
+    """
+    NUM_PERM-value uint32 MinHash signature, or None without shingles.
+    """
+    hashes = np.fromiter(
+        (xxhash.xxh3_64_intdigest(s.encode("utf-8")) for s in shingles), dtype=np.uint64
+    )
+
+    if not len(hashes):
+        return None
+
+    # high 32 bits of (a * x + b) mod 2**64, one column per permutation
+    permuted = (hashes[:, None] * _A + _B) >> _SHIFT
+
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> List[int]:
+    """
+    One LSH bucket key per band; non-negative so they fit a BSON int64.
+    """
+    return [
+        xxhash.xxh3_64_intdigest(signature[b * ROWS : (b + 1) * ROWS].tobytes(), seed=b) >> 1
+        for b in range(BANDS)
+    ]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def new_cluster_id(link: str) -> int:
+    return xxhash.xxh3_64_intdigest(link.encode("utf-8")) >> 1
+
+
+def pack_signature(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+
+def unpack_signature(raw: bytes) -> np.ndarray:
+    return np.frombuffer(raw, dtype="<u4")
+
+
+class ClusterIndex:
+    """
+    In-memory LSH tables used to assign cluster ids.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: Dict[int, List[str]] = defaultdict(list)
+        # link -> (signature, cluster_id)
+        self._entries: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, link: str, signature: np.ndarray, cluster_id: int) -> None:
+        if link in self._entries:
+            self.discard(link)
+
+        self._entries[link] = (signature, cluster_id)
+
+        for key in band_keys(signature):
+            self._buckets[key].append(link)
+
+    def discard(self, link: str) -> None:
+        entry = self._entries.pop(link, None)
+
+        if entry is None:
+            return
+
+        for key in band_keys(entry[0]):
+            bucket = self._buckets[key]
+            if link in bucket:
+                bucket.remove(link)
+
+    def match(self, signature: np.ndarray) -> Optional[int]:
+        """
+        Cluster id of the most similar indexed product above the threshold.
+        """
+        best_score, best_cluster = self.threshold, None
+        seen = set()
+
+        for key in band_keys(signature):
+            for link in self._buckets.get(key, ()):
+                if link in seen:
+                    continue
+                seen.add(link)
+
+                other, cluster_id = self._entries[link]
+                score = similarity(signature, other)
+
+                if score >= best_score:
+                    best_score, best_cluster = score, cluster_id
+
+        return best_cluster
+
+    def assign(self, link: str, signature: Optional[np.ndarray]) -> int:
+        """
+        Join the best matching cluster, or found a new one.
+        """
+        if signature is None:
+            return new_cluster_id(link)
+
+        self.discard(link)
+
+        cluster_id = self.match(signature)
+        if cluster_id is None:
+            cluster_id = new_cluster_id(link)
+
+        self.add(link, signature, cluster_id)
+
+        return cluster_id
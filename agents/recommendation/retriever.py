@@ -1,23 +1,110 @@
 from typing import List, Dict, Any, Optional
+import hashlib
 import logging
+import os
+import threading
 
-from Data_Base.db import get_collection
+import numpy as np
+
+from agents.recommendation.catalog_snapshot import get_catalog_snapshot
 from agents.recommendation.vector_index import ProductVectorIndex
+from agents.shared.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+CACHE_SIZE = int(os.getenv("RETRIEVER_CACHE_SIZE", "256"))
+CACHE_TTL_SECONDS = float(os.getenv("RETRIEVER_CACHE_TTL_SECONDS", "300"))
+
+
+def _digest(values) -> bytes:
+    array = np.ascontiguousarray(values)
+    return hashlib.blake2b(
+        array.tobytes(), digest_size=16, person=array.dtype.str.encode()
+    ).digest()
+
 
 class ProductRetriever:
     """
-    Hybrid retriever:
-    1) Hard filter using Mongo (price + type)
+    Hybrid retriever over the shared catalog snapshot:
+    1) Hard filter on snapshot columns (price + type)
     2) Optional FAISS narrowing
     """
 
     def __init__(self):
-        self.collection = get_collection()
         self.vector_index = ProductVectorIndex()
-        self.cache = {}
+        # vector and filter queries; bounded, expiring and dropped on catalog change
+        self.cache = LRUCache(CACHE_SIZE, ttl=CACHE_TTL_SECONDS)
+        self.cache_version = None
+        self._cache_lock = threading.Lock()
+        self.invalidations = 0
+
+    def _sync_cache_version(self, version: int) -> int:
+        """
+        Drop cached results once ingestion has bumped the catalog version.
+        """
+        with self._cache_lock:
+            if self.cache_version is not None and version != self.cache_version:
+                self.cache.clear()
+                self.invalidations += 1
+                logger.info(
+                    f"[Retriever] Catalog v{self.cache_version} -> v{version}, cache cleared"
+                )
+
+            self.cache_version = version
+
+        return version
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.cache.stats(),
+            catalog_version=self.cache_version,
+            invalidations=self.invalidations,
+        )
+
+    def vector_links(
+        self,
+        user_embedding,
+        product_type: Optional[str] = None,
+        top_k: int = 50,
+        snapshot=None,
+        rows=None,
+        vector_index=None,
+    ) -> List[str]:
+        """
+        Nearest product links from the catalog-wide FAISS index,
+        optionally restricted to the given snapshot rows.
+
+        A prebuilt `vector_index` (from an IndexSnapshot) is searched as
+        is; otherwise the retriever's own index is built on demand.
+        Results are cached per catalog version, keyed by a digest of the
+        embedding and row filter.
+        """
+        if vector_index is None:
+            vector_index = self.vector_index
+            vector_index.build(snapshot=snapshot)
+
+        cache_key = (
+            self._sync_cache_version(vector_index.catalog_version),
+            "vector",
+            product_type,
+            top_k,
+            _digest(user_embedding),
+            None if rows is None else _digest(rows),
+        )
+
+        cached = self.cache.get(cache_key)
+
+        if cached is not None:
+            logger.info("[Retriever] Returning cached vector links")
+            return list(cached)
+
+        links = vector_index.search(
+            user_embedding, top_k=top_k, product_type=product_type, rows=rows
+        )
+
+        self.cache.put(cache_key, tuple(links))
+
+        return links
 
     def retrieve_candidates(
         self,
@@ -29,69 +116,61 @@ class ProductRetriever:
         vector_k: int = 100,  # 🔥 NEW
     ) -> List[Dict[str, Any]]:
 
-        query = {"product.embedding": {"$exists": True}}
-
-        if product_type:
-            query["product.product_type"] = {"$eq": product_type}
-
-        if price_min is not None or price_max is not None:
-            query["product.price"] = {}
-
-            if price_min is not None:
-                query["product.price"]["$gte"] = price_min
-
-            if price_max is not None:
-                query["product.price"]["$lte"] = price_max
-
-        projection = {
-            "_id": 0,
-            "product.title": 1,
-            "product.price": 1,
-            "product.link": 1,
-            "product.details_text": 1,
-            "product.seller_score": 1,
-            "product.category": 1,
-            "product.embedding": 1,
-            "product.product_type": 1,
-        }
+        snapshot = get_catalog_snapshot()
 
         # ---------------------------
         # FAISS vector narrowing
         # ---------------------------
         if user_embedding is not None:
-            self.vector_index.build(product_type)
-
-            links = self.vector_index.search(user_embedding, top_k=vector_k)
-
-            if links:
-                query["product.link"] = {"$in": links}
-            else:
+            # one catalog-wide index; type/price are applied as ID filters
+            self.vector_index.build(snapshot=snapshot)
+
+            rows = self.vector_index.search_rows(
+                user_embedding,
+                top_k=vector_k,
+                product_type=product_type,
+                price_min=price_min,
+                price_max=price_max,
+                snapshot=snapshot,
+            )
+
+            if not len(rows):
                 logger.warning(
                     "[Retriever] FAISS returned no results, skipping vector filter"
                 )
+                rows = snapshot.rows_for(product_type, price_min, price_max)
+
+            results = [{"product": p} for p in snapshot.products(rows[:limit])]
+
+            logger.info(f"[Retriever] Retrieved {len(results)} candidates")
+
+            return results
 
         # ---------------------------
         # Cache (only non-embedding queries)
         # ---------------------------
         cache_key = (
+            self._sync_cache_version(snapshot.version),
             product_type,
-            int(price_min) if price_min else None,
-            int(price_max) if price_max else None,
+            price_min,
+            price_max,
+            limit,
         )
 
-        if user_embedding is None and cache_key in self.cache:
+        cached = self.cache.get(cache_key)
+
+        if cached is not None:
             logger.info("[Retriever] Returning cached results")
-            return self.cache[cache_key]
+            return cached
 
         # ---------------------------
-        # Mongo query
+        # Snapshot filter (no MongoDB round trip)
         # ---------------------------
-        cursor = self.collection.find(query, projection).limit(limit)
+        rows = snapshot.rows_for(product_type, price_min, price_max)[:limit]
 
-        results = list(cursor)
+        results = [{"product": p} for p in snapshot.products(rows)]
 
-        if user_embedding is None:
-            self.cache[cache_key] = results
+        self.cache.put(cache_key, results)
 
         logger.info(f"[Retriever] Retrieved {len(results)} candidates")
 
@@ -1,6 +1,10 @@
 from typing import List, Dict, Any
 import numpy as np
 
+from Data_Base.embedding_codec import decode_embeddings
+from agents.recommendation.candidate_pool import CandidatePool
+from agents.recommendation.topk import top_k_indices
+
 
 class ProductScorer:
     """
@@ -9,50 +13,58 @@ class ProductScorer:
     - Price alignment
     - Adaptive budget penalty
     - Priority-aware weighting
+
+    All candidates are scored at once: embeddings are stacked into one
+    float32 matrix and every term is an array expression.
     """
 
     def __init__(self, user_id: str):
         self.user_id = user_id
 
-    def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
-        return float(np.dot(a, b))
+    def _semantic_scores(
+        self, embeddings: np.ndarray, user_embedding: np.ndarray
+    ) -> np.ndarray:
+        # embeddings are normalized, so the dot product is the cosine
+        return embeddings @ np.asarray(user_embedding, dtype=np.float32)
 
-    def _price_score(
+    def _price_scores(
         self,
-        product_price: float,
+        prices: np.ndarray,
         user_min: float | None,
         user_max: float | None,
-    ) -> float:
+    ) -> np.ndarray:
+        """
+        prices: float64 array, NaN where the product has no price.
+        """
 
-        if product_price is None:
-            return 0.0
+        missing = np.isnan(prices)
 
         if user_max is None or user_max <= 0:
-            return 0.5
+            return np.where(missing, 0.0, 0.5)
 
         # 🔥 prefer prices closer to upper budget (better quality)
-        ratio = product_price / user_max
+        ratio = prices / user_max
 
-        if ratio <= 1:
-            # within budget → higher is better
-            return 0.5 + 0.5 * ratio  # range: 0.5 → 1.0
+        scores = np.where(
+            ratio <= 1,
+            0.5 + 0.5 * ratio,  # within budget → range: 0.5 → 1.0
+            np.maximum(0.0, 1 - (ratio - 1)),  # above budget → decrease score
+        )
 
-        else:
-            # above budget → decrease score
-            return max(0.0, 1 - (ratio - 1))
+        return np.where(missing, 0.0, scores)
 
-    def _budget_penalty(
+    def _budget_penalties(
         self,
-        price: float,
+        prices: np.ndarray,
         budget_max: float | None,
         priorities: Dict[str, float] | None,
-    ) -> float:
+    ) -> np.ndarray:
         """
         Penalize products above budget with adaptive tolerance.
         """
 
-        if not budget_max or not price:
-            return 0.0
+        if not budget_max:
+            return np.zeros(len(prices))
 
         performance_priority = (priorities or {}).get("performance", 0)
         price_priority = (priorities or {}).get("price", 0)
@@ -68,88 +80,129 @@ class ProductScorer:
 
         max_allowed = budget_max * (1 + base_tolerance)
 
-        if price <= budget_max:
-            return 0.0
+        # mild penalty inside the tolerance band, strong penalty beyond it
+        overflow_ratio = (prices - budget_max) / (max_allowed - budget_max)
 
-        elif price <= max_allowed:
-            # mild penalty
-            overflow_ratio = (price - budget_max) / (max_allowed - budget_max)
-            return -0.2 * overflow_ratio
+        penalties = np.where(
+            prices <= budget_max,
+            0.0,
+            np.where(prices <= max_allowed, -0.2 * overflow_ratio, -0.8),
+        )
 
-        else:
-            # strong penalty
-            return -0.8
+        # no price (or a zero price) is never penalized
+        unpriced = np.isnan(prices) | (prices == 0)
 
-    def rank_products(
+        return np.where(unpriced, 0.0, penalties)
+
+    def _weights(self, priorities: Dict[str, float] | None) -> tuple[float, float]:
+        semantic_w = 0.6
+        price_w = 0.4
+
+        if priorities:
+            perf = priorities.get("performance", 0)
+            price_p = priorities.get("price", 0)
+
+            if perf > 0.7:
+                semantic_w = 0.75
+                price_w = 0.25
+
+            elif price_p > 0.7:
+                semantic_w = 0.4
+                price_w = 0.6
+
+        return semantic_w, price_w
+
+    def semantic_scores(
+        self, products: List[Dict[str, Any]], user_embedding: np.ndarray
+    ) -> np.ndarray:
+        """
+        Cosine similarity of each product (dict with `embedding`) to the query.
+        """
+        # one contiguous float32 matrix for all candidates
+        embeddings = decode_embeddings(product["embedding"] for product in products)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._semantic_scores(embeddings, user_embedding)
+
+    def score_pool(
+        self, products: List[Dict[str, Any]], user_embedding: np.ndarray
+    ) -> CandidatePool:
+        """
+        Candidate pool with semantic scores, reusable across refinements.
+        """
+        return CandidatePool.from_products(
+            products, self.semantic_scores(products, user_embedding)
+        )
+
+    def rank_pool(
         self,
-        products: List[Dict[str, Any]],
-        user_embedding: np.ndarray,
+        pool: CandidatePool,
         user_price_min: float | None = None,
         user_price_max: float | None = None,
         priorities: Dict[str, float] | None = None,
         top_k: int = 50,
     ) -> List[Dict[str, Any]]:
+        """
+        Apply the price, penalty and weight math to an already scored pool.
+        """
 
-        scored = []
-
-        for item in products:
-            product = item["product"]
-
-            embedding = np.array(product["embedding"])
-            semantic_sim = self._cosine_similarity(user_embedding, embedding)
+        if not len(pool):
+            return []
 
-            price = product.get("price")
+        items = pool.products
+        semantic = pool.semantic
+        prices = pool.prices
 
-            price_score = self._price_score(
-                price,
-                user_price_min,
-                user_price_max,
-            )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            price_scores = self._price_scores(prices, user_price_min, user_price_max)
 
             # -------------------------
-            # 🔥 Adaptive weights
+            # 🔥 Budget penalty
             # -------------------------
-            semantic_w = 0.6
-            price_w = 0.4
+            penalties = self._budget_penalties(prices, user_price_max, priorities)
+
+        # -------------------------
+        # 🔥 Adaptive weights
+        # -------------------------
+        semantic_w, price_w = self._weights(priorities)
+
+        # -------------------------
+        # Final score
+        # -------------------------
+        final_scores = (
+            semantic.astype(np.float64) * semantic_w + price_scores * price_w + penalties
+        )
+
+        # stable: equal scores keep candidate order
+        ranked = top_k_indices(final_scores, top_k)
+
+        return [
+            {
+                "title": items[i].get("title"),
+                "price": items[i].get("price"),
+                "link": items[i].get("link"),
+                "category": items[i].get("category"),
+                "cluster_id": items[i].get("cluster_id"),
+                "semantic_score": float(semantic[i]),
+                "price_score": float(price_scores[i]),
+                "final_score": float(final_scores[i]),
+            }
+            for i in ranked
+        ]
 
-            if priorities:
-                perf = priorities.get("performance", 0)
-                price_p = priorities.get("price", 0)
-
-                if perf > 0.7:
-                    semantic_w = 0.75
-                    price_w = 0.25
+    def rank_products(
+        self,
+        products: List[Dict[str, Any]],
+        user_embedding: np.ndarray,
+        user_price_min: float | None = None,
+        user_price_max: float | None = None,
+        priorities: Dict[str, float] | None = None,
+        top_k: int = 50,
+    ) -> List[Dict[str, Any]]:
 
-                elif price_p > 0.7:
-                    semantic_w = 0.4
-                    price_w = 0.6
+        if not products:
+            return []
 
-            # -------------------------
-            # 🔥 Budget penalty
-            # -------------------------
-            penalty = self._budget_penalty(
-                price,
-                user_price_max,
-                priorities,
-            )
+        pool = self.score_pool([item["product"] for item in products], user_embedding)
 
-            # -------------------------
-            # Final score
-            # -------------------------
-            final_score = semantic_sim * semantic_w + price_score * price_w + penalty
-
-            scored.append(
-                {
-                    "title": product.get("title"),
-                    "price": price,
-                    "link": product.get("link"),
-                    "category": product.get("category"),
-                    "semantic_score": semantic_sim,
-                    "price_score": price_score,
-                    "final_score": final_score,
-                }
-            )
-
-        scored.sort(key=lambda x: x["final_score"], reverse=True)
-
-        return scored[:top_k]
+        return self.rank_pool(pool, user_price_min, user_price_max, priorities, top_k)
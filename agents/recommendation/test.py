@@ -1,8 +1,10 @@
+import asyncio
+
 from agents.recommendation.agent import RecommendationAgent
 from agents.recommendation.chat_handler import RecommendationChatHandler
 
 
-def run_test():
+async def run_test():
     user_id = "test_user"
 
     # -----------------------------
@@ -36,7 +38,7 @@ def run_test():
 
     print("\n=== User says:", user_message, "===")
 
-    response = chat.handle(
+    response = await chat.handle(
         user_message=user_message,
         current_profile=profile,
         current_recommendations=recommendations,
@@ -55,4 +57,4 @@ def run_test():
 
 
 if __name__ == "__main__":
-    run_test()
+    asyncio.run(run_test())
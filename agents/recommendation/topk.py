@@ -0,0 +1,35 @@
+"""
+Top-k selection helpers shared by the retrieval and scoring stages.
+"""
+
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+
+    Equivalent to a stable descending sort truncated to k (ties keep their
+    original order), but selects with argpartition in O(n) and only sorts
+    the k winners.
+    """
+    n = len(scores)
+
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+
+    # k-th best value; everything strictly above it is always selected
+    kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: k - len(above)]
+
+    selected = np.concatenate([above, ties])
+
+    # sort winners by score desc, then original position
+    order = np.lexsort((selected, -scores[selected]))
+
+    return selected[order]
@@ -1,108 +1,427 @@
+import json
 import logging
+import math
+import os
+import threading
 
 import faiss
 import numpy as np
-from Data_Base.db import get_collection
+from filelock import FileLock
+
+from agents.recommendation.catalog_snapshot import get_catalog_snapshot
+from agents.recommendation.disk_store import INDEX_ROOT
 
 logger = logging.getLogger(__name__)
 
+FAISS_ROOT = INDEX_ROOT / "faiss" / "catalog"
+
+INDEX_MODES = ("flat", "ivfpq", "hnsw")
+INDEX_MODE = os.getenv("FAISS_INDEX_MODE", "flat").strip().lower()
+
+# search-time accuracy/speed knobs
+IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", "16"))
+HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+
+# FAISS needs ~39 training points per centroid; PQ8 has 256 centroids
+PQ_MIN_TRAIN = 39 * 256
+MAX_TRAIN = 100_000
+
+KEEP_VERSIONS = 2
+
+
+def _pq_subquantizers(dim):
+    """
+    Number of PQ sub-vectors (8 dims each where possible).
+    """
+    for m in (dim // 8, 48, 32, 24, 16, 8, 4, 2, 1):
+        if m and dim % m == 0:
+            return m
+    return 1
+
+
+def create_index(mode, dim, num_vectors):
+    """
+    Create an empty FAISS index for cosine similarity (normalized vectors).
+
+    Returns (index, effective_mode, train_size). train_size is the number of
+    vectors to collect before calling index.train(), or 0 when no training
+    is needed. IVF-PQ falls back to Flat when the catalog is too small to
+    train it.
+    """
+    if mode not in INDEX_MODES:
+        raise ValueError(f"Unknown FAISS index mode: {mode}")
+
+    if mode == "hnsw":
+        index = faiss.index_factory(dim, f"HNSW{HNSW_M},Flat", faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        return index, "hnsw", 0
+
+    if mode == "ivfpq" and num_vectors >= PQ_MIN_TRAIN:
+        nlist = max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+        m = _pq_subquantizers(dim)
+
+        index = faiss.index_factory(dim, f"IVF{nlist},PQ{m}", faiss.METRIC_INNER_PRODUCT)
+
+        train_size = min(num_vectors, max(PQ_MIN_TRAIN, nlist * 39), MAX_TRAIN)
+        return index, "ivfpq", train_size
+
+    if mode == "ivfpq":
+        logger.info(
+            f"[FAISS] {num_vectors} vectors is too few to train IVF-PQ, using Flat"
+        )
+
+    return faiss.IndexFlatIP(dim), "flat", 0
+
+
+def search_parameters(mode, selector=None):
+    """
+    Per-query FAISS parameters: optional ID selector plus nprobe / efSearch.
+    """
+    if mode == "ivfpq":
+        return faiss.SearchParametersIVF(sel=selector, nprobe=IVF_NPROBE)
+
+    if mode == "hnsw":
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=HNSW_EF_SEARCH)
+
+    return faiss.SearchParameters(sel=selector)
+
+
+def _mmap_flag(mode):
+    # IVF inverted lists and flat code storage use different mmap hooks
+    if mode == "ivfpq":
+        return faiss.IO_FLAG_MMAP
+    return getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
 
 class ProductVectorIndex:
     """
     FAISS-based vector index for semantic product search.
-    Builds once per product_type and reuses in memory.
+
+    One index covers the whole catalog snapshot and uses snapshot rows as
+    vector ids. Rows are grouped by product type, so a type restriction
+    is an IDSelectorRange and a price restriction an IDSelectorBitmap:
+    switching product types never rebuilds anything.
+
+    The index type is chosen by FAISS_INDEX_MODE (flat, ivfpq, hnsw).
+    Built indexes are persisted per catalog version and always served
+    memory-mapped, so restarts and other workers share one copy.
     """
 
-    def __init__(self):
-        self.collection = get_collection()
-        self.index = None
-        self.product_links = []
-        self.product_type = None
+    def __init__(self, mode=None):
+        self.mode = (mode or INDEX_MODE).lower()
+
+        if self.mode not in INDEX_MODES:
+            raise ValueError(f"Unknown FAISS index mode: {self.mode}")
+
+        # (index, index_mode, snapshot), swapped as one so concurrent
+        # searches never pair an index with another snapshot's rows
+        self._state = (None, None, None)
+        # one instance is shared by concurrent requests
+        self._build_lock = threading.Lock()
+
+    @property
+    def index(self):
+        return self._state[0]
+
+    @property
+    def index_mode(self):
+        return self._state[1]
 
-    def build(self, product_type=None, force_rebuild=False):
+    @property
+    def snapshot(self):
+        return self._state[2]
+
+    @property
+    def catalog_version(self):
+        return self.snapshot.version if self.snapshot is not None else None
+
+    @property
+    def product_links(self):
+        return self.snapshot.links if self.snapshot is not None else []
+
+    def _paths(self, version):
+        stem = f"v{version:08d}-{self.mode}"
+        return FAISS_ROOT / f"{stem}.faiss", FAISS_ROOT / f"{stem}.json"
+
+    def build(self, product_type=None, force_rebuild=False, snapshot=None):
         """
-        Build FAISS index from stored product embeddings.
+        Load or build the FAISS index for a catalog snapshot.
 
         Args:
-            product_type: filter products by type
+            product_type: accepted for compatibility; the index covers all
+                types and is filtered at search time
             force_rebuild: force rebuilding index even if already built
+            snapshot: catalog snapshot to index (defaults to the current one)
         """
 
-        # Skip rebuild if already built for same type
-        if (
-            not force_rebuild
-            and self.index is not None
-            and self.product_type == product_type
-        ):
-            logger.info("[FAISS] Reusing existing index")
+        snapshot = snapshot or get_catalog_snapshot()
+
+        # Skip rebuild if already built for the same catalog
+        if not force_rebuild and self.index is not None and self.snapshot is snapshot:
             return
 
-        logger.info(f"[FAISS] Building index for type={product_type}")
+        with self._build_lock:
+            if not force_rebuild and self.index is not None and self.snapshot is snapshot:
+                return
+
+            self._build(snapshot, force_rebuild)
 
-        query = {"product.embedding": {"$exists": True}}
+    def _build(self, snapshot, force_rebuild):
+        version = snapshot.version
 
-        if product_type:
-            query["product.product_type"] = product_type
+        if not len(snapshot):
+            logger.warning("[FAISS] No embeddings found, index not built")
+            self._state = (None, None, snapshot)
+            return
+
+        paths = self._paths(version)
 
-        # Limit to avoid memory explosion (safe default)
-        cursor = self.collection.find(query).limit(5000)
+        if not force_rebuild and self._load(*paths, snapshot):
+            return
 
-        embeddings = []
-        self.product_links = []
+        FAISS_ROOT.mkdir(parents=True, exist_ok=True)
 
-        for doc in cursor:
-            product = doc["product"]
+        with FileLock(str(FAISS_ROOT / ".lock")):
+            # another worker may have built it while we waited
+            if not force_rebuild and self._load(*paths, snapshot):
+                return
 
-            embedding = product.get("embedding")
-            link = product.get("link")
+            logger.info(f"[FAISS] Building {self.mode} index (catalog v{version})")
 
-            if embedding is None or link is None:
-                continue
+            self._build_from_snapshot(snapshot)
+            self._persist(*paths)
+            self._cleanup()
 
-            embeddings.append(embedding)
-            self.product_links.append(link)
+        # swap the private build for the memory-mapped file other workers share
+        self._load(*paths, snapshot)
 
-        if len(embeddings) == 0:
-            logger.warning("[FAISS] No embeddings found, index not built")
-            self.index = None
-            return
+    def _build_from_snapshot(self, snapshot):
+        embeddings = snapshot.embeddings
+        total = len(snapshot)
 
-        embeddings = np.array(embeddings).astype("float32")
+        base, mode, train_size = create_index(self.mode, snapshot.dim, total)
 
-        dim = embeddings.shape[1]
+        if train_size:
+            # random sample across all types for IVF-PQ training
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(total, size=train_size, replace=False))
+            base.train(np.ascontiguousarray(embeddings[sample]))
 
-        self.index = faiss.IndexFlatIP(dim)  # cosine similarity (normalized vectors)
-        self.index.add(embeddings)
+        index = faiss.IndexIDMap(base)
+        index.add_with_ids(
+            np.ascontiguousarray(embeddings), np.arange(total, dtype=np.int64)
+        )
 
-        self.product_type = product_type
+        self._state = (index, mode, snapshot)
 
-        logger.info(f"[FAISS] Index built with {len(self.product_links)} products")
+        logger.info(
+            f"[FAISS] Index built with {total} products in "
+            f"{len(snapshot.type_ranges)} types (mode={mode})"
+        )
 
-    def search(self, query_embedding, top_k=50):
+    def _persist(self, index_path, meta_path):
+        meta = {
+            "mode": self.index_mode,
+            "catalog_version": self.catalog_version,
+            # ids are snapshot rows; the links pin which snapshot they belong to
+            "links": self.snapshot.links,
+        }
+
+        tmp_meta = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+        # the index file is written last; its presence marks a complete build
+        tmp_index = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        faiss.write_index(self.index, str(tmp_index))
+        os.replace(tmp_index, index_path)
+
+        logger.info(f"[FAISS] Persisted index to {index_path}")
+
+    def _load(self, index_path, meta_path, snapshot):
+        if not index_path.exists() or not meta_path.exists():
+            return False
+
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+
+            # built from a different snapshot of the same version (e.g. a
+            # write landed mid-build): row ids would not line up
+            if meta["links"] != snapshot.links:
+                logger.info(f"[FAISS] {index_path} does not match the snapshot, rebuilding")
+                return False
+
+            index = faiss.read_index(str(index_path), _mmap_flag(meta["mode"]))
+        except Exception as e:
+            logger.warning(f"[FAISS] Could not load {index_path}: {e}")
+            return False
+
+        self._state = (index, meta["mode"], snapshot)
+
+        logger.info(
+            f"[FAISS] Loaded {self.index_mode} index with "
+            f"{len(snapshot)} products from {index_path}"
+        )
+
+        return True
+
+    def _cleanup(self):
+        """
+        Drop persisted indexes for old catalog versions of this mode.
+        """
+        stems = sorted(
+            {path.stem for path in FAISS_ROOT.glob(f"v*-{self.mode}.faiss")},
+            reverse=True,
+        )
+
+        for stem in stems[KEEP_VERSIONS:]:
+            for suffix in (".faiss", ".json"):
+                try:
+                    (FAISS_ROOT / f"{stem}{suffix}").unlink()
+                except OSError:
+                    # still memory-mapped by a reader (Windows); retried later
+                    pass
+
+    def candidate_ids(
+        self, product_type=None, price_min=None, price_max=None, rows=None, snapshot=None
+    ):
+        """
+        Resolve type/price restrictions to an id range or id array.
+
+        `rows` optionally restricts the search to these snapshot rows
+        (e.g. products having every must-have feature). `snapshot`
+        defaults to the indexed one.
+
+        Returns None (no restriction), a (start, end) range, or an int64
+        array of ids. An empty array means nothing can match.
+        """
+        snapshot = snapshot or self.snapshot
+
+        if price_min is None and price_max is None:
+            if not product_type:
+                return None if rows is None else np.asarray(rows, dtype=np.int64)
+
+            span = snapshot.type_range(product_type)
+            if span is None:
+                return np.empty(0, dtype=np.int64)
+            if rows is None:
+                return span
+
+            rows = np.asarray(rows, dtype=np.int64)
+            return rows[(rows >= span[0]) & (rows < span[1])]
+
+        filtered = snapshot.rows_for(product_type, price_min, price_max)
+
+        if rows is None:
+            return filtered
+
+        return np.intersect1d(filtered, rows, assume_unique=True)
+
+    def _selector(self, candidates, size):
+        """
+        Build a FAISS ID selector; returns (selector, buffer to keep alive).
+        """
+        if candidates is None:
+            return None, None
+
+        if isinstance(candidates, tuple):
+            return faiss.IDSelectorRange(*candidates), None
+
+        mask = np.zeros(size, dtype=bool)
+        mask[candidates] = True
+        bits = np.packbits(mask, bitorder="little")
+
+        return faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits)), bits
+
+    def search_rows(
+        self,
+        query_embedding,
+        top_k=50,
+        product_type=None,
+        price_min=None,
+        price_max=None,
+        rows=None,
+        snapshot=None,
+    ):
+        """
+        Nearest snapshot rows, best first.
+
+        Pass the `snapshot` the caller will hydrate rows with: if the index
+        was swapped to another catalog version meanwhile, nothing is
+        returned rather than rows of a different snapshot.
+        """
+
+        return self._search_rows(
+            self._state, query_embedding, top_k, product_type, price_min, price_max, rows, snapshot
+        )
+
+    def _search_rows(
+        self, state, query_embedding, top_k, product_type, price_min, price_max, rows, expected
+    ):
+        index, index_mode, snapshot = state
+
+        if index is None:
+            logger.warning("[FAISS] Search called before index built")
+            return np.empty(0, dtype=np.int64)
+
+        if expected is not None and expected is not snapshot:
+            logger.info("[FAISS] Index moved to another catalog snapshot during the request")
+            return np.empty(0, dtype=np.int64)
+
+        candidates = self.candidate_ids(product_type, price_min, price_max, rows, snapshot)
+
+        if isinstance(candidates, np.ndarray) and not len(candidates):
+            logger.info("[FAISS] No products match the type/price restriction")
+            return np.empty(0, dtype=np.int64)
+
+        selector, _bits = self._selector(candidates, len(snapshot))
+
+        query_vector = np.array([query_embedding]).astype("float32")
+
+        scores, indices = index.search(
+            query_vector, top_k, params=search_parameters(index_mode, selector)
+        )
+
+        found = indices[0]
+
+        return found[(found >= 0) & (found < len(snapshot))]
+
+    def search(
+        self,
+        query_embedding,
+        top_k=50,
+        product_type=None,
+        price_min=None,
+        price_max=None,
+        rows=None,
+    ):
         """
         Search for similar products using FAISS.
 
         Args:
             query_embedding: user embedding vector
             top_k: number of results
+            product_type: restrict results to one product type
+            price_min / price_max: restrict results to a price range
+            rows: restrict results to these snapshot rows
 
         Returns:
             List of product links
         """
 
-        if self.index is None:
-            logger.warning("[FAISS] Search called before index built")
-            return []
-
-        query_vector = np.array([query_embedding]).astype("float32")
-
-        scores, indices = self.index.search(query_vector, top_k)
+        state = self._state
 
-        results = []
+        found = self._search_rows(
+            state, query_embedding, top_k, product_type, price_min, price_max, rows, None
+        )
 
-        for i in indices[0]:
-            if 0 <= i < len(self.product_links):
-                results.append(self.product_links[i])
+        links = state[2].links if state[2] is not None else []
+        results = [links[row] for row in found]
 
         logger.info(f"[FAISS] Returned {len(results)} results")
 
@@ -1,8 +1,8 @@
 from agents.reviews.youtube_service import search_youtube, get_transcripts_for_videos
 from agents.reviews.sentiment_analyzer import analyze_reviews
+from agents.shared.llm_clients import get_groq_client
 from agents.shared.product_name_extractor import extract_clean_product_name
-from groq import Groq
-import os
+from agents.shared.progress import no_progress, stream_chat_completion
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,8 +15,10 @@ class ReviewAgent:
         self.sources = []
         self.reviews_data = None
 
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = get_groq_client("reviews.agent")
         self.model = "llama-3.3-70b-versatile"
+        # stage / partial / token events for streaming endpoints
+        self.progress = no_progress
 
     def to_state(self) -> dict:
         return {
@@ -111,17 +113,12 @@ class ReviewAgent:
 
         query = f"{self.product} honest review"
 
+        self.progress("stage", {"stage": "searching", "product": self.product})
+
         videos = search_youtube(query)
 
         video_ids = [v["video_id"] for v in videos]
 
-        transcripts = get_transcripts_for_videos(video_ids[:3])
-
-        if not transcripts:
-            return "Could not fetch reviews."
-
-        result = analyze_reviews(self.product, transcripts)
-
         # attach YouTube sources
         sources = [
             {
@@ -132,6 +129,18 @@ class ReviewAgent:
             for v in videos[:3]
         ]
 
+        self.progress("partial", {"sources": sources})
+        self.progress("stage", {"stage": "transcripts", "count": len(video_ids[:3])})
+
+        transcripts = get_transcripts_for_videos(video_ids[:3])
+
+        if not transcripts:
+            return "Could not fetch reviews."
+
+        self.progress("stage", {"stage": "analyzing"})
+
+        result = analyze_reviews(self.product, transcripts, progress=self.progress)
+
         # merge into result
         if isinstance(result, dict):
             result["sources"] = sources
@@ -164,10 +173,12 @@ User question:
 Answer briefly and do NOT repeat the full review.
 """
 
-        response = self.client.chat.completions.create(
+        self.progress("stage", {"stage": "answering"})
+
+        return stream_chat_completion(
+            self.client,
+            self.progress,
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
-        )
-
-        return response.choices[0].message.content.strip()
+        ).strip()
@@ -1,16 +1,17 @@
-from groq import Groq
-import os
 from dotenv import load_dotenv
 import json
 
+from agents.shared.llm_clients import get_groq_client
+from agents.shared.progress import no_progress, stream_chat_completion
+
 load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+client = get_groq_client("reviews.sentiment")
 
 MODEL = "llama-3.3-70b-versatile"
 
 
-def analyze_reviews(product_name, transcripts):
+def analyze_reviews(product_name, transcripts, progress=no_progress):
 
     combined = " ".join(transcripts[:2])[:6000]
 
@@ -45,12 +46,14 @@ RULES:
 - Keep it concise
 """
 
-    response = client.chat.completions.create(
-        model=MODEL, messages=[{"role": "user", "content": prompt}], temperature=0.3
+    raw = stream_chat_completion(
+        client,
+        progress,
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.3,
     )
 
-    raw = response.choices[0].message.content
-
     try:
         start = raw.find("{")
         end = raw.rfind("}") + 1
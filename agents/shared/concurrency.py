@@ -0,0 +1,58 @@
+"""
+Running blocking work from async code.
+
+Async request handlers await LLM and MongoDB I/O directly. Work that is
+still synchronous (embedding and retrieval, the LangChain profile graph,
+the Tavily / YouTube SDKs used by the review and comparison agents) goes
+through run_blocking(), which runs it on worker threads bounded by one
+limiter of BLOCKING_THREADS tokens instead of Starlette's default 40:
+
+    products = await run_blocking(agent.recommend, profile)
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+from typing import Any, Callable, Optional, TypeVar
+
+import anyio.to_thread
+from anyio import CapacityLimiter
+
+BLOCKING_THREADS = int(os.getenv("BLOCKING_THREADS", "64"))
+
+T = TypeVar("T")
+
+_LIMITER: Optional[CapacityLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_blocking_limiter() -> CapacityLimiter:
+    global _LIMITER
+
+    if _LIMITER is None:
+        with _LIMITER_LOCK:
+            if _LIMITER is None:
+                _LIMITER = CapacityLimiter(BLOCKING_THREADS)
+
+    return _LIMITER
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Await func(*args, **kwargs) on a worker thread.
+    """
+    call = functools.partial(func, *args, **kwargs)
+
+    return await anyio.to_thread.run_sync(call, limiter=get_blocking_limiter())
+
+
+def blocking_stats() -> dict:
+    limiter = get_blocking_limiter()
+
+    return {
+        "threads": limiter.total_tokens,
+        "busy": limiter.borrowed_tokens,
+        "waiting": limiter.statistics().tasks_waiting,
+    }
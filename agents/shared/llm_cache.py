@@ -0,0 +1,384 @@
+"""
+Content-addressed cache for deterministic (temperature 0) LLM calls.
+
+The key is a SHA-256 of the request: model, messages and every other
+parameter. A response is looked up in two tiers:
+
+1. an in-process LRU per call site, with that site's TTL
+2. the shared MongoDB `api_cache` TTL collection (Data_Base/cache_repo.py),
+   so workers and restarts reuse each other's answers
+
+Call sites opt in by routing their call through get_or_call(), or
+cached_chat_completion() for Groq SDK clients (aget_or_call() /
+acached_chat_completion() from async code); each has its own TTL in
+SITE_TTLS and its own hit/miss counters (llm_cache_stats()). Only
+requests with an explicit `temperature=0` are cached (Groq samples at
+temperature 1 by default); anything else is passed through uncached.
+
+Callers pass `validate`, usually their response parser, so an answer
+they can't use (malformed JSON, no products) is returned once but never
+cached: the next identical request asks the LLM again.
+
+LLM_CACHE_ENABLED=0 disables caching, LLM_CACHE_MONGO=0 keeps it
+in-process only and LLM_CACHE_SIZE bounds each site's LRU.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from Data_Base.cache_repo import (
+    get_cache_entry,
+    get_cache_entry_async,
+    upsert_cache_entry,
+    upsert_cache_entry_async,
+)
+from agents.shared.lru_cache import LRUCache
+
+Validator = Callable[[str], Any]
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+MONGO_ENABLED = os.getenv("LLM_CACHE_MONGO", "1").strip().lower() not in ("0", "false", "no")
+MEMORY_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+
+KEY_VERSION = "v1"
+DEFAULT_TTL = 60 * 60
+
+# seconds a cached answer stays valid, per call site
+SITE_TTLS = {
+    # product lists and scores move with the catalog
+    "recommendation.reranker": 6 * 60 * 60,
+    "recommendation.intent_router": 24 * 60 * 60,
+    "search_pipeline.extractor": 60 * 60,
+    # title normalization does not go stale
+    "shared.product_name_extractor": 7 * 24 * 60 * 60,
+}
+
+# after a MongoDB error, skip the shared tier for this long
+_MONGO_RETRY_SECONDS = 60
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    Content address of an LLM request (model, messages, parameters).
+    """
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    return f"llm:{KEY_VERSION}:{digest}"
+
+
+class SiteCacheMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.rejected = 0
+        self.mongo_errors = 0
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.mongo_hits + self.misses
+            hits = self.memory_hits + self.mongo_hits
+
+            return {
+                "memory_hits": self.memory_hits,
+                "mongo_hits": self.mongo_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "rejected": self.rejected,
+                "mongo_errors": self.mongo_errors,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+            }
+
+
+class LLMResponseCache:
+    """
+    Two-tier response cache. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, int]] = None,
+        memory_size: int = MEMORY_SIZE,
+        use_mongo: bool = MONGO_ENABLED,
+        enabled: bool = ENABLED,
+    ):
+        self.ttls = dict(SITE_TTLS if ttls is None else ttls)
+        self.memory_size = memory_size
+        self.use_mongo = use_mongo
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._memory: Dict[str, LRUCache] = {}
+        self._metrics: Dict[str, SiteCacheMetrics] = {}
+        self._mongo_down_until = 0.0
+
+    def ttl(self, site: str) -> int:
+        return self.ttls.get(site, DEFAULT_TTL)
+
+    def _site(self, site: str) -> tuple:
+        with self._lock:
+            memory = self._memory.get(site)
+
+            if memory is None:
+                memory = self._memory[site] = LRUCache(self.memory_size, ttl=self.ttl(site))
+                self._metrics[site] = SiteCacheMetrics()
+
+            return memory, self._metrics[site]
+
+    def _mongo_available(self) -> bool:
+        return self.use_mongo and time.monotonic() >= self._mongo_down_until
+
+    def _mongo_failed(self, metrics: SiteCacheMetrics, action: str, error: Exception) -> None:
+        metrics.count("mongo_errors")
+        self._mongo_down_until = time.monotonic() + _MONGO_RETRY_SECONDS
+        logger.warning(f"[LLMCache] MongoDB {action} failed, using memory only: {error}")
+
+    def _mongo_get(self, key: str, metrics: SiteCacheMetrics) -> Optional[str]:
+        try:
+            entry = get_cache_entry(key)
+        except Exception as e:
+            self._mongo_failed(metrics, "lookup", e)
+            return None
+
+        return _entry_content(entry)
+
+    async def _mongo_get_async(self, key: str, metrics: SiteCacheMetrics) -> Optional[str]:
+        try:
+            entry = await get_cache_entry_async(key)
+        except Exception as e:
+            self._mongo_failed(metrics, "lookup", e)
+            return None
+
+        return _entry_content(entry)
+
+    def _entry(self, key: str, site: str, request: Dict[str, Any], content: str) -> Dict[str, Any]:
+        fingerprint = {
+            name: value for name, value in request.items() if name != "messages"
+        }
+
+        return {
+            "cache_key": key,
+            "namespace": f"llm:{site}",
+            "request_fingerprint": fingerprint,
+            "response": {"content": content},
+            "ttl_seconds": self.ttl(site),
+        }
+
+    def _mongo_put(self, key: str, site: str, request: Dict[str, Any], content: str, metrics) -> None:
+        try:
+            upsert_cache_entry(**self._entry(key, site, request, content))
+        except Exception as e:
+            self._mongo_failed(metrics, "write", e)
+
+    async def _mongo_put_async(
+        self, key: str, site: str, request: Dict[str, Any], content: str, metrics
+    ) -> None:
+        try:
+            await upsert_cache_entry_async(**self._entry(key, site, request, content))
+        except Exception as e:
+            self._mongo_failed(metrics, "write", e)
+
+    def _cacheable(self, request: Dict[str, Any]) -> bool:
+        # a missing temperature means the provider's default (1 for Groq)
+        return self.enabled and request.get("temperature") == 0
+
+    def _storable(
+        self, site: str, metrics: SiteCacheMetrics, content: Optional[str], validate
+    ) -> bool:
+        """
+        True when a fresh response may be cached: not None and, if the
+        caller gave a validator, returning a truthy value without raising.
+        """
+        if content is None:
+            return False
+
+        if validate is None:
+            return True
+
+        try:
+            valid = bool(validate(content))
+        except Exception:
+            valid = False
+
+        if not valid:
+            metrics.count("rejected")
+            logger.info(f"[LLMCache] {site} response failed validation, not cached")
+
+        return valid
+
+    def _memory_hit(self, memory: LRUCache, metrics: SiteCacheMetrics, key: str) -> Optional[str]:
+        content = memory.get(key)
+        if content is not None:
+            metrics.count("memory_hits")
+        return content
+
+    def get_or_call(
+        self,
+        site: str,
+        request: Dict[str, Any],
+        call: Callable[[], str],
+        validate: Optional[Validator] = None,
+    ) -> str:
+        """
+        Cached response text for `request`, calling the LLM on a miss.
+
+        `request` must hold everything that influences the answer (model,
+        messages, temperature, ...); `call()` performs the request and
+        returns the message content. Failed calls, and responses that
+        `validate(content)` rejects (falsy result or exception), are
+        returned but not cached.
+        """
+        memory, metrics = self._site(site)
+
+        if not self._cacheable(request):
+            metrics.count("bypassed")
+            return call()
+
+        key = request_key(request)
+
+        content = self._memory_hit(memory, metrics, key)
+        if content is not None:
+            return content
+
+        if self._mongo_available():
+            content = self._mongo_get(key, metrics)
+
+            if content is not None:
+                metrics.count("mongo_hits")
+                memory.put(key, content)
+                return content
+
+        metrics.count("misses")
+
+        content = call()
+
+        if self._storable(site, metrics, content, validate):
+            memory.put(key, content)
+
+            if self._mongo_available():
+                self._mongo_put(key, site, request, content, metrics)
+
+        return content
+
+    async def aget_or_call(
+        self,
+        site: str,
+        request: Dict[str, Any],
+        call: Callable[[], Awaitable[str]],
+        validate: Optional[Validator] = None,
+    ) -> str:
+        """
+        get_or_call() for async code: `call()` is a coroutine function and
+        the MongoDB tier uses the async client.
+        """
+        memory, metrics = self._site(site)
+
+        if not self._cacheable(request):
+            metrics.count("bypassed")
+            return await call()
+
+        key = request_key(request)
+
+        content = self._memory_hit(memory, metrics, key)
+        if content is not None:
+            return content
+
+        if self._mongo_available():
+            content = await self._mongo_get_async(key, metrics)
+
+            if content is not None:
+                metrics.count("mongo_hits")
+                memory.put(key, content)
+                return content
+
+        metrics.count("misses")
+
+        content = await call()
+
+        if self._storable(site, metrics, content, validate):
+            memory.put(key, content)
+
+            if self._mongo_available():
+                await self._mongo_put_async(key, site, request, content, metrics)
+
+        return content
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sites = dict(self._metrics)
+
+        return {
+            site: dict(metrics.snapshot(), ttl_seconds=self.ttl(site))
+            for site, metrics in sorted(sites.items())
+        }
+
+
+def _entry_content(entry: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not entry:
+        return None
+
+    return (entry.get("response") or {}).get("content")
+
+
+_CACHE: Optional[LLMResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _CACHE
+
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = LLMResponseCache()
+
+    return _CACHE
+
+
+def cached_chat_completion(
+    site: str, client, validate: Optional[Validator] = None, **request
+) -> str:
+    """
+    client.chat.completions.create(**request) through the cache; returns
+    the first choice's message content.
+    """
+
+    def call():
+        response = client.chat.completions.create(**request)
+        return response.choices[0].message.content
+
+    return get_llm_cache().get_or_call(site, request, call, validate)
+
+
+async def acached_chat_completion(
+    site: str, client, validate: Optional[Validator] = None, **request
+) -> str:
+    """
+    cached_chat_completion() for an AsyncGroq client.
+    """
+
+    async def call():
+        response = await client.chat.completions.create(**request)
+        return response.choices[0].message.content
+
+    return await get_llm_cache().aget_or_call(site, request, call, validate)
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    return get_llm_cache().stats()
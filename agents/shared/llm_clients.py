@@ -0,0 +1,336 @@
+"""
+Process-wide LLM client registry.
+
+Every Groq call in the app goes through one httpx connection pool, so
+TLS handshakes and TCP connections are reused across agents and
+requests instead of being paid by each freshly constructed client.
+
+Clients are requested per call site (e.g. "recommendation.reranker").
+Each site gets its own thin httpx.Client (and Groq / ChatGroq wrapper)
+over the shared transport, which records per-site call counts, errors
+and latency:
+
+    client = get_groq_client("reviews.agent")
+    client.chat.completions.create(...)
+
+    llm_client_stats()  # {"pool": {...}, "sites": {"reviews.agent": {...}}}
+
+Async handlers use get_async_groq_client() / get_async_http_client(),
+which share a second (asyncio) pool with the same limits and report into
+the same per-site metrics. asyncio connections can't outlive the event
+loop that opened them, so that pool is kept per running loop: the server
+uses one, and a script calling asyncio.run() per turn gets a fresh pool
+each time instead of sockets from an already closed loop.
+
+Pool sizes come from LLM_POOL_MAX_CONNECTIONS, LLM_POOL_MAX_KEEPALIVE and
+LLM_POOL_KEEPALIVE_SECONDS; request timeouts from LLM_TIMEOUT_SECONDS.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from groq import AsyncGroq, Groq
+
+load_dotenv()
+
+MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+KEEPALIVE_SECONDS = float(os.getenv("LLM_POOL_KEEPALIVE_SECONDS", "60"))
+TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+
+class CallSiteMetrics:
+    """
+    Counters for one call site. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.http_errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, status: Optional[int] = None) -> None:
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+            if status is None:
+                self.errors += 1
+            elif status >= 400:
+                self.http_errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "http_errors": self.http_errors,
+                "avg_ms": round(1000 * self.total_seconds / self.calls, 1) if self.calls else None,
+                "max_ms": round(1000 * self.max_seconds, 1),
+            }
+
+
+class _MeteredTransport(httpx.BaseTransport):
+    """
+    Per-site view of the shared transport: records time to response
+    headers and never closes the shared pool.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, metrics: CallSiteMetrics):
+        self._transport = transport
+        self._metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+
+        try:
+            response = self._transport.handle_request(request)
+        except Exception:
+            self._metrics.record(time.perf_counter() - started)
+            raise
+
+        self._metrics.record(time.perf_counter() - started, response.status_code)
+
+        return response
+
+    def close(self) -> None:
+        # the registry owns the shared transport
+        pass
+
+
+class _AsyncMeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Async counterpart of _MeteredTransport. The shared transport is looked
+    up per request, for the event loop the request runs on.
+    """
+
+    def __init__(
+        self,
+        transport: Callable[[], httpx.AsyncBaseTransport],
+        metrics: CallSiteMetrics,
+    ):
+        self._transport = transport
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+
+        try:
+            response = await self._transport().handle_async_request(request)
+        except Exception:
+            self._metrics.record(time.perf_counter() - started)
+            raise
+
+        self._metrics.record(time.perf_counter() - started, response.status_code)
+
+        return response
+
+    async def aclose(self) -> None:
+        pass
+
+
+class LLMClientRegistry:
+    """
+    Shared keep-alive pool plus cached per-site clients.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive: int = MAX_KEEPALIVE,
+        keepalive_seconds: float = KEEPALIVE_SECONDS,
+        timeout: float = TIMEOUT_SECONDS,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_seconds,
+        )
+        self.timeout = timeout
+        self._transport = transport or httpx.HTTPTransport(limits=self.limits)
+        # injected transports (tests, benchmarks) are used on every loop
+        self._async_transport = async_transport
+        # event loop -> its async pool, dropped when the loop is collected
+        self._loop_transports = weakref.WeakKeyDictionary()
+
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, CallSiteMetrics] = {}
+        self._http: Dict[str, httpx.Client] = {}
+        self._groq: Dict[Tuple[str, Optional[str]], Groq] = {}
+        self._async_http: Dict[str, httpx.AsyncClient] = {}
+        self._async_groq: Dict[Tuple[str, Optional[str]], AsyncGroq] = {}
+
+    def async_transport(self) -> httpx.AsyncBaseTransport:
+        """
+        The shared async pool of the running event loop.
+        """
+        if self._async_transport is not None:
+            return self._async_transport
+
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            transport = self._loop_transports.get(loop)
+            if transport is None:
+                transport = self._loop_transports[loop] = httpx.AsyncHTTPTransport(
+                    limits=self.limits
+                )
+            return transport
+
+    def metrics(self, site: str) -> CallSiteMetrics:
+        with self._lock:
+            metrics = self._metrics.get(site)
+            if metrics is None:
+                metrics = self._metrics[site] = CallSiteMetrics()
+            return metrics
+
+    def http_client(self, site: str) -> httpx.Client:
+        """
+        httpx.Client for a call site, backed by the shared pool.
+        """
+        metrics = self.metrics(site)
+
+        with self._lock:
+            client = self._http.get(site)
+            if client is None:
+                client = self._http[site] = httpx.Client(
+                    transport=_MeteredTransport(self._transport, metrics),
+                    timeout=self.timeout,
+                )
+            return client
+
+    def groq(self, site: str, api_key: Optional[str] = None) -> Groq:
+        api_key = api_key or os.getenv("GROQ_API_KEY")
+        http_client = self.http_client(site)
+
+        with self._lock:
+            client = self._groq.get((site, api_key))
+            if client is None:
+                client = self._groq[(site, api_key)] = Groq(
+                    api_key=api_key, http_client=http_client
+                )
+            return client
+
+    def async_http_client(self, site: str) -> httpx.AsyncClient:
+        """
+        httpx.AsyncClient for a call site, backed by the shared async pool.
+        """
+        metrics = self.metrics(site)
+
+        with self._lock:
+            client = self._async_http.get(site)
+            if client is None:
+                client = self._async_http[site] = httpx.AsyncClient(
+                    transport=_AsyncMeteredTransport(self.async_transport, metrics),
+                    timeout=self.timeout,
+                )
+            return client
+
+    def async_groq(self, site: str, api_key: Optional[str] = None) -> AsyncGroq:
+        api_key = api_key or os.getenv("GROQ_API_KEY")
+        http_client = self.async_http_client(site)
+
+        with self._lock:
+            client = self._async_groq.get((site, api_key))
+            if client is None:
+                client = self._async_groq[(site, api_key)] = AsyncGroq(
+                    api_key=api_key, http_client=http_client
+                )
+            return client
+
+    def chat_groq(self, site: str, **kwargs):
+        """
+        langchain ChatGroq over the shared pool (one instance per call).
+        """
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(http_client=self.http_client(site), **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sites = dict(self._metrics)
+
+        pool = getattr(self._transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+
+        return {
+            "pool": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive": self.limits.max_keepalive_connections,
+                "keepalive_seconds": self.limits.keepalive_expiry,
+                "open_connections": len(connections) if connections is not None else None,
+            },
+            "sites": {site: metrics.snapshot() for site, metrics in sorted(sites.items())},
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._groq.clear()
+            self._http.clear()
+
+        self._transport.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            self._async_groq.clear()
+            self._async_http.clear()
+
+        # only the running loop's pool can be closed from here; pools of
+        # loops that are already gone are released with them
+        await self.async_transport().aclose()
+
+        with self._lock:
+            self._loop_transports.pop(asyncio.get_running_loop(), None)
+
+
+_REGISTRY: Optional[LLMClientRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    global _REGISTRY
+
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = LLMClientRegistry()
+
+    return _REGISTRY
+
+
+def get_groq_client(site: str, api_key: Optional[str] = None) -> Groq:
+    return get_llm_registry().groq(site, api_key)
+
+
+def get_async_groq_client(site: str, api_key: Optional[str] = None) -> AsyncGroq:
+    return get_llm_registry().async_groq(site, api_key)
+
+
+def get_async_http_client(site: str) -> httpx.AsyncClient:
+    return get_llm_registry().async_http_client(site)
+
+
+def get_chat_groq(site: str, **kwargs):
+    return get_llm_registry().chat_groq(site, **kwargs)
+
+
+def get_http_client(site: str) -> httpx.Client:
+    return get_llm_registry().http_client(site)
+
+
+def llm_client_stats() -> Dict[str, Any]:
+    return get_llm_registry().stats()
@@ -7,6 +7,9 @@ from typing import Any
 from dotenv import load_dotenv
 from groq import Groq
 
+from agents.shared.llm_cache import cached_chat_completion
+from agents.shared.llm_clients import get_groq_client
+
 load_dotenv()
 
 MODEL = "llama-3.3-70b-versatile"
@@ -16,7 +19,7 @@ def _get_client() -> Groq | None:
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         return None
-    return Groq(api_key=api_key)
+    return get_groq_client("shared.product_name_extractor", api_key)
 
 
 def _parse_json_payload(text: str) -> Any:
@@ -36,6 +39,11 @@ def _parse_json_payload(text: str) -> Any:
         return None
 
 
+def _has_product_list(text: str) -> bool:
+    payload = _parse_json_payload(text.strip())
+    return isinstance(payload, dict) and isinstance(payload.get("products"), list)
+
+
 def _fallback_mapping(title: str) -> dict[str, str]:
     cleaned = " ".join((title or "").strip().split())
     return {
@@ -90,7 +98,11 @@ Titles:
 """.strip()
 
     try:
-        response = client.chat.completions.create(
+        raw = cached_chat_completion(
+            "shared.product_name_extractor",
+            client,
+            # answers without a product list are retried next time, not cached
+            validate=_has_product_list,
             model=MODEL,
             messages=[
                 {
@@ -103,8 +115,7 @@ Titles:
                 {"role": "user", "content": prompt},
             ],
             temperature=0,
-        )
-        raw = response.choices[0].message.content.strip()
+        ).strip()
         payload = _parse_json_payload(raw)
         products = payload.get("products") if isinstance(payload, dict) else None
         if not isinstance(products, list):
@@ -0,0 +1,78 @@
+"""
+Progress reporting for streamed answers.
+
+Agents report what they are doing through a `progress(event, data)`
+callback:
+
+- "stage":   a pipeline step started, e.g. {"stage": "fetching", "count": 2}
+- "partial": an intermediate result, e.g. {"products": [...]} before the rerank
+- "token":   a piece of LLM output as it arrives, {"text": "..."}
+
+The default callback, no_progress, does nothing, so agents behave exactly
+as before unless a streaming endpoint installs one:
+
+    agent.progress = emit
+    text = stream_chat_completion(agent.client, agent.progress, model=..., messages=...)
+
+Callbacks may be invoked from worker threads (agents that run through
+run_blocking), so they must be thread-safe.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+Progress = Callable[[str, Dict[str, Any]], None]
+
+
+def no_progress(event: str, data: Dict[str, Any]) -> None:
+    pass
+
+
+def _delta_text(chunk) -> str:
+    if not chunk.choices:
+        return ""
+
+    return chunk.choices[0].delta.content or ""
+
+
+def stream_chat_completion(client, progress: Progress, **request) -> str:
+    """
+    client.chat.completions.create(**request) returning the message
+    content; with a progress callback installed the completion is streamed
+    and every content delta is reported as a "token" event.
+    """
+    if progress is no_progress:
+        response = client.chat.completions.create(**request)
+        return response.choices[0].message.content
+
+    parts = []
+
+    for chunk in client.chat.completions.create(stream=True, **request):
+        text = _delta_text(chunk)
+
+        if text:
+            parts.append(text)
+            progress("token", {"text": text})
+
+    return "".join(parts)
+
+
+async def astream_chat_completion(client, progress: Progress, **request) -> str:
+    """
+    stream_chat_completion() for an AsyncGroq client.
+    """
+    if progress is no_progress:
+        response = await client.chat.completions.create(**request)
+        return response.choices[0].message.content
+
+    parts = []
+
+    async for chunk in await client.chat.completions.create(stream=True, **request):
+        text = _delta_text(chunk)
+
+        if text:
+            parts.append(text)
+            progress("token", {"text": text})
+
+    return "".join(parts)
@@ -1,7 +1,11 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
-from Data_Base.db import close_client, init_collections
+from Data_Base.db import close_async_client, close_client, init_collections
+from agents.recommendation.index_snapshot import get_index_builder
+from agents.recommendation.intent_router import intent_routing_stats
+from agents.shared.llm_cache import llm_cache_stats
+from agents.shared.llm_clients import get_llm_registry, llm_client_stats
 from backend.app.routes import comparison, recommendation, review, search
 from backend.app.routes.auth import router as auth_router
 from backend.app.routes.session import router as session_router
@@ -27,13 +31,28 @@ def rate_limit_exception_handler(_: Request, exc: RateLimitExceeded):
 @app.on_event("startup")
 def startup_event():
     init_collections()
+    # BM25/FAISS snapshots are (re)built off the request path
+    get_index_builder().start()
 
 
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
+    get_index_builder().stop(timeout=5)
+    await get_llm_registry().aclose()
+    get_llm_registry().close()
+    await close_async_client()
     close_client()
 
 
 @app.get("/")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/llm/clients")
+def llm_clients():
+    return {
+        **llm_client_stats(),
+        "cache": llm_cache_stats(),
+        "intent_router": intent_routing_stats(),
+    }
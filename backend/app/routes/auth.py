@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Query, Request
 
+from agents.shared.concurrency import run_blocking
 from backend.app.schemas.auth import LoginRequest, LoginResponse, MeResponse, RegisterRequest, RegisterResponse
 from backend.app.services.auth_service import get_current_user, login_user, register_user
 from backend.app.services.rate_limit_service import enforce_rate_limit
@@ -8,7 +9,7 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/register", response_model=RegisterResponse)
-def register(request: Request, payload: RegisterRequest):
+async def register(request: Request, payload: RegisterRequest):
     client_ip = request.client.host if request.client else None
     enforce_rate_limit(
         user_id=None,
@@ -17,7 +18,9 @@ def register(request: Request, payload: RegisterRequest):
         window_seconds=60,
         bucket_key=client_ip,
     )
-    return register_user(
+    # password hashing is deliberately slow
+    return await run_blocking(
+        register_user,
         email=payload.email,
         password=payload.password,
         display_name=payload.display_name,
@@ -25,7 +28,7 @@ def register(request: Request, payload: RegisterRequest):
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(request: Request, payload: LoginRequest):
+async def login(request: Request, payload: LoginRequest):
     client_ip = request.client.host if request.client else None
     enforce_rate_limit(
         user_id=None,
@@ -34,9 +37,9 @@ def login(request: Request, payload: LoginRequest):
         window_seconds=60,
         bucket_key=client_ip,
     )
-    return login_user(email=payload.email, password=payload.password)
+    return await run_blocking(login_user, email=payload.email, password=payload.password)
 
 
 @router.get("/me", response_model=MeResponse)
-def me(user_id: str = Query(...)):
-    return get_current_user(user_id)
+async def me(user_id: str = Query(...)):
+    return await run_blocking(get_current_user, user_id)
@@ -1,23 +1,54 @@
 from fastapi import APIRouter
 
+from agents.shared.concurrency import run_blocking
 from backend.app.schemas.comparison import (
     ComparisonChatRequest,
     ComparisonStartRequest,
 )
 from backend.app.services.comparison_service import chat_comparison, start_comparison
+from backend.app.services.stream_service import event_stream_response
 
 router = APIRouter(prefix="/comparison", tags=["Comparison"])
 
 
 @router.post("/start")
-def start(request: ComparisonStartRequest):
-    return start_comparison(user_id=request.user_id, message=request.message)
+async def start(request: ComparisonStartRequest):
+    # the agent and its search/LLM SDKs are synchronous
+    return await run_blocking(start_comparison, user_id=request.user_id, message=request.message)
+
+
+@router.post("/start/stream")
+async def start_stream(request: ComparisonStartRequest):
+    return event_stream_response(
+        "comparison.start",
+        lambda progress: run_blocking(
+            start_comparison,
+            user_id=request.user_id,
+            message=request.message,
+            progress=progress,
+        ),
+    )
 
 
 @router.post("/chat")
-def chat(request: ComparisonChatRequest):
-    return chat_comparison(
+async def chat(request: ComparisonChatRequest):
+    return await run_blocking(
+        chat_comparison,
         user_id=request.user_id,
         message=request.message,
         session_id=request.session_id,
     )
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ComparisonChatRequest):
+    return event_stream_response(
+        "comparison.chat",
+        lambda progress: run_blocking(
+            chat_comparison,
+            user_id=request.user_id,
+            message=request.message,
+            session_id=request.session_id,
+            progress=progress,
+        ),
+    )
@@ -3,20 +3,52 @@ from backend.app.schemas.recommendation import StartRequest, ChatRequest
 from backend.app.services.recommendation_service import (
     start_recommendation,
     chat_recommendation,
+    recommendation_index_status,
 )
+from backend.app.services.stream_service import event_stream_response
 
 router = APIRouter(prefix="/recommendation", tags=["Recommendation"])
 
 
 @router.post("/start")
-def start(request: StartRequest):
-    return start_recommendation(user_id=request.user_id, message=request.message)
+async def start(request: StartRequest):
+    return await start_recommendation(user_id=request.user_id, message=request.message)
+
+
+@router.post("/start/stream")
+async def start_stream(request: StartRequest):
+    return event_stream_response(
+        "recommendation.start",
+        lambda progress: start_recommendation(
+            user_id=request.user_id,
+            message=request.message,
+            progress=progress,
+        ),
+    )
 
 
 @router.post("/chat")
-def chat(request: ChatRequest):
-    return chat_recommendation(
+async def chat(request: ChatRequest):
+    return await chat_recommendation(
         user_id=request.user_id,
         message=request.message,
         session_id=request.session_id,
     )
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    return event_stream_response(
+        "recommendation.chat",
+        lambda progress: chat_recommendation(
+            user_id=request.user_id,
+            message=request.message,
+            session_id=request.session_id,
+            progress=progress,
+        ),
+    )
+
+
+@router.get("/indexes")
+def indexes():
+    return recommendation_index_status()
@@ -1,20 +1,51 @@
 from fastapi import APIRouter
 
+from agents.shared.concurrency import run_blocking
 from backend.app.schemas.review import ReviewChatRequest, ReviewStartRequest
 from backend.app.services.review_service import chat_review, start_review
+from backend.app.services.stream_service import event_stream_response
 
 router = APIRouter(prefix="/review", tags=["Review"])
 
 
 @router.post("/start")
-def start(request: ReviewStartRequest):
-    return start_review(user_id=request.user_id, message=request.message)
+async def start(request: ReviewStartRequest):
+    # the agent and its search/LLM SDKs are synchronous
+    return await run_blocking(start_review, user_id=request.user_id, message=request.message)
+
+
+@router.post("/start/stream")
+async def start_stream(request: ReviewStartRequest):
+    return event_stream_response(
+        "review.start",
+        lambda progress: run_blocking(
+            start_review,
+            user_id=request.user_id,
+            message=request.message,
+            progress=progress,
+        ),
+    )
 
 
 @router.post("/chat")
-def chat(request: ReviewChatRequest):
-    return chat_review(
+async def chat(request: ReviewChatRequest):
+    return await run_blocking(
+        chat_review,
         user_id=request.user_id,
         session_id=request.session_id,
         message=request.message,
     )
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ReviewChatRequest):
+    return event_stream_response(
+        "review.chat",
+        lambda progress: run_blocking(
+            chat_review,
+            user_id=request.user_id,
+            session_id=request.session_id,
+            message=request.message,
+            progress=progress,
+        ),
+    )
@@ -7,5 +7,5 @@ router = APIRouter(prefix="/search", tags=["Search"])
 
 
 @router.post("/")
-def search(request: SearchRequest):
-    return run_search(user_id=request.user_id, message=request.message)
+async def search(request: SearchRequest):
+    return await run_search(user_id=request.user_id, message=request.message)
@@ -7,27 +7,27 @@ from backend.app.schemas.session import (
     SessionMessagesResponse,
 )
 from backend.app.services.session_service import (
-    close_session_for_user,
-    list_messages_for_session,
-    list_sessions_for_user,
-    load_session,
+    close_session_for_user_async,
+    list_messages_for_session_async,
+    list_sessions_for_user_async,
+    load_session_async,
 )
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
 
 @router.get("/", response_model=SessionListResponse)
-def list_sessions(user_id: str = Query(...), limit: int = Query(20, ge=1, le=100)):
+async def list_sessions(user_id: str = Query(...), limit: int = Query(20, ge=1, le=100)):
     return {
         "status": "success",
         "message": "Sessions retrieved",
-        "data": {"sessions": list_sessions_for_user(user_id, limit=limit)},
+        "data": {"sessions": await list_sessions_for_user_async(user_id, limit=limit)},
     }
 
 
 @router.get("/{session_id}", response_model=SessionDetailResponse)
-def get_session(session_id: str, user_id: str = Query(...)):
-    session = load_session(user_id, session_id)
+async def get_session(session_id: str, user_id: str = Query(...)):
+    session = await load_session_async(user_id, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -39,29 +39,29 @@ def get_session(session_id: str, user_id: str = Query(...)):
 
 
 @router.get("/{session_id}/messages", response_model=SessionMessagesResponse)
-def get_session_messages(
+async def get_session_messages(
     session_id: str,
     user_id: str = Query(...),
     limit: int | None = Query(None, ge=1, le=500),
 ):
-    session = load_session(user_id, session_id)
+    session = await load_session_async(user_id, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
     return {
         "status": "success",
         "message": "Messages retrieved",
-        "data": {"messages": list_messages_for_session(user_id, session_id, limit=limit)},
+        "data": {"messages": await list_messages_for_session_async(user_id, session_id, limit=limit)},
     }
 
 
 @router.post("/{session_id}/close", response_model=SessionActionResponse)
-def close_session(session_id: str, user_id: str = Query(...)):
-    session = load_session(user_id, session_id)
+async def close_session(session_id: str, user_id: str = Query(...)):
+    session = await load_session_async(user_id, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    close_session_for_user(user_id, session_id)
+    await close_session_for_user_async(user_id, session_id)
     return {
         "status": "success",
         "message": "Session closed",
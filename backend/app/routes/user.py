@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request
 
+from agents.shared.concurrency import run_blocking
 from backend.app.schemas.user import GuestUserResponse
 from backend.app.services.rate_limit_service import enforce_rate_limit
 from backend.app.services.user_service import create_guest_user_response
@@ -8,7 +9,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.post("/guest", response_model=GuestUserResponse)
-def create_guest(request: Request):
+async def create_guest(request: Request):
     client_ip = request.client.host if request.client else None
     enforce_rate_limit(
         user_id=None,
@@ -17,4 +18,4 @@ def create_guest(request: Request):
         window_seconds=60,
         bucket_key=client_ip,
     )
-    return create_guest_user_response()
+    return await run_blocking(create_guest_user_response)
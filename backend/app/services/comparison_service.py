@@ -1,4 +1,5 @@
 from agents.comparison.agent import ComparisonAgent
+from agents.shared.progress import Progress, no_progress
 
 from backend.app.services.cache_service import load_cached_response, store_cached_response
 from backend.app.services.rate_limit_service import enforce_rate_limit
@@ -71,6 +72,7 @@ def _start_comparison_session(
     user_id: str,
     message: str,
     enforce_limit_guard: bool = True,
+    progress: Progress = no_progress,
 ) -> dict:
     if enforce_limit_guard:
         enforce_rate_limit(user_id, "comparison_start", limit=5, window_seconds=60)
@@ -84,10 +86,12 @@ def _start_comparison_session(
         cached = load_cached_response("comparison", fingerprint)
 
         if cached:
+            progress("stage", {"stage": "cached"})
             response = cached["result"]
             agent_state = cached["agent_state"]
         else:
             agent = ComparisonAgent()
+            agent.progress = progress
             response = agent.start_comparison(message)
             agent_state = agent.to_state()
             if isinstance(response, dict) and agent_state.get("comparison_active"):
@@ -145,11 +149,16 @@ def _start_comparison_session(
         }
 
 
-def start_comparison(user_id: str, message: str) -> dict:
-    return _start_comparison_session(user_id, message, enforce_limit_guard=True)
+def start_comparison(user_id: str, message: str, progress: Progress = no_progress) -> dict:
+    return _start_comparison_session(user_id, message, enforce_limit_guard=True, progress=progress)
 
 
-def chat_comparison(user_id: str, session_id: str, message: str) -> dict:
+def chat_comparison(
+    user_id: str,
+    session_id: str,
+    message: str,
+    progress: Progress = no_progress,
+) -> dict:
     enforce_rate_limit(user_id, "comparison_chat", limit=12, window_seconds=60)
 
     session = load_session(
@@ -172,10 +181,13 @@ def chat_comparison(user_id: str, session_id: str, message: str) -> dict:
         close_session_for_user(user_id, session_id)
         if message.strip().lower() == "new_comparison":
             return _open_empty_comparison_session(user_id, message)
-        return _start_comparison_session(user_id, message, enforce_limit_guard=False)
+        return _start_comparison_session(
+            user_id, message, enforce_limit_guard=False, progress=progress
+        )
 
     append_user_message(user_id, session_id, "comparison", message)
     agent = ComparisonAgent.from_state(agent_state)
+    agent.progress = progress
 
     try:
         response = agent.handle_message(message)
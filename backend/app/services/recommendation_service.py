@@ -1,18 +1,21 @@
 from agents.profile.agent import run_profile_agent
 from agents.recommendation.agent import RecommendationAgent
 from agents.recommendation.chat_handler import RecommendationChatHandler
+from agents.recommendation.index_snapshot import get_index_builder
 from agents.recommendation.profile_adapter import adapt_profile
+from agents.shared.concurrency import run_blocking
+from agents.shared.progress import Progress, no_progress
 
 from Data_Base.profile_repo import get_profile, save_profile
 from backend.app.services.rate_limit_service import enforce_rate_limit
 from backend.app.services.session_service import (
-    append_assistant_message,
-    append_user_message,
-    close_session_for_user,
-    load_session,
-    open_session,
-    persist_session_state,
-    recent_history,
+    append_assistant_message_async,
+    append_user_message_async,
+    close_session_for_user_async,
+    load_session_async,
+    open_session_async,
+    persist_session_state_async,
+    recent_history_async,
 )
 
 
@@ -39,37 +42,48 @@ def _recommendation_state(
     raw_profile: dict,
     adapted_profile: dict,
     products: list[dict],
+    candidate_pool: dict | None = None,
 ) -> dict:
     return {
         "raw_profile_snapshot": raw_profile,
         "adapted_profile": adapted_profile,
         "last_recommendations": products,
         "selected_links": _selected_links(products),
+        # scored candidates re-ranked by budget/preference refinements
+        "candidate_pool": candidate_pool,
         "mode": "recommendation",
     }
 
 
-def _initialize_recommendation_session(
+async def _initialize_recommendation_session(
     user_id: str,
     session_id: str,
     message: str,
+    progress: Progress = no_progress,
 ) -> dict:
-    parsed, _ = run_profile_agent(message)
+    progress("stage", {"stage": "profiling"})
+
+    # the profile graph and embedding/retrieval are synchronous
+    parsed, _ = await run_blocking(run_profile_agent, message)
     raw_profile = parsed.profile.model_dump()
-    save_profile(user_id, raw_profile)
+    await run_blocking(save_profile, user_id, raw_profile)
 
     adapted_profile = adapt_profile(raw_profile)
-    products = RecommendationAgent(user_id).recommend(adapted_profile)
+    agent = RecommendationAgent(user_id)
+    agent.progress = progress
+    products = await run_blocking(agent.recommend, adapted_profile)
 
-    persist_session_state(
+    await persist_session_state_async(
         user_id,
         session_id,
-        _recommendation_state(raw_profile, adapted_profile, products),
+        _recommendation_state(
+            raw_profile, adapted_profile, products, agent.candidate_pool_state()
+        ),
         last_response_type="recommendation_update",
         status="active",
         last_error=None,
     )
-    append_assistant_message(
+    await append_assistant_message_async(
         user_id,
         session_id,
         "recommendation",
@@ -86,12 +100,12 @@ def _initialize_recommendation_session(
     }
 
 
-def _open_reset_recommendation_session(user_id: str, message: str) -> str:
-    session = open_session(user_id=user_id, agent_type="recommendation", title=message)
+async def _open_reset_recommendation_session(user_id: str, message: str) -> str:
+    session = await open_session_async(user_id=user_id, agent_type="recommendation", title=message)
     session_id = session["session_id"]
     prompt = "Starting a new search. What are you looking for?"
-    append_user_message(user_id, session_id, "recommendation", message)
-    persist_session_state(
+    await append_user_message_async(user_id, session_id, "recommendation", message)
+    await persist_session_state_async(
         user_id,
         session_id,
         {},
@@ -99,7 +113,7 @@ def _open_reset_recommendation_session(user_id: str, message: str) -> str:
         status="active",
         last_error=None,
     )
-    append_assistant_message(
+    await append_assistant_message_async(
         user_id,
         session_id,
         "recommendation",
@@ -110,23 +124,29 @@ def _open_reset_recommendation_session(user_id: str, message: str) -> str:
     return session_id
 
 
-def start_recommendation(user_id: str, message: str) -> dict:
+async def start_recommendation(
+    user_id: str,
+    message: str,
+    progress: Progress = no_progress,
+) -> dict:
     enforce_rate_limit(user_id, "recommendation_start", limit=10, window_seconds=60)
 
-    session = open_session(user_id=user_id, agent_type="recommendation", title=message)
+    session = await open_session_async(user_id=user_id, agent_type="recommendation", title=message)
     session_id = session["session_id"]
-    append_user_message(user_id, session_id, "recommendation", message)
+    await append_user_message_async(user_id, session_id, "recommendation", message)
     try:
-        return _initialize_recommendation_session(user_id, session_id, message)
+        return await _initialize_recommendation_session(
+            user_id, session_id, message, progress=progress
+        )
     except Exception as exc:
-        persist_session_state(
+        await persist_session_state_async(
             user_id,
             session_id,
             {},
             status="error",
             last_error=str(exc),
         )
-        append_assistant_message(
+        await append_assistant_message_async(
             user_id,
             session_id,
             "recommendation",
@@ -142,10 +162,15 @@ def start_recommendation(user_id: str, message: str) -> dict:
         }
 
 
-def chat_recommendation(user_id: str, session_id: str, message: str) -> dict:
+async def chat_recommendation(
+    user_id: str,
+    session_id: str,
+    message: str,
+    progress: Progress = no_progress,
+) -> dict:
     enforce_rate_limit(user_id, "recommendation_chat", limit=20, window_seconds=60)
 
-    session = load_session(
+    session = await load_session_async(
         user_id,
         session_id,
         agent_type="recommendation",
@@ -169,18 +194,20 @@ def chat_recommendation(user_id: str, session_id: str, message: str) -> dict:
     )
 
     if not session_has_context:
-        append_user_message(user_id, session_id, "recommendation", message)
+        await append_user_message_async(user_id, session_id, "recommendation", message)
         try:
-            return _initialize_recommendation_session(user_id, session_id, message)
+            return await _initialize_recommendation_session(
+                user_id, session_id, message, progress=progress
+            )
         except Exception as exc:
-            persist_session_state(
+            await persist_session_state_async(
                 user_id,
                 session_id,
                 {},
                 status="error",
                 last_error=str(exc),
             )
-            append_assistant_message(
+            await append_assistant_message_async(
                 user_id,
                 session_id,
                 "recommendation",
@@ -195,30 +222,40 @@ def chat_recommendation(user_id: str, session_id: str, message: str) -> dict:
                 "data": {},
             }
 
-    raw_profile = agent_state.get("raw_profile_snapshot") or get_profile(user_id)
+    raw_profile = agent_state.get("raw_profile_snapshot") or await run_blocking(
+        get_profile, user_id
+    )
     adapted_profile = agent_state.get("adapted_profile") or adapt_profile(raw_profile or {})
     current_recommendations = agent_state.get("last_recommendations") or []
+    candidate_pool = agent_state.get("candidate_pool")
 
     if not current_recommendations:
-        current_recommendations = RecommendationAgent(user_id).recommend(adapted_profile)
+        agent = RecommendationAgent(user_id)
+        agent.progress = progress
+        current_recommendations = await run_blocking(agent.recommend, adapted_profile)
+        candidate_pool = agent.candidate_pool_state()
+
+    handler = RecommendationChatHandler(user_id)
+    handler.progress = progress
 
     try:
-        response = RecommendationChatHandler(user_id).handle(
+        response = await handler.handle(
             user_message=message,
             current_profile=adapted_profile,
             current_recommendations=current_recommendations,
-            conversation_history=recent_history(user_id, session_id, limit=12),
+            conversation_history=await recent_history_async(user_id, session_id, limit=12),
+            candidate_pool=candidate_pool,
         )
     except Exception as exc:
-        persist_session_state(
+        await persist_session_state_async(
             user_id,
             session_id,
             agent_state,
             status="error",
             last_error=str(exc),
         )
-        append_user_message(user_id, session_id, "recommendation", message)
-        append_assistant_message(
+        await append_user_message_async(user_id, session_id, "recommendation", message)
+        await append_assistant_message_async(
             user_id,
             session_id,
             "recommendation",
@@ -234,8 +271,8 @@ def chat_recommendation(user_id: str, session_id: str, message: str) -> dict:
         }
 
     if response.get("type") == "new_search":
-        close_session_for_user(user_id, session_id)
-        new_session_id = _open_reset_recommendation_session(user_id, message)
+        await close_session_for_user_async(user_id, session_id)
+        new_session_id = await _open_reset_recommendation_session(user_id, message)
         return {
             "status": "success",
             "type": "reset",
@@ -244,22 +281,25 @@ def chat_recommendation(user_id: str, session_id: str, message: str) -> dict:
             "data": {},
         }
 
-    append_user_message(user_id, session_id, "recommendation", message)
+    await append_user_message_async(user_id, session_id, "recommendation", message)
 
     next_profile = response.get("profile", adapted_profile)
     next_raw_profile = raw_profile or {}
     next_recommendations = current_recommendations
 
+    # persisted in agent_state only, not in the message payload
+    next_pool = response.pop("candidate_pool", None) or candidate_pool
+
     if response.get("type") == "recommendation_update":
         next_recommendations = response["data"]
 
     if not next_raw_profile and next_profile:
         next_raw_profile = next_profile
 
-    persist_session_state(
+    await persist_session_state_async(
         user_id,
         session_id,
-        _recommendation_state(next_raw_profile, next_profile, next_recommendations),
+        _recommendation_state(next_raw_profile, next_profile, next_recommendations, next_pool),
         last_response_type=response.get("type"),
         status="active",
         last_error=None,
@@ -270,7 +310,7 @@ def chat_recommendation(user_id: str, session_id: str, message: str) -> dict:
         assistant_text = "Updated recommendations"
     elif isinstance(assistant_text, dict):
         assistant_text = assistant_text.get("message", "Recommendation response")
-    append_assistant_message(
+    await append_assistant_message_async(
         user_id,
         session_id,
         "recommendation",
@@ -303,3 +343,7 @@ def chat_recommendation(user_id: str, session_id: str, message: str) -> dict:
         "session_id": session_id,
         "data": {},
     }
+
+
+def recommendation_index_status() -> dict:
+    return {"status": "success", "data": get_index_builder().status()}
@@ -1,4 +1,5 @@
 from agents.reviews.agent import ReviewAgent
+from agents.shared.progress import Progress, no_progress
 
 from backend.app.services.cache_service import load_cached_response, store_cached_response
 from backend.app.services.rate_limit_service import enforce_rate_limit
@@ -71,6 +72,7 @@ def _start_review_session(
     user_id: str,
     message: str,
     enforce_limit_guard: bool = True,
+    progress: Progress = no_progress,
 ) -> dict:
     if enforce_limit_guard:
         enforce_rate_limit(user_id, "review_start", limit=5, window_seconds=60)
@@ -84,10 +86,12 @@ def _start_review_session(
         cached = load_cached_response("review", fingerprint)
 
         if cached:
+            progress("stage", {"stage": "cached"})
             result = cached["result"]
             agent_state = cached["agent_state"]
         else:
             agent = ReviewAgent()
+            agent.progress = progress
             result = agent.start_review(message)
             agent_state = agent.to_state()
             if isinstance(result, dict) and agent_state.get("product"):
@@ -145,11 +149,16 @@ def _start_review_session(
         }
 
 
-def start_review(user_id: str, message: str) -> dict:
-    return _start_review_session(user_id, message, enforce_limit_guard=True)
+def start_review(user_id: str, message: str, progress: Progress = no_progress) -> dict:
+    return _start_review_session(user_id, message, enforce_limit_guard=True, progress=progress)
 
 
-def chat_review(user_id: str, session_id: str, message: str) -> dict:
+def chat_review(
+    user_id: str,
+    session_id: str,
+    message: str,
+    progress: Progress = no_progress,
+) -> dict:
     enforce_rate_limit(user_id, "review_chat", limit=12, window_seconds=60)
 
     session = load_session(
@@ -172,10 +181,13 @@ def chat_review(user_id: str, session_id: str, message: str) -> dict:
         close_session_for_user(user_id, session_id)
         if " ".join(message.lower().strip().split()) == "new_review":
             return _open_empty_review_session(user_id, message)
-        return _start_review_session(user_id, message, enforce_limit_guard=False)
+        return _start_review_session(
+            user_id, message, enforce_limit_guard=False, progress=progress
+        )
 
     append_user_message(user_id, session_id, "review", message)
     agent = ReviewAgent.from_state(agent_state)
+    agent.progress = progress
 
     try:
         result = agent.handle_message(message)
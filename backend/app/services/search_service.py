@@ -3,10 +3,11 @@ from threading import Lock
 
 from Data_Base.search_history_repo import insert_search_history
 from Data_Base.search_session_repo import upsert_search_session
+from agents.shared.concurrency import run_blocking
 from search_pipeline.pipeline import SearchPipeline
 
 from backend.app.services.rate_limit_service import enforce_rate_limit
-from backend.app.services.session_service import ensure_user
+from backend.app.services.session_service import ensure_user_async
 
 pipeline = SearchPipeline()
 _SEARCH_CACHE: dict[str, dict] = {}
@@ -57,26 +58,28 @@ def _success_response(products: list[dict]) -> dict:
     }
 
 
-def run_search(user_id: str, message: str) -> dict:
+async def run_search(user_id: str, message: str) -> dict:
     enforce_rate_limit(user_id, "search", limit=20, window_seconds=60)
-    ensure_user(user_id)
+    await ensure_user_async(user_id)
 
     query = (message or "").strip()
     normalized_query = _normalize_query(query)
     cached_products = _get_cached_products(normalized_query)
 
     if cached_products is not None:
-        _persist_search_artifacts(user_id=user_id, query=query, products=cached_products)
+        await run_blocking(
+            _persist_search_artifacts, user_id=user_id, query=query, products=cached_products
+        )
         return _success_response(cached_products)
 
     try:
-        products = pipeline.run(
+        products = await pipeline.arun(
             query=query,
             search_limit=_DEFAULT_SEARCH_LIMIT,
             top_k=_DEFAULT_TOP_K,
         )
         _set_cached_products(normalized_query, products)
-        _persist_search_artifacts(user_id=user_id, query=query, products=products)
+        await run_blocking(_persist_search_artifacts, user_id=user_id, query=query, products=products)
         return _success_response(products)
     except Exception as e:
         return {"status": "error", "type": "search", "message": str(e), "data": {}}
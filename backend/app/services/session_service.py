@@ -1,16 +1,24 @@
 from Data_Base.message_repo import (
     add_message,
+    add_message_async,
     get_all_messages_limited,
+    get_all_messages_limited_async,
     get_session_messages,
+    get_session_messages_async,
 )
 from Data_Base.session_repo import (
     close_session,
+    close_session_async,
     create_session,
+    create_session_async,
     get_session,
+    get_session_async,
     list_user_sessions,
+    list_user_sessions_async,
     update_session_state,
+    update_session_state_async,
 )
-from Data_Base.user_repo import upsert_guest_user
+from Data_Base.user_repo import upsert_guest_user, upsert_guest_user_async
 
 
 def ensure_user(user_id: str) -> dict:
@@ -28,7 +36,14 @@ def load_session(
     agent_type: str | None = None,
     require_active: bool = False,
 ) -> dict | None:
-    session = get_session(user_id, session_id)
+    return _matching_session(get_session(user_id, session_id), agent_type, require_active)
+
+
+def _matching_session(
+    session: dict | None,
+    agent_type: str | None,
+    require_active: bool,
+) -> dict | None:
     if not session:
         return None
     if agent_type and session.get("agent_type") != agent_type:
@@ -64,8 +79,12 @@ def append_assistant_message(
 
 
 def recent_history(user_id: str, session_id: str, limit: int = 12) -> list[dict]:
+    return _history(get_session_messages(user_id, session_id, limit=limit))
+
+
+def _history(messages: list[dict]) -> list[dict]:
     history = []
-    for message in get_session_messages(user_id, session_id, limit=limit):
+    for message in messages:
         history.append(
             {
                 "role": message["role"],
@@ -107,3 +126,88 @@ def list_messages_for_session(
 
 def close_session_for_user(user_id: str, session_id: str) -> None:
     close_session(user_id, session_id)
+
+
+# -----------------------------
+# Async (used by async routes)
+# -----------------------------
+async def ensure_user_async(user_id: str) -> dict:
+    return await upsert_guest_user_async(user_id)
+
+
+async def open_session_async(user_id: str, agent_type: str, title: str) -> dict:
+    await ensure_user_async(user_id)
+    return await create_session_async(user_id=user_id, agent_type=agent_type, title=title)
+
+
+async def load_session_async(
+    user_id: str,
+    session_id: str,
+    agent_type: str | None = None,
+    require_active: bool = False,
+) -> dict | None:
+    session = await get_session_async(user_id, session_id)
+    return _matching_session(session, agent_type, require_active)
+
+
+async def append_user_message_async(
+    user_id: str, session_id: str, agent_type: str, content: str
+) -> dict:
+    return await add_message_async(user_id, session_id, agent_type, "user", content)
+
+
+async def append_assistant_message_async(
+    user_id: str,
+    session_id: str,
+    agent_type: str,
+    content: str,
+    payload: object | None = None,
+    metadata: dict | None = None,
+) -> dict:
+    return await add_message_async(
+        user_id,
+        session_id,
+        agent_type,
+        "assistant",
+        content,
+        payload=payload,
+        metadata=metadata,
+    )
+
+
+async def recent_history_async(user_id: str, session_id: str, limit: int = 12) -> list[dict]:
+    return _history(await get_session_messages_async(user_id, session_id, limit=limit))
+
+
+async def persist_session_state_async(
+    user_id: str,
+    session_id: str,
+    agent_state: dict,
+    last_response_type: str | None = None,
+    status: str | None = None,
+    last_error: str | None = None,
+) -> None:
+    await update_session_state_async(
+        user_id=user_id,
+        session_id=session_id,
+        agent_state=agent_state,
+        last_response_type=last_response_type,
+        status=status,
+        last_error=last_error,
+    )
+
+
+async def list_sessions_for_user_async(user_id: str, limit: int = 20) -> list[dict]:
+    return await list_user_sessions_async(user_id, limit=limit)
+
+
+async def list_messages_for_session_async(
+    user_id: str,
+    session_id: str,
+    limit: int | None = None,
+) -> list[dict]:
+    return await get_all_messages_limited_async(user_id, session_id, limit=limit)
+
+
+async def close_session_for_user_async(user_id: str, session_id: str) -> None:
+    await close_session_async(user_id, session_id)
@@ -0,0 +1,114 @@
+"""
+Server-sent-events responses for agent endpoints.
+
+A streamed endpoint runs the same service function as its blocking twin,
+with a progress callback that forwards the agent's events to the client:
+
+    event: stage      data: {"stage": "fetching", "count": 2}
+    event: partial    data: {"sources": [...]}
+    event: token      data: {"text": "The"}
+    event: result     data: <the blocking endpoint's response>
+
+An "error" event replaces "result" when the service raises. Events are
+queued on the event loop, so agents may emit them from worker threads.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+from fastapi.responses import StreamingResponse
+
+from agents.shared.progress import Progress
+from backend.app.services.rate_limit_service import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+# stops proxies (nginx) from buffering the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# strong references to producers whose client went away mid-stream
+_RUNNING: set = set()
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class EventChannel:
+    """
+    Thread-safe progress sink read by one SSE response.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (event, data))
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    async def get(self):
+        return await self._queue.get()
+
+
+async def stream_events(
+    name: str,
+    run: Callable[[Progress], Awaitable[Dict[str, Any]]],
+) -> AsyncIterator[str]:
+    """
+    SSE frames for `run(progress)`: its progress events as they happen,
+    then a "result" (or "error") event with its return value.
+    """
+    channel = EventChannel()
+    started = time.perf_counter()
+
+    async def produce():
+        try:
+            channel.emit("result", await run(channel.emit))
+        except RateLimitExceeded as exc:
+            channel.emit("error", {"status": "error", **exc.payload})
+        except Exception as exc:
+            logger.exception(f"[Stream] {name} failed")
+            channel.emit("error", {"status": "error", "message": str(exc)})
+        finally:
+            channel.close()
+
+    # not cancelled on disconnect, so the session is still persisted
+    task = asyncio.create_task(produce())
+    _RUNNING.add(task)
+    task.add_done_callback(_RUNNING.discard)
+
+    yield format_sse("stage", {"stage": "accepted"})
+
+    first_event_ms = None
+
+    while (item := await channel.get()) is not None:
+        if first_event_ms is None:
+            first_event_ms = (time.perf_counter() - started) * 1000
+
+        yield format_sse(*item)
+
+    await task
+
+    logger.info(
+        f"[Stream] {name}: first event after {first_event_ms or 0:.1f} ms, "
+        f"done after {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+
+
+def event_stream_response(
+    name: str,
+    run: Callable[[Progress], Awaitable[Dict[str, Any]]],
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_events(name, run),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
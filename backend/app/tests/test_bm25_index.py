@@ -0,0 +1,211 @@
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+from agents.recommendation.bm25_index import BM25Index, update_bm25_index
+from agents.recommendation.bm25_store import BM25ShardStore, tokenize
+from agents.recommendation.catalog_stream import track_peak_memory
+from agents.recommendation.topk import top_k_indices
+
+
+DOCUMENTS = [
+    ("https://example.com/a", tokenize("Lenovo IdeaPad laptop 16GB RAM SSD")),
+    ("https://example.com/b", tokenize("HP gaming laptop RTX 4060 SSD SSD")),
+    ("https://example.com/c", tokenize("Apple MacBook Air M2 laptop")),
+    ("https://example.com/d", tokenize("Dell office laptop 8GB RAM HDD")),
+    ("https://example.com/e", tokenize("Asus ROG gaming laptop 32GB RAM")),
+]
+
+
+class BM25ShardStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BM25ShardStore(root=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scores_by_link(self, product_type, query):
+        shard = self.store.load(product_type)
+        scores = shard.get_scores(tokenize(query))
+        return dict(zip(shard.links, scores))
+
+    def test_scores_match_rank_bm25(self):
+        self.store.build("laptop", DOCUMENTS)
+
+        reference = BM25Okapi([tokens for _, tokens in DOCUMENTS])
+
+        for query in ["gaming laptop ssd", "16gb ram", "macbook", "unknown words"]:
+            expected = reference.get_scores(tokenize(query))
+            actual = self.store.load("laptop").get_scores(tokenize(query))
+            np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-6)
+
+    def test_incremental_update_matches_full_build(self):
+        self.store.build("laptop", DOCUMENTS[:3])
+        self.store.update(
+            "laptop",
+            upserts=[
+                ("https://example.com/b", tokenize("HP victus laptop RTX 3050")),
+                DOCUMENTS[3],
+                DOCUMENTS[4],
+            ],
+            removals=["https://example.com/c"],
+        )
+
+        full = BM25ShardStore(root=self.tmp.name + "/full")
+        full.build(
+            "laptop",
+            [
+                DOCUMENTS[0],
+                ("https://example.com/b", tokenize("HP victus laptop RTX 3050")),
+                DOCUMENTS[3],
+                DOCUMENTS[4],
+            ],
+        )
+
+        for query in ["gaming laptop", "rtx 3050", "macbook air"]:
+            incremental = self._scores_by_link("laptop", query)
+            rebuilt = dict(
+                zip(full.load("laptop").links, full.load("laptop").get_scores(tokenize(query)))
+            )
+            self.assertEqual(set(incremental), set(rebuilt))
+            for link, score in rebuilt.items():
+                self.assertAlmostEqual(incremental[link], score, places=5)
+
+    def test_small_updates_are_written_as_a_delta_on_the_shared_base(self):
+        delta_store = BM25ShardStore(root=self.tmp.name + "/delta", max_delta_ratio=1.0)
+        delta_store.build("laptop", DOCUMENTS)
+        base_inode = (delta_store.load("laptop").path / "post_docs.npy").stat().st_ino
+
+        delta_store.update(
+            "laptop",
+            upserts=[("https://example.com/b", tokenize("HP victus laptop RTX 3050"))],
+            removals=["https://example.com/c"],
+        )
+        delta_store.update(
+            "laptop", upserts=[("https://example.com/f", tokenize("Acer Swift laptop 16GB"))]
+        )
+
+        shard = delta_store.load("laptop")
+        self.assertTrue(shard.has_delta)
+        self.assertEqual((shard.path / "post_docs.npy").stat().st_ino, base_inode)
+        self.assertEqual(shard.delta_links, ["https://example.com/b", "https://example.com/f"])
+
+        live = [
+            DOCUMENTS[0],
+            DOCUMENTS[3],
+            DOCUMENTS[4],
+            ("https://example.com/b", tokenize("HP victus laptop RTX 3050")),
+            ("https://example.com/f", tokenize("Acer Swift laptop 16GB")),
+        ]
+        reference = BM25Okapi([tokens for _, tokens in live])
+
+        for query in ["gaming laptop", "rtx 3050 swift", "16gb ram", "macbook air"]:
+            expected = dict(zip([link for link, _ in live], reference.get_scores(tokenize(query))))
+            actual = dict(zip(shard.links, shard.get_scores(tokenize(query))))
+            self.assertEqual(set(actual), set(expected))
+            for link, score in expected.items():
+                self.assertAlmostEqual(actual[link], score, places=5)
+
+    def test_update_skips_shards_that_were_never_built(self):
+        self.assertFalse(self.store.update("tablet", upserts=DOCUMENTS[:1]))
+        self.assertFalse(self.store.exists("tablet"))
+
+    def test_update_bm25_index_moves_products_between_types(self):
+        self.store.build("laptop", DOCUMENTS)
+        self.store.build("gaming_laptop", [])
+
+        with patch("agents.recommendation.bm25_index.get_bm25_store", return_value=self.store):
+            update_bm25_index(
+                [
+                    {
+                        "link": "https://example.com/b",
+                        "title": "HP gaming laptop",
+                        "details_text": "RTX 4060",
+                        "category": None,
+                        "product_type": "gaming_laptop",
+                    }
+                ],
+                previous_types={"https://example.com/b": "laptop"},
+            )
+
+        self.assertNotIn("https://example.com/b", self.store.load("laptop").links)
+        self.assertEqual(self.store.load("gaming_laptop").links, ["https://example.com/b"])
+
+    def test_update_bm25_index_updates_each_shard_once_per_batch(self):
+        store = MagicMock()
+        products = [
+            {"link": "https://example.com/a", "title": "Lenovo laptop", "product_type": "laptop"},
+            {"link": "https://example.com/b", "title": "HP laptop", "product_type": "laptop"},
+            {"link": "https://example.com/x", "title": "USB hub", "product_type": None},
+        ]
+
+        with patch("agents.recommendation.bm25_index.get_bm25_store", return_value=store):
+            update_bm25_index(products, previous_types={"https://example.com/b": "tablet"})
+
+        calls = {call.args[0]: call.kwargs for call in store.update.call_args_list}
+        self.assertEqual(store.update.call_count, 3)
+        self.assertEqual(len(calls[None]["upserts"]), 3)
+        self.assertEqual(len(calls["laptop"]["upserts"]), 2)
+        self.assertEqual(calls["tablet"], {"upserts": [], "removals": ["https://example.com/b"]})
+
+    def test_bootstrap_streams_full_catalog_without_cap(self):
+        products = [
+            {"product": {"link": f"https://example.com/{i}", "title": f"laptop model{i}"}}
+            for i in range(6_000)
+        ]
+        collection = MagicMock()
+        collection.find.return_value.batch_size.return_value = iter(products)
+
+        with patch("agents.recommendation.bm25_index.get_collection", return_value=collection), patch(
+            "agents.recommendation.bm25_index.get_bm25_store", return_value=self.store
+        ):
+            index = BM25Index()
+            index.build("laptop")
+
+        self.assertEqual(index.shard.num_docs, 6_000)
+        projection = collection.find.call_args.args[1]
+        self.assertNotIn("product.embedding", projection)
+
+    def test_build_memory_is_only_traced_on_request(self):
+        with track_peak_memory(enabled=False) as memory:
+            self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(memory.describe(), "")
+
+        with track_peak_memory(enabled=True) as memory:
+            buffer = bytearray(1 << 20)
+        del buffer
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(memory.peak_bytes, 1 << 20)
+
+    def test_search_links_skips_links_that_are_not_allowed(self):
+        self.store.build("laptop", DOCUMENTS)
+
+        with patch("agents.recommendation.bm25_index.get_collection"):
+            index = BM25Index()
+        index.shard = self.store.load("laptop")
+        allowed = {"https://example.com/a", "https://example.com/d", "https://example.com/c"}
+
+        links = index.search_links("laptop ram", top_k=2, allowed=allowed)
+
+        self.assertEqual(links, ["https://example.com/a", "https://example.com/d"])
+        self.assertEqual(index.search_links("macbook", top_k=5, allowed=set()), [])
+
+
+class TopKIndicesTests(unittest.TestCase):
+    def test_matches_stable_descending_sort_including_ties(self):
+        rng = np.random.default_rng(7)
+        scores = rng.integers(0, 5, size=200).astype(np.float32)
+
+        for k in [1, 5, 40, 199, 200, 500]:
+            expected = np.argsort(-scores, kind="stable")[:k]
+            np.testing.assert_array_equal(top_k_indices(scores, k), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
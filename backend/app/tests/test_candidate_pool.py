@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+
+from agents.recommendation.candidate_pool import CandidatePool
+from agents.recommendation.scorer import ProductScorer
+
+
+def _product(link, price, embedding, cluster_id):
+    return {
+        "link": link,
+        "title": f"Laptop {link}",
+        "price": price,
+        "category": "laptop",
+        "cluster_id": cluster_id,
+        "embedding": embedding,
+        "details_text": "16GB RAM",
+    }
+
+
+PRODUCTS = [
+    _product("a", 900.0, [1.0, 0.0, 0.0, 0.0], 1),
+    _product("b", 1400.0, [0.9, 0.1, 0.0, 0.0], 2),
+    _product("c", 600.0, [0.6, 0.8, 0.0, 0.0], 3),
+    _product("d", None, [0.0, 1.0, 0.0, 0.0], 4),
+    _product("e", 2500.0, [0.8, 0.6, 0.0, 0.0], 5),
+]
+USER = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+
+class CandidatePoolTests(unittest.TestCase):
+    def setUp(self):
+        self.scorer = ProductScorer("user_1")
+
+    def test_state_keeps_display_fields_and_drops_embeddings(self):
+        state = self.scorer.score_pool(PRODUCTS, USER).to_state()
+
+        self.assertEqual(set(state["products"][0]), {"title", "price", "link", "category", "cluster_id"})
+        self.assertEqual(len(state["semantic"]), len(PRODUCTS))
+
+    def test_restored_pool_ranks_like_a_fresh_score(self):
+        candidates = [{"product": p} for p in PRODUCTS]
+        restored = CandidatePool.from_state(self.scorer.score_pool(PRODUCTS, USER).to_state())
+
+        for budget, priorities in [(1000.0, None), (500.0, {"price": 0.9}), (None, {"performance": 0.8})]:
+            expected = self.scorer.rank_products(
+                candidates, USER, user_price_max=budget, priorities=priorities
+            )
+            actual = self.scorer.rank_pool(restored, user_price_max=budget, priorities=priorities)
+
+            self.assertEqual(actual, expected)
+
+    def test_missing_or_mismatched_state_is_ignored(self):
+        self.assertIsNone(CandidatePool.from_state(None))
+        self.assertIsNone(CandidatePool.from_state({"format": 0, "products": [{}], "semantic": [1]}))
+        self.assertIsNone(
+            CandidatePool.from_state({"format": 1, "products": [{"link": "a"}], "semantic": []})
+        )
+
+
+class RefinementTests(unittest.TestCase):
+    def setUp(self):
+        from agents.recommendation.agent import RecommendationAgent
+
+        self.agent = RecommendationAgent("user_1", engine=MagicMock())
+        self.pool = ProductScorer("user_1").score_pool(PRODUCTS, USER)
+
+    def test_refine_only_reranks_the_pool(self):
+        results = self.agent.refine({"category": "laptop", "budget_max": 1000}, self.pool)
+
+        self.assertEqual([p["link"] for p in results][:2], ["a", "c"])
+        self.assertTrue(all(p["price"] is None or p["price"] <= 1150 for p in results))
+
+        self.agent.model.encode.assert_not_called()
+        self.agent.engine.indexes.current.assert_not_called()
+        self.agent.reranker.rerank.assert_not_called()
+        self.assertIs(self.agent.candidate_pool, self.pool)
+
+    def test_chat_budget_refinement_uses_saved_pool(self):
+        from agents.recommendation.chat_handler import RecommendationChatHandler
+
+        engine = MagicMock()
+        engine.intent_router.route = AsyncMock(
+            return_value={"intent": "refine_budget", "budget_max": 1000}
+        )
+        handler = RecommendationChatHandler("user_1", engine)
+
+        with patch.object(handler.rec_agent, "recommend") as recommend:
+            response = asyncio.run(
+                handler.handle(
+                    "under 1000 please",
+                    {"category": "laptop", "budget_max": 3000},
+                    [],
+                    candidate_pool=self.pool.to_state(),
+                )
+            )
+
+        recommend.assert_not_called()
+        self.assertEqual(response["type"], "recommendation_update")
+        self.assertEqual(response["data"][0]["link"], "a")
+        self.assertEqual(response["candidate_pool"], self.pool.to_state())
+
+    def test_chat_refinement_without_pool_recommends_from_scratch(self):
+        from agents.recommendation.chat_handler import RecommendationChatHandler
+
+        engine = MagicMock()
+        engine.intent_router.route = AsyncMock(
+            return_value={"intent": "refine_budget", "budget_max": 1000}
+        )
+        handler = RecommendationChatHandler("user_1", engine)
+
+        with patch.object(handler.rec_agent, "recommend", return_value=[]) as recommend:
+            asyncio.run(handler.handle("under 1000 please", {"category": "laptop"}, []))
+
+        recommend.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from Data_Base.embedding_codec import encode_embedding
+from agents.recommendation import catalog_snapshot
+from agents.recommendation.catalog_snapshot import build_snapshot, feature_tokens
+
+
+def _product(link, product_type, price, embedding):
+    return {
+        "product": {
+            "link": link,
+            "title": link.upper(),
+            "category": "electronics",
+            "product_type": product_type,
+            "price": price,
+            "embedding": embedding,
+        }
+    }
+
+
+def _collection(products):
+    collection = MagicMock()
+    # like MongoDB: distinct() skips missing fields, {"field": None} matches them
+    collection.distinct.return_value = list(
+        {p["product"]["product_type"] for p in products if "product_type" in p["product"]}
+    )
+
+    def find(query, _projection):
+        product_type = query.get("product.product_type")
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.batch_size.side_effect = lambda _size: iter(
+            sorted(
+                (p for p in products if p["product"].get("product_type") == product_type),
+                key=lambda p: p["product"]["link"],
+            )
+        )
+        return cursor
+
+    collection.find.side_effect = find
+    return collection
+
+
+class CatalogSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.products = [
+            _product("p3", "phone", 300.0, [0.0, 1.0]),
+            _product("l2", "laptop", None, encode_embedding(np.array([1.0, 0.0]))),
+            _product("l1", "laptop", 900.0, [0.6, 0.8]),
+            _product("x1", None, 5.0, [1.0, 0.0]),
+        ]
+        self.snapshot = build_snapshot(_collection(self.products), 3)
+
+    def test_rows_are_grouped_by_type_and_sorted_by_link(self):
+        self.assertEqual(self.snapshot.links, ["x1", "l1", "l2", "p3"])
+        self.assertEqual(self.snapshot.type_range("laptop"), (1, 3))
+        self.assertEqual(self.snapshot.type_range("phone"), (3, 4))
+        self.assertIsNone(self.snapshot.type_range("tv"))
+        self.assertEqual(self.snapshot.embeddings.dtype, np.float32)
+        self.assertFalse(self.snapshot.embeddings.flags.writeable)
+
+    def test_each_type_is_sorted_by_link_on_the_server(self):
+        collection = _collection(self.products)
+        cursors = []
+        find = collection.find.side_effect
+        collection.find.side_effect = lambda *args: cursors.append(find(*args)) or cursors[-1]
+
+        build_snapshot(collection, 4)
+
+        for cursor in cursors:
+            cursor.sort.assert_called_once_with("product.link")
+
+    def test_filters_and_hydration(self):
+        self.assertEqual(self.snapshot.rows_for("laptop").tolist(), [1, 2])
+        # a missing price never satisfies a price restriction
+        self.assertEqual(self.snapshot.rows_for("laptop", price_max=1000).tolist(), [1])
+        self.assertEqual(self.snapshot.rows_for(price_min=100).tolist(), [1, 3])
+        self.assertEqual(len(self.snapshot.rows_for("tv")), 0)
+
+        product = self.snapshot.product(self.snapshot.row_of("l2"))
+        self.assertEqual(
+            {k: product[k] for k in ("link", "title", "price", "product_type")},
+            {"link": "l2", "title": "L2", "price": None, "product_type": "laptop"},
+        )
+        np.testing.assert_array_equal(product["embedding"], [1.0, 0.0])
+
+    def test_products_without_a_type_are_kept(self):
+        untyped = _product("u1", None, 50.0, [0.0, 1.0])
+        del untyped["product"]["product_type"]
+
+        snapshot = build_snapshot(_collection(self.products[:3] + [untyped]), 4)
+
+        self.assertEqual(snapshot.links, ["u1", "l1", "l2", "p3"])
+        self.assertEqual(snapshot.type_range(None), (0, 1))
+        self.assertIn(snapshot.row_of("u1"), snapshot.rows_for(price_max=100).tolist())
+
+
+class FeatureIndexTests(unittest.TestCase):
+    def setUp(self):
+        details = [
+            "Lenovo laptop, 16GB RAM, 512 GB SSD, backlit keyboard",
+            "Gaming laptop with 16 gb ram and RTX 4060, SSD storage",
+            "Office laptop 8GB RAM, HDD",
+            "Wireless earbuds with noise cancelling",
+            None,
+        ]
+        types = ["laptop", "laptop", "laptop", "earbuds", "laptop"]
+        products = [
+            _product(f"{i}", product_type, 100.0, [1.0, 0.0])
+            for i, product_type in enumerate(types)
+        ]
+        for product, text in zip(products, details):
+            product["product"]["details_text"] = text
+
+        self.snapshot = build_snapshot(_collection(products), 1)
+        self.row = {link: row for row, link in enumerate(self.snapshot.links)}
+
+    def _links(self, features, product_type=None):
+        rows = self.snapshot.rows_with_features(features, product_type)
+        return sorted(self.snapshot.links[row] for row in rows)
+
+    def test_features_are_normalized_tokens_and_phrases(self):
+        self.assertEqual(feature_tokens("16GB RAM, Wi-Fi 6"), ["16", "gb", "ram", "wi", "fi", "6"])
+
+        self.assertEqual(self._links(["SSD"]), ["0", "1"])
+        self.assertEqual(self._links(["16GB ram", "ssd"]), ["0", "1"])
+        # "backlit" and "keyboard" must be adjacent
+        self.assertEqual(self._links(["backlit keyboard"]), ["0"])
+        self.assertEqual(self._links(["keyboard backlit"]), [])
+
+    def test_matches_are_restricted_to_the_product_type(self):
+        self.assertEqual(self._links(["with"]), ["1", "3"])
+        self.assertEqual(self._links(["with"], "laptop"), ["1"])
+        self.assertEqual(self._links(["ram"], "tv"), [])
+        self.assertEqual(self._links(["unknownfeature"], "laptop"), [])
+        # features without tokens do not restrict anything
+        self.assertEqual(self._links(["--"], "earbuds"), ["3"])
+
+
+class SharedSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.products = [
+            _product(f"l{i}", "laptop", float(i), [float(i), 1.0]) for i in range(5)
+        ]
+        for i, product in enumerate(self.products):
+            product["product"]["details_text"] = f"model {i}"
+
+        self.version = 1
+        self.collection = _collection(self.products)
+        patches = [
+            patch.object(catalog_snapshot, "SNAPSHOT_ROOT", Path(self.tmp.name)),
+            patch.object(catalog_snapshot, "SHARED", True),
+            patch.object(catalog_snapshot, "get_collection", return_value=self.collection),
+            patch.object(
+                catalog_snapshot, "current_catalog_version", side_effect=lambda: self.version
+            ),
+            patch.object(catalog_snapshot, "_SNAPSHOT", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _new_worker(self):
+        catalog_snapshot._SNAPSHOT = None
+
+    def test_workers_attach_to_one_published_snapshot(self):
+        first = catalog_snapshot.get_catalog_snapshot()
+        self.assertIs(catalog_snapshot.get_catalog_snapshot(), first)
+
+        self._new_worker()
+        second = catalog_snapshot.get_catalog_snapshot()
+
+        # built from MongoDB once (one distinct, then one find per type)
+        self.assertEqual(self.collection.distinct.call_count, 1)
+        self.assertTrue(first.shared and second.shared)
+        self.assertFalse(second.embeddings.flags.writeable)
+        self.assertEqual(second.links, first.links)
+        self.assertEqual(second.type_range("laptop"), (0, 5))
+        np.testing.assert_array_equal(second.embeddings, first.embeddings)
+        self.assertEqual(second.product(3)["price"], 3.0)
+        self.assertEqual(second.rows_with_features(["Model 3"]).tolist(), [3])
+
+    def test_new_version_publishes_a_new_generation(self):
+        first = catalog_snapshot.get_catalog_snapshot()
+
+        self.version = 2
+        self.products.append(_product("l9", "laptop", 9.0, [1.0, 0.0]))
+        second = catalog_snapshot.get_catalog_snapshot()
+
+        self.assertEqual((first.version, second.version), (1, 2))
+        self.assertEqual(len(second), 6)
+        # readers still holding the old generation are unaffected
+        self.assertEqual(len(first), 5)
+
+        # a worker whose version poll lags behind accepts the newer snapshot
+        self._new_worker()
+        self.version = 1
+        self.assertEqual(catalog_snapshot.get_catalog_snapshot().version, 2)
+        self.assertEqual(self.collection.distinct.call_count, 2)
+
+    def test_sharing_can_be_disabled(self):
+        with patch.object(catalog_snapshot, "SHARED", False):
+            snapshot = catalog_snapshot.get_catalog_snapshot()
+
+        self.assertFalse(snapshot.shared)
+        self.assertFalse(any(Path(self.tmp.name).iterdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from unittest.mock import MagicMock
+
+from pymongo.errors import OperationFailure
+
+from Data_Base.db import ensure_product_indexes
+
+
+class ProductIndexTests(unittest.TestCase):
+    def test_retrieval_indexes_are_partial_on_embedding(self):
+        collection = MagicMock()
+
+        ensure_product_indexes(collection)
+
+        keys = [call.args[0] for call in collection.create_index.call_args_list]
+        self.assertIn([("product.product_type", 1), ("product.price", 1)], keys)
+        self.assertIn([("product.lsh_bands", 1)], keys)
+        for call in collection.create_index.call_args_list:
+            if not call.kwargs["name"].endswith("_embedded"):
+                continue
+            self.assertEqual(
+                call.kwargs["partialFilterExpression"],
+                {"product.embedding": {"$exists": True}},
+            )
+
+    def test_existing_equivalent_index_is_not_an_error(self):
+        collection = MagicMock()
+        collection.create_index.side_effect = OperationFailure("conflict", code=85)
+
+        ensure_product_indexes(collection)
+
+        collection.create_index.side_effect = OperationFailure("boom", code=2)
+        with self.assertRaises(OperationFailure):
+            ensure_product_indexes(collection)
+
+
+if __name__ == "__main__":
+    unittest.main()
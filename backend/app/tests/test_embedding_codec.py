@@ -0,0 +1,50 @@
+import unittest
+
+import bson
+import numpy as np
+
+from Data_Base.embedding_codec import decode_embedding, decode_embeddings, encode_embedding
+
+
+def _unit_vectors(count, dim=384, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dim)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class EmbeddingCodecTests(unittest.TestCase):
+    def test_round_trip_through_bson_keeps_cosine(self):
+        vectors = _unit_vectors(20)
+
+        for storage_format, tolerance in (("float16", 1e-3), ("int8", 1e-2)):
+            stored = [
+                bson.decode(bson.encode({"e": encode_embedding(v, storage_format)}))["e"]
+                for v in vectors
+            ]
+            decoded = decode_embeddings(stored)
+
+            self.assertEqual(decoded.dtype, np.float32)
+            cosines = np.sum(decoded * vectors, axis=1) / np.linalg.norm(decoded, axis=1)
+            self.assertTrue(np.all(cosines > 1 - tolerance), storage_format)
+            np.testing.assert_array_equal(decode_embedding(stored[3]), decoded[3])
+
+    def test_packed_size_is_a_fraction_of_float64_arrays(self):
+        vector = _unit_vectors(1)[0]
+        legacy = len(bson.encode({"e": vector.astype(float).tolist()}))
+
+        self.assertLess(len(bson.encode({"e": encode_embedding(vector, "float16")})), legacy / 4)
+        self.assertLess(len(bson.encode({"e": encode_embedding(vector, "int8")})), legacy / 8)
+
+    def test_legacy_float_arrays_still_decode(self):
+        vector = _unit_vectors(1)[0].tolist()
+
+        np.testing.assert_allclose(decode_embedding(vector), vector, rtol=1e-6)
+        self.assertEqual(decode_embeddings([vector, vector]).shape, (2, 384))
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            encode_embedding([0.1, 0.2], "bfloat16")
+
+
+if __name__ == "__main__":
+    unittest.main()
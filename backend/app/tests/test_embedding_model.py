@@ -0,0 +1,144 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import torch
+
+from agents.recommendation.embedding_cache import EmbeddingDiskCache
+from agents.recommendation.embedding_model import EmbeddingModel, cosine_drift, quantize_model
+from agents.shared.lru_cache import LRUCache
+
+
+def _fake_model(dim=4):
+    model = MagicMock()
+    model.get_sentence_embedding_dimension.return_value = dim
+    model.encode.side_effect = lambda texts, **_: np.array(
+        [[float(len(text))] * dim for text in texts], dtype=np.float32
+    )
+    return model
+
+
+def _embedding_model(cache_size=100, disk_cache=None):
+    # bypass the singleton so no real SentenceTransformer is loaded
+    embedder = object.__new__(EmbeddingModel)
+    embedder.model = _fake_model()
+    embedder.cache = LRUCache(cache_size)
+    embedder.disk_cache = disk_cache
+    return embedder
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used_and_counts_hits(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIsNone(cache.get("b"))
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 2))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_concurrent_puts_stay_bounded(self):
+        cache = LRUCache(50)
+
+        def worker(offset):
+            for i in range(500):
+                cache.put(offset + i, i)
+                cache.get(offset + i // 2)
+
+        threads = [threading.Thread(target=worker, args=(n * 1000,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(cache), 50)
+        self.assertEqual(cache.stats()["hits"] + cache.stats()["misses"], 2000)
+
+
+class EmbeddingModelEncodeTests(unittest.TestCase):
+    def test_uncached_texts_are_encoded_in_one_batch(self):
+        embedder = _embedding_model()
+
+        first = embedder.encode(["a", "bb", "a", "ccc"], batch_size=16)
+
+        embedder.model.encode.assert_called_once()
+        args, kwargs = embedder.model.encode.call_args
+        self.assertEqual(args[0], ["a", "bb", "ccc"])
+        self.assertEqual(kwargs["batch_size"], 16)
+        self.assertEqual(first.shape, (4, 4))
+        np.testing.assert_array_equal(first[:, 0], [1, 2, 1, 3])
+
+        second = embedder.encode(["bb", "dddd"])
+
+        self.assertEqual(embedder.model.encode.call_args[0][0], ["dddd"])
+        np.testing.assert_array_equal(second[:, 0], [2, 4])
+        self.assertEqual(embedder.cache_stats()["memory"]["hits"], 1)
+
+    def test_empty_input_keeps_embedding_shape(self):
+        self.assertEqual(_embedding_model().encode([]).shape, (0, 4))
+
+
+class QuantizedInferenceTests(unittest.TestCase):
+    def test_quantized_linear_layers_stay_close_to_fp32(self):
+        torch.manual_seed(0)
+        model = torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.GELU(), torch.nn.Linear(64, 32))
+        quantized = quantize_model(model)
+
+        self.assertNotIsInstance(quantized[0], torch.nn.Linear)
+        self.assertIsInstance(model[0], torch.nn.Linear)  # original left untouched
+
+        inputs = torch.randn(50, 64)
+        with torch.no_grad():
+            drift = cosine_drift(model(inputs).numpy(), quantized(inputs).numpy())
+
+        self.assertLess(drift["max"], 0.01)
+
+    def test_cosine_drift_of_identical_embeddings_is_zero(self):
+        vectors = np.random.default_rng(0).normal(size=(10, 8))
+        self.assertAlmostEqual(cosine_drift(vectors, vectors * 3)["max"], 0.0, places=6)
+
+
+class EmbeddingDiskCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "embeddings.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_other_processes_reuse_persisted_embeddings(self):
+        first = _embedding_model(disk_cache=EmbeddingDiskCache(self.path, "m"))
+        expected = first.encode(["gaming laptop", "earbuds"])
+
+        # a new worker: empty memory cache, same file
+        second = _embedding_model(disk_cache=EmbeddingDiskCache(self.path, "m"))
+        reused = second.encode(["gaming  laptop ", "earbuds", "phone"])
+
+        self.assertEqual(second.model.encode.call_args[0][0], ["phone"])
+        np.testing.assert_array_equal(reused[:2], expected)
+        self.assertEqual(second.disk_cache.stats()["hits"], 2)
+
+        # the model name is part of the key
+        other_model = EmbeddingDiskCache(self.path, "other")
+        self.assertEqual(other_model.get_many(["earbuds"]), {})
+
+    def test_eviction_keeps_table_bounded(self):
+        cache = EmbeddingDiskCache(self.path, "m", max_entries=10)
+        texts = [f"text {i}" for i in range(25)]
+        cache.put_many(texts, np.ones((25, 4), dtype=np.float32))
+
+        self.assertEqual(cache.evict(), 16)
+        self.assertEqual(len(cache), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
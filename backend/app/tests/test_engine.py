@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+
+
+class RecommendationEngineTests(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            patch("agents.recommendation.engine.get_embedding_model"),
+            patch("agents.recommendation.engine.ProductRetriever"),
+            patch("agents.recommendation.engine.LLMReranker"),
+            patch("agents.recommendation.engine.RecommendationIntentRouter"),
+            patch("agents.recommendation.engine.get_async_groq_client"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        from agents.recommendation import engine
+
+        self.engine_module = engine
+        engine_patch = patch.object(engine, "_ENGINE", None)
+        engine_patch.start()
+        self.addCleanup(engine_patch.stop)
+
+    def test_get_recommendation_engine_is_a_singleton(self):
+        first = self.engine_module.get_recommendation_engine()
+        second = self.engine_module.get_recommendation_engine()
+
+        self.assertIs(first, second)
+        self.engine_module.get_embedding_model.assert_called_once()
+
+    def test_engines_share_the_process_index_builder(self):
+        from agents.recommendation.index_snapshot import get_index_builder
+
+        engine = self.engine_module.RecommendationEngine()
+
+        self.assertIs(engine.indexes, get_index_builder())
+
+    def test_agents_reuse_engine_components(self):
+        from agents.recommendation.agent import RecommendationAgent
+
+        engine = self.engine_module.RecommendationEngine()
+
+        with patch("agents.recommendation.agent.ProductScorer"):
+            first = RecommendationAgent("user_1", engine)
+            second = RecommendationAgent("user_2", engine)
+
+        self.assertIs(first.retriever, second.retriever)
+        self.assertIs(first.model, engine.model)
+        self.assertIs(first.reranker, engine.reranker)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from agents.recommendation.fusion import reciprocal_rank_fusion
+
+
+class ReciprocalRankFusionTests(unittest.TestCase):
+    def test_items_found_by_both_retrievers_rank_first(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]])
+
+        self.assertEqual(fused[0], "c")
+        self.assertEqual(set(fused), {"a", "b", "c", "d"})
+
+    def test_ties_keep_first_seen_order_and_limit_applies(self):
+        fused = reciprocal_rank_fusion([["a", "b"], ["x", "y"]], limit=3)
+
+        self.assertEqual(fused, ["a", "x", "b"])
+
+
+class HybridRetrievalTests(unittest.TestCase):
+    def setUp(self):
+        from agents.recommendation.agent import RecommendationAgent
+
+        self.agent = RecommendationAgent("user_1", engine=MagicMock())
+        self.indexes = self.agent.engine.indexes.current.return_value
+        self.bm25 = self.indexes.bm25_index.return_value
+
+        # "e" was indexed by BM25 but is not in the catalog snapshot yet
+        links = ["a", "b", "c", "d"]
+        snapshot = MagicMock()
+        snapshot.row_of.side_effect = lambda link: links.index(link) if link in links else None
+        snapshot.products.side_effect = lambda rows: [
+            {"link": links[row], "title": links[row], "price": 10.0, "embedding": [0.5] * 4}
+            for row in rows
+        ]
+        self.indexes.catalog = snapshot
+        self.agent_snapshot = snapshot
+
+    def test_candidates_are_fused_from_bm25_and_vector_search(self):
+        self.bm25.search_links.return_value = ["a", "b", "c"]
+        self.agent.retriever.vector_links.return_value = ["c", "d"]
+
+        timings = {}
+        candidates = self.agent._retrieve_hybrid("gaming laptop", np.ones(4), "laptop", timings)
+
+        links = [item["product"]["link"] for item in candidates]
+        self.assertEqual(links[0], "c")
+        self.assertEqual(set(links), {"a", "b", "c", "d"})
+        self.agent.retriever.vector_links.assert_called_once()
+        self.assertEqual(
+            self.agent.retriever.vector_links.call_args.kwargs["product_type"], "laptop"
+        )
+        self.assertTrue({"bm25", "vector", "fuse+hydrate"} <= set(timings))
+
+    def test_both_retrievers_search_the_same_published_snapshot(self):
+        self.bm25.search_links.return_value = ["a"]
+        self.agent.retriever.vector_links.return_value = ["c"]
+
+        self.agent._retrieve_hybrid("laptop", np.ones(4), "laptop", {})
+
+        self.agent.engine.indexes.current.assert_called_once()
+        self.indexes.bm25_index.assert_called_once_with("laptop")
+        kwargs = self.agent.retriever.vector_links.call_args.kwargs
+        self.assertIs(kwargs["vector_index"], self.indexes.vector_index)
+        self.assertIs(kwargs["snapshot"], self.agent_snapshot)
+
+    def test_type_without_bm25_shard_uses_vector_results(self):
+        self.indexes.bm25_index.return_value = None
+        self.agent.retriever.vector_links.return_value = ["c", "d"]
+
+        candidates = self.agent._retrieve_hybrid("laptop", np.ones(4), "tablet", {})
+
+        self.assertEqual([item["product"]["link"] for item in candidates], ["c", "d"])
+
+    def test_vector_failure_falls_back_to_bm25(self):
+        self.bm25.search_links.return_value = ["a", "e", "b"]
+        self.agent.retriever.vector_links.side_effect = RuntimeError("index missing")
+
+        candidates = self.agent._retrieve_hybrid("gaming laptop", np.ones(4), "laptop", {})
+
+        self.assertEqual([item["product"]["link"] for item in candidates], ["a", "b"])
+
+    def test_must_have_features_restrict_both_retrievers(self):
+        snapshot = self.agent_snapshot
+        snapshot.rows_with_features.return_value = np.array([0, 1, 2, 3, 4])
+        snapshot.links = ["a", "b", "c", "d", "x"]
+        self.bm25.search_links.return_value = ["a"]
+        self.agent.retriever.vector_links.return_value = ["c"]
+
+        self.agent._retrieve_hybrid("laptop", np.ones(4), "laptop", {}, must_have=["ssd"])
+
+        snapshot.rows_with_features.assert_called_once_with(["ssd"], "laptop")
+        self.assertEqual(self.bm25.search_links.call_args.args[2], set(snapshot.links))
+        self.assertEqual(
+            self.agent.retriever.vector_links.call_args.kwargs["rows"].tolist(), [0, 1, 2, 3, 4]
+        )
+
+    def test_must_have_filter_is_skipped_when_too_few_products_match(self):
+        self.agent_snapshot.rows_with_features.return_value = np.array([0, 1])
+        self.bm25.search_links.return_value = ["a"]
+        self.agent.retriever.vector_links.return_value = ["c"]
+
+        self.agent._retrieve_hybrid("laptop", np.ones(4), "laptop", {}, must_have=["ssd"])
+
+        self.assertIsNone(self.bm25.search_links.call_args.args[2])
+        self.assertIsNone(self.agent.retriever.vector_links.call_args.kwargs["rows"])
+
+    def test_diversity_keeps_one_product_per_cluster_then_fills(self):
+        products = [
+            {"link": "a", "title": "Laptop A", "cluster_id": 1},
+            {"link": "b", "title": "Laptop A blue", "cluster_id": 1},
+            {"link": "c", "title": "Laptop C", "cluster_id": 2},
+            {"link": "d", "title": "Old laptop model d", "cluster_id": None},
+            {"link": "e", "title": "Old laptop model d 16GB", "cluster_id": None},
+        ]
+
+        picked = self.agent._apply_diversity(products, top_k=3)
+        self.assertEqual([p["link"] for p in picked], ["a", "c", "d"])
+
+        picked = self.agent._apply_diversity(products, top_k=5)
+        self.assertEqual([p["link"] for p in picked], ["a", "c", "d", "b", "e"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import gc
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from agents.recommendation.index_snapshot import IndexBuilder, IndexSnapshot
+
+
+def _snapshot(version, bm25=None):
+    catalog = MagicMock()
+    catalog.version = version
+
+    return IndexSnapshot(
+        catalog=catalog,
+        vector_index=MagicMock(),
+        bm25=bm25 or {},
+        built_at=time.time(),
+        build_seconds=0.1,
+    )
+
+
+class IndexBuilderTests(unittest.TestCase):
+    def setUp(self):
+        self.version = 1
+        version_patch = patch(
+            "agents.recommendation.index_snapshot.current_catalog_version",
+            side_effect=lambda: self.version,
+        )
+        version_patch.start()
+        self.addCleanup(version_patch.stop)
+
+        self.builds = 0
+
+    def _build(self, progress):
+        self.builds += 1
+        progress("bm25", 0, 1)
+        return _snapshot(self.version)
+
+    def test_cold_start_builds_once_then_serves_the_reference(self):
+        builder = IndexBuilder(build=self._build)
+
+        first = builder.current()
+        second = builder.current()
+
+        self.assertIs(first, second)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(builder.status()["version"], 1)
+
+    def test_refresh_swaps_only_when_the_catalog_version_moved(self):
+        builder = IndexBuilder(build=self._build)
+        old = builder.current()
+
+        self.assertIs(builder.refresh(), old)
+
+        self.version = 2
+        new = builder.refresh()
+
+        self.assertIsNot(new, old)
+        self.assertIs(builder.current(), new)
+        self.assertEqual(self.builds, 2)
+
+    def test_readers_keep_the_published_snapshot_during_a_rebuild(self):
+        builder = IndexBuilder(build=self._build)
+        old = builder.current()
+
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build(progress):
+            started.set()
+            release.wait(5)
+            return _snapshot(2)
+
+        builder._build = slow_build
+        self.version = 2
+        thread = threading.Thread(target=builder.refresh)
+        thread.start()
+        started.wait(5)
+
+        # no lock on the read path: the old snapshot is served immediately
+        self.assertIs(builder.current(), old)
+        self.assertEqual(builder.status()["state"], "building")
+
+        release.set()
+        thread.join(5)
+
+        self.assertEqual(builder.current().version, 2)
+
+    def test_failed_rebuild_keeps_the_previous_snapshot(self):
+        builder = IndexBuilder(build=self._build)
+        old = builder.current()
+
+        builder._build = MagicMock(side_effect=RuntimeError("mongo down"))
+        self.version = 2
+
+        self.assertIs(builder.refresh(), old)
+
+        status = builder.status()
+        self.assertEqual((status["state"], status["failures"]), ("failed", 1))
+        self.assertIn("mongo down", status["last_error"])
+
+    def test_retired_snapshots_are_released_when_unreferenced(self):
+        builder = IndexBuilder(build=self._build)
+        held = builder.current()
+
+        self.version = 2
+        builder.refresh()
+
+        # an in-flight request still holds the old snapshot
+        self.assertEqual(builder.status()["retired_alive"], 1)
+
+        del held
+        gc.collect()
+
+        self.assertEqual(builder.status()["retired_alive"], 0)
+
+    def test_background_thread_publishes_new_versions(self):
+        builder = IndexBuilder(build=self._build, interval=0.01)
+        builder.start()
+        self.addCleanup(builder.stop, 5)
+
+        deadline = time.monotonic() + 5
+        while builder.status()["version"] != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.version = 2
+        while builder.status()["version"] != 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        status = builder.status()
+        self.assertTrue(status["running"])
+        self.assertEqual(status["version"], 2)
+        self.assertGreaterEqual(status["age_seconds"], 0)
+
+    def test_bm25_lookup_by_product_type(self):
+        laptop = MagicMock()
+        snapshot = _snapshot(1, bm25={"laptop": laptop})
+
+        self.assertIs(snapshot.bm25_index("laptop"), laptop)
+        self.assertIsNone(snapshot.bm25_index("tablet"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from Data_Base import ingestion
+
+
+def _record(i):
+    return {
+        "metadata": {
+            "source": "test",
+            "scraped_at": "2024-01-01T00:00:00Z",
+            "search_query": "gaming laptop",
+        },
+        "product": {
+            "title": f"Laptop {i}",
+            "price": "1,000",
+            "link": f"https://example.com/{i}?ref=x",
+            "details_text": "16GB RAM",
+        },
+    }
+
+
+class IngestRecordsTests(unittest.TestCase):
+    @patch("Data_Base.ingestion.bump_catalog_version")
+    @patch("Data_Base.ingestion.update_bm25_index")
+    @patch("Data_Base.ingestion.get_embedding_model")
+    @patch("Data_Base.ingestion.get_collection")
+    def test_new_products_are_embedded_in_one_batch(
+        self, mock_collection, mock_model, mock_bm25, mock_bump
+    ):
+        collection = MagicMock()
+        collection.find.return_value = [
+            {"product": {"link": "https://example.com/0", "product_type": "laptop"}}
+        ]
+        collection.update_one.return_value.upserted_id = "new"
+        mock_collection.return_value = collection
+
+        model = mock_model.return_value
+        model.encode.side_effect = lambda texts: np.ones((len(texts), 4), dtype=np.float32)
+
+        summary = ingestion.ingest_records([_record(i) for i in range(4)] + [{"bad": 1}])
+
+        self.assertEqual(summary["inserted"], 4)
+        self.assertEqual(summary["failed"], 1)
+        collection.find.assert_called_once()
+        model.encode.assert_called_once()
+        self.assertEqual(len(model.encode.call_args[0][0]), 3)
+
+        embedded = [
+            call.args[1]["$set"].get("product.embedding")
+            for call in collection.update_one.call_args_list
+        ]
+        self.assertIsNone(embedded[0])
+        self.assertTrue(all(isinstance(e, bytes) for e in embedded[1:]))
+        mock_bm25.assert_called_once()
+        mock_bump.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
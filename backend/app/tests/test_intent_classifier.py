@@ -0,0 +1,150 @@
+import asyncio
+import re
+import unittest
+import zlib
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+
+from agents.recommendation.intent_classifier import (
+    IntentClassifier,
+    extract_brand,
+    extract_budget,
+    extract_preferences,
+)
+from agents.recommendation.intent_router import RecommendationIntentRouter, intent_routing_stats
+
+EXAMPLES = {
+    "refine_budget": ["under 15000", "keep it below 20k", "my budget is 1000"],
+    "refine_brand": ["I want Dell", "only show Apple", "I prefer Lenovo"],
+    "ask_explanation": ["why these", "why did you pick these", "explain your choices"],
+    "new_search": ["I want a phone instead", "show me TVs instead", "new search for a tablet"],
+}
+
+
+class BagOfWordsEncoder:
+    """
+    Deterministic stand-in for EmbeddingModel: hashed word counts.
+    """
+
+    DIM = 256
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.DIM), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            for word in re.findall(r"[a-z]+", text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.DIM] += 1.0
+
+        return vectors
+
+
+class ExtractionTests(unittest.TestCase):
+    def test_budget_bounds(self):
+        cases = {
+            "under 20k": (None, 20000.0),
+            "between 10k and 20k": (10000.0, 20000.0),
+            "price range 5000-7000": (5000.0, 7000.0),
+            "no more than 1,500 EGP": (None, 1500.0),
+            "at least $800": (800.0, None),
+            "16GB RAM under $1200": (None, 1200.0),
+            "$800": (None, 800.0),
+            "around 900 dollars": (None, 900.0),
+            "i want the 2020 and 2021 models": (None, None),
+            "between $1900 and $2100": (1900.0, 2100.0),
+            "make it cheaper": (None, None),
+            "compare the first 2 and 3": (None, None),
+            "a 15 inch screen": (None, None),
+        }
+
+        for text, expected in cases.items():
+            self.assertEqual(extract_budget(text), expected, text)
+
+    def test_brand_and_preferences(self):
+        self.assertEqual(extract_brand("show me HP laptops"), "hp")
+        self.assertIsNone(extract_brand("is php supported"))
+        self.assertEqual(
+            extract_preferences("good camera and battery"), {"camera": 0.9, "battery": 0.9}
+        )
+
+
+class IntentClassifierTests(unittest.TestCase):
+    def setUp(self):
+        self.classifier = IntentClassifier(
+            BagOfWordsEncoder(), examples=EXAMPLES, min_score=0.3, min_margin=0.05
+        )
+
+    def test_confident_predictions_carry_extracted_slots(self):
+        prediction = self.classifier.classify("why did you choose these")
+        self.assertEqual(prediction.intent, "ask_explanation")
+        self.assertTrue(prediction.confident)
+
+        route = self.classifier.classify("only show Samsung").route()
+        self.assertEqual(route["intent"], "refine_brand")
+        self.assertEqual(route["brand"], "samsung")
+
+    def test_budget_numbers_decide_between_close_intents(self):
+        prediction = self.classifier.classify("keep it under 900")
+
+        self.assertEqual(prediction.intent, "refine_budget")
+        self.assertTrue(prediction.confident)
+        self.assertEqual((prediction.budget_min, prediction.budget_max), (None, 900.0))
+
+    def test_numbers_only_decide_for_a_stated_and_plausible_budget(self):
+        # refine_budget is the runner-up but scores below min_score
+        self.assertEqual(
+            self.classifier.classify("why pick these under 900").intent, "ask_explanation"
+        )
+
+        # years are not a budget, even when refine_budget is the runner-up
+        lenient = IntentClassifier(
+            BagOfWordsEncoder(), examples=EXAMPLES, min_score=0.2, min_margin=0.05
+        )
+        self.assertEqual(
+            lenient.classify("why did you keep it 2020 to 2021").intent, "ask_explanation"
+        )
+
+    def test_missing_slot_or_unknown_phrasing_is_not_confident(self):
+        # brand intent without a known brand
+        self.assertFalse(self.classifier.classify("only show Framework").confident)
+        self.assertFalse(self.classifier.classify("does it have thunderbolt").confident)
+
+
+class IntentRouterFastPathTests(unittest.TestCase):
+    def _router(self):
+        with patch("agents.recommendation.intent_router.get_async_groq_client"):
+            return RecommendationIntentRouter(
+                classifier=IntentClassifier(
+                    BagOfWordsEncoder(), examples=EXAMPLES, min_score=0.3, min_margin=0.05
+                )
+            )
+
+    def test_confident_turns_skip_the_llm(self):
+        router = self._router()
+        before = intent_routing_stats()["local"]
+
+        with patch(
+            "agents.recommendation.intent_router.acached_chat_completion", AsyncMock()
+        ) as llm:
+            result = asyncio.run(router.route("I want Dell", []))
+
+        llm.assert_not_awaited()
+        self.assertEqual(result["intent"], "refine_brand")
+        self.assertEqual(set(result), {"intent", "budget_min", "budget_max", "brand", "preferences"})
+        self.assertEqual(intent_routing_stats()["local"], before + 1)
+
+    def test_uncertain_turns_fall_back_to_the_llm(self):
+        router = self._router()
+
+        with patch(
+            "agents.recommendation.intent_router.acached_chat_completion",
+            AsyncMock(return_value='{"intent": "general_question"}'),
+        ) as llm:
+            result = asyncio.run(router.route("does it have thunderbolt", []))
+
+        llm.assert_awaited_once()
+        self.assertEqual(result["intent"], "general_question")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from agents.shared.llm_cache import (
+    LLMResponseCache,
+    acached_chat_completion,
+    cached_chat_completion,
+    request_key,
+)
+
+REQUEST = {
+    "model": "llama-3.3-70b-versatile",
+    "messages": [{"role": "user", "content": "1,2,3?"}],
+    "temperature": 0,
+}
+
+
+class LLMResponseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = LLMResponseCache(ttls={"recommendation.reranker": 60}, use_mongo=False)
+
+    def test_key_covers_model_messages_and_params(self):
+        self.assertEqual(request_key(REQUEST), request_key(dict(reversed(list(REQUEST.items())))))
+        self.assertNotEqual(request_key(REQUEST), request_key({**REQUEST, "model": "other"}))
+        self.assertNotEqual(request_key(REQUEST), request_key({**REQUEST, "max_tokens": 10}))
+
+    def test_repeated_request_is_served_from_memory(self):
+        call = MagicMock(return_value="1,2")
+
+        first = self.cache.get_or_call("recommendation.reranker", REQUEST, call)
+        second = self.cache.get_or_call("recommendation.reranker", dict(REQUEST), call)
+
+        self.assertEqual((first, second), ("1,2", "1,2"))
+        call.assert_called_once()
+
+        stats = self.cache.stats()["recommendation.reranker"]
+        self.assertEqual((stats["memory_hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["ttl_seconds"], 60)
+
+    def test_sampled_requests_are_not_cached(self):
+        call = MagicMock(return_value="text")
+        request = {**REQUEST, "temperature": 0.5}
+
+        self.cache.get_or_call("recommendation.chat", request, call)
+        self.cache.get_or_call("recommendation.chat", request, call)
+
+        self.assertEqual(call.call_count, 2)
+        self.assertEqual(self.cache.stats()["recommendation.chat"]["bypassed"], 2)
+
+    def test_requests_without_an_explicit_zero_temperature_are_not_cached(self):
+        call = MagicMock(return_value="text")
+        request = {key: value for key, value in REQUEST.items() if key != "temperature"}
+
+        self.cache.get_or_call("recommendation.chat", request, call)
+        self.cache.get_or_call("recommendation.chat", request, call)
+
+        self.assertEqual(call.call_count, 2)
+
+    def test_responses_the_caller_cannot_parse_are_not_cached(self):
+        call = MagicMock(side_effect=["sorry no ranking", "not json", "1,2", "3"])
+
+        def validate(text):
+            if text == "not json":
+                raise ValueError(text)
+            return "," in text
+
+        for expected in ["sorry no ranking", "not json", "1,2", "1,2"]:
+            self.assertEqual(
+                self.cache.get_or_call("recommendation.reranker", REQUEST, call, validate),
+                expected,
+            )
+
+        self.assertEqual(call.call_count, 3)
+        stats = self.cache.stats()["recommendation.reranker"]
+        self.assertEqual((stats["rejected"], stats["memory_hits"]), (2, 1))
+
+    def test_failed_calls_are_not_cached(self):
+        call = MagicMock(side_effect=[RuntimeError("down"), "1"])
+
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_call("recommendation.reranker", REQUEST, call)
+
+        self.assertEqual(self.cache.get_or_call("recommendation.reranker", REQUEST, call), "1")
+
+    def test_sites_are_counted_separately(self):
+        self.cache.get_or_call("recommendation.reranker", REQUEST, lambda: "1")
+        self.cache.get_or_call("recommendation.intent_router", REQUEST, lambda: "{}")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["recommendation.reranker"]["misses"], 1)
+        self.assertEqual(stats["recommendation.intent_router"]["misses"], 1)
+
+
+class MongoTierTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = LLMResponseCache(use_mongo=True)
+
+    def test_mongo_hit_skips_the_call_and_fills_memory(self):
+        call = MagicMock()
+
+        with patch(
+            "agents.shared.llm_cache.get_cache_entry",
+            return_value={"response": {"content": "1,4"}},
+        ) as get_entry:
+            first = self.cache.get_or_call("recommendation.reranker", REQUEST, call)
+            second = self.cache.get_or_call("recommendation.reranker", REQUEST, call)
+
+        self.assertEqual((first, second), ("1,4", "1,4"))
+        call.assert_not_called()
+        get_entry.assert_called_once_with(request_key(REQUEST))
+
+        stats = self.cache.stats()["recommendation.reranker"]
+        self.assertEqual((stats["mongo_hits"], stats["memory_hits"]), (1, 1))
+
+    def test_miss_is_written_with_the_site_ttl(self):
+        with patch("agents.shared.llm_cache.get_cache_entry", return_value=None), patch(
+            "agents.shared.llm_cache.upsert_cache_entry"
+        ) as upsert:
+            self.cache.get_or_call("shared.product_name_extractor", REQUEST, lambda: "{}")
+
+        kwargs = upsert.call_args.kwargs
+        self.assertEqual(kwargs["namespace"], "llm:shared.product_name_extractor")
+        self.assertEqual(kwargs["response"], {"content": "{}"})
+        self.assertEqual(kwargs["ttl_seconds"], self.cache.ttl("shared.product_name_extractor"))
+        self.assertNotIn("messages", kwargs["request_fingerprint"])
+
+    def test_mongo_errors_fall_back_to_memory_and_back_off(self):
+        with patch(
+            "agents.shared.llm_cache.get_cache_entry", side_effect=RuntimeError("no mongo")
+        ) as get_entry, patch("agents.shared.llm_cache.upsert_cache_entry") as upsert:
+            self.assertEqual(self.cache.get_or_call("recommendation.reranker", REQUEST, lambda: "1"), "1")
+            self.cache.get_or_call("recommendation.reranker", {**REQUEST, "seed": 1}, lambda: "2")
+
+        get_entry.assert_called_once()
+        upsert.assert_not_called()
+        self.assertEqual(self.cache.stats()["recommendation.reranker"]["mongo_errors"], 1)
+
+    def test_async_lookup_uses_the_async_repo(self):
+        call = AsyncMock()
+
+        async def lookup_twice():
+            first = await self.cache.aget_or_call("recommendation.intent_router", REQUEST, call)
+            second = await self.cache.aget_or_call("recommendation.intent_router", REQUEST, call)
+            return first, second
+
+        with patch(
+            "agents.shared.llm_cache.get_cache_entry_async",
+            AsyncMock(return_value={"response": {"content": "{}"}}),
+        ) as get_entry, patch("agents.shared.llm_cache.get_cache_entry") as sync_get:
+            self.assertEqual(asyncio.run(lookup_twice()), ("{}", "{}"))
+
+        call.assert_not_awaited()
+        get_entry.assert_awaited_once_with(request_key(REQUEST))
+        sync_get.assert_not_called()
+
+
+class CachedChatCompletionTests(unittest.TestCase):
+    def test_groq_client_is_called_once_per_request(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=" 2,3 "))]
+        )
+        cache = LLMResponseCache(use_mongo=False)
+
+        with patch("agents.shared.llm_cache.get_llm_cache", return_value=cache):
+            for _ in range(3):
+                text = cached_chat_completion("recommendation.reranker", client, **REQUEST)
+
+        self.assertEqual(text, " 2,3 ")
+        client.chat.completions.create.assert_called_once_with(**REQUEST)
+
+    def test_async_groq_client_is_awaited_once_per_request(self):
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(
+            return_value=SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))]
+            )
+        )
+        cache = LLMResponseCache(use_mongo=False)
+
+        async def ask_twice():
+            for _ in range(2):
+                text = await acached_chat_completion(
+                    "recommendation.intent_router", client, **REQUEST
+                )
+            return text
+
+        with patch("agents.shared.llm_cache.get_llm_cache", return_value=cache):
+            self.assertEqual(asyncio.run(ask_twice()), "{}")
+
+        client.chat.completions.create.assert_awaited_once_with(**REQUEST)
+
+
+if __name__ == "__main__":
+    unittest.main()
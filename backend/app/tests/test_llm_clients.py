@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+
+from agents.shared.llm_clients import LLMClientRegistry
+
+COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "llama-3.3-70b-versatile",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "ok"},
+            "finish_reason": "stop",
+        }
+    ],
+}
+
+
+class CountingTransport(httpx.MockTransport):
+    def __init__(self, handler):
+        super().__init__(handler)
+        self.requests = 0
+        self.closed = False
+
+    def handle_request(self, request):
+        self.requests += 1
+        return super().handle_request(request)
+
+    def close(self):
+        self.closed = True
+
+
+class LLMClientRegistryTests(unittest.TestCase):
+    def setUp(self):
+        def handler(request):
+            if request.url.path.endswith("/fail"):
+                return httpx.Response(503, json={"error": "busy"})
+            return httpx.Response(200, json=COMPLETION)
+
+        self.transport = CountingTransport(handler)
+        self.async_transport = httpx.MockTransport(handler)
+        self.registry = LLMClientRegistry(
+            transport=self.transport, async_transport=self.async_transport, max_connections=4
+        )
+
+    def test_clients_are_cached_per_site(self):
+        first = self.registry.groq("recommendation.reranker", api_key="key")
+
+        self.assertIs(self.registry.groq("recommendation.reranker", api_key="key"), first)
+        self.assertIsNot(self.registry.groq("reviews.agent", api_key="key"), first)
+        self.assertIs(first._client, self.registry.http_client("recommendation.reranker"))
+
+    def test_all_sites_share_one_transport_and_record_their_own_metrics(self):
+        reranker = self.registry.groq("recommendation.reranker", api_key="key")
+        reviews = self.registry.groq("reviews.agent", api_key="key")
+
+        for _ in range(2):
+            reranker.chat.completions.create(
+                model="llama-3.3-70b-versatile", messages=[{"role": "user", "content": "hi"}]
+            )
+        reviews.chat.completions.create(
+            model="llama-3.3-70b-versatile", messages=[{"role": "user", "content": "hi"}]
+        )
+
+        self.assertEqual(self.transport.requests, 3)
+
+        sites = self.registry.stats()["sites"]
+        self.assertEqual(sites["recommendation.reranker"]["calls"], 2)
+        self.assertEqual(sites["reviews.agent"]["calls"], 1)
+        self.assertEqual(sites["reviews.agent"]["errors"], 0)
+
+    def test_http_errors_are_counted_and_site_clients_keep_the_pool_open(self):
+        client = self.registry.http_client("search_pipeline.extractor")
+
+        response = client.post("https://api.groq.com/fail", json={})
+        client.close()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(self.transport.closed)
+        self.assertEqual(self.registry.stats()["sites"]["search_pipeline.extractor"]["http_errors"], 1)
+
+        self.registry.close()
+        self.assertTrue(self.transport.closed)
+
+    def test_async_clients_share_site_metrics(self):
+        self.registry.groq("recommendation.chat", api_key="key").chat.completions.create(
+            model="llama-3.3-70b-versatile", messages=[{"role": "user", "content": "hi"}]
+        )
+        client = self.registry.async_groq("recommendation.chat", api_key="key")
+
+        async def ask():
+            return await client.chat.completions.create(
+                model="llama-3.3-70b-versatile", messages=[{"role": "user", "content": "hi"}]
+            )
+
+        response = asyncio.run(ask())
+
+        self.assertEqual(response.choices[0].message.content, "ok")
+        self.assertIs(self.registry.async_groq("recommendation.chat", api_key="key"), client)
+        self.assertEqual(self.registry.stats()["sites"]["recommendation.chat"]["calls"], 2)
+        self.assertEqual(self.transport.requests, 1)
+
+    def test_each_event_loop_gets_its_own_keep_alive_pool(self):
+        class KeepAliveHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        registry = LLMClientRegistry()
+        client = registry.async_http_client("cli.turns")
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+        async def turn():
+            first = await client.get(url)
+            second = await client.get(url)
+            return first.status_code, second.status_code, registry.async_transport()
+
+        # a CLI calling asyncio.run() for every turn
+        results = [asyncio.run(turn()) for _ in range(3)]
+
+        self.assertEqual([codes for *codes, _ in results], [[200, 200]] * 3)
+        self.assertEqual(len({id(transport) for *_, transport in results}), 3)
+        self.assertEqual(registry.stats()["sites"]["cli.turns"]["errors"], 0)
+
+    def test_pool_limits_are_reported(self):
+        pool = self.registry.stats()["pool"]
+
+        self.assertEqual(pool["max_connections"], 4)
+
+    def test_chat_groq_uses_the_site_client(self):
+        with patch.dict("os.environ", {"GROQ_API_KEY": "key"}):
+            llm = self.registry.chat_groq("profile.agent", model="llama-3.3-70b-versatile")
+
+        self.assertIs(llm.http_client, self.registry.http_client("profile.agent"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from Data_Base import ingestion
+from agents.recommendation.near_duplicates import (
+    ClusterIndex,
+    minhash_signature,
+    new_cluster_id,
+    pack_signature,
+    product_shingles,
+    similarity,
+    unpack_signature,
+)
+
+
+def _signature(title, details=None):
+    return minhash_signature(product_shingles({"title": title, "details_text": details}))
+
+
+class MinHashTests(unittest.TestCase):
+    def test_colour_and_storage_variants_are_identical(self):
+        a = _signature("Apple iPhone 15 128GB Black")
+        b = _signature("Apple iPhone 15 (256 GB) - Blue")
+
+        self.assertEqual(similarity(a, b), 1.0)
+        self.assertLess(similarity(a, _signature("Apple iPhone 14 128GB Black")), 0.5)
+        self.assertIsNone(_signature("Black 128GB"))
+
+    def test_signature_estimates_jaccard_similarity(self):
+        words = [f"w{i}" for i in range(60)]
+        # 30 shared of 90 distinct unigrams (no bigrams: single-token titles)
+        a = minhash_signature(words[:60])
+        b = minhash_signature(words[30:] + [f"x{i}" for i in range(30)])
+
+        self.assertAlmostEqual(similarity(a, b), 30 / 90, delta=0.15)
+        np.testing.assert_array_equal(unpack_signature(pack_signature(a)), a)
+
+
+class ClusterIndexTests(unittest.TestCase):
+    def test_variants_join_the_first_cluster(self):
+        index = ClusterIndex(threshold=0.7)
+
+        first = index.assign("a", _signature("Lenovo IdeaPad 3 Laptop 8GB RAM Grey"))
+        variant = index.assign("b", _signature("Lenovo IdeaPad 3 Laptop 16GB RAM Blue"))
+        other = index.assign("c", _signature("HP Victus 15 Gaming Laptop"))
+
+        self.assertEqual(first, new_cluster_id("a"))
+        self.assertEqual(variant, first)
+        self.assertEqual(other, new_cluster_id("c"))
+        self.assertEqual(index.assign("d", None), new_cluster_id("d"))
+
+    def test_reassigning_a_product_ignores_its_old_entry(self):
+        index = ClusterIndex()
+        index.assign("a", _signature("Samsung Galaxy S24"))
+
+        # the title changed completely: it must not match itself
+        cluster = index.assign("a", _signature("Sony WH-1000XM5 headphones"))
+
+        self.assertEqual(cluster, new_cluster_id("a"))
+        self.assertEqual(len(index), 1)
+
+
+class IngestionClusteringTests(unittest.TestCase):
+    @patch("Data_Base.ingestion.bump_catalog_version")
+    @patch("Data_Base.ingestion.update_bm25_index")
+    @patch("Data_Base.ingestion.get_embedding_model")
+    @patch("Data_Base.ingestion.get_collection")
+    def test_batch_joins_stored_clusters(self, mock_collection, mock_model, _bm25, _bump):
+        stored = _signature("Xiaomi Redmi Note 13 Pro 256GB Black")
+        collection = MagicMock()
+        collection.find.return_value = [
+            {
+                "product": {
+                    "link": "https://example.com/stored",
+                    "minhash": pack_signature(stored),
+                    "cluster_id": 42,
+                }
+            }
+        ]
+        collection.update_one.return_value.upserted_id = "new"
+        mock_collection.return_value = collection
+        mock_model.return_value.encode.side_effect = lambda texts: np.ones((len(texts), 4))
+
+        titles = ["Xiaomi Redmi Note 13 Pro 512GB Blue", "JBL Tune 510BT", "JBL Tune 510BT Black"]
+        records = [
+            {
+                "metadata": {"source": "noon", "scraped_at": "2024-01-01T00:00:00Z"},
+                "product": {"title": title, "price": "100", "link": f"https://example.com/{i}"},
+            }
+            for i, title in enumerate(titles)
+        ]
+
+        ingestion.ingest_records(records)
+
+        query = collection.find.call_args.args[0]
+        self.assertIn("$or", query)
+        clusters = [
+            call.args[1]["$set"]["product.cluster_id"]
+            for call in collection.update_one.call_args_list
+        ]
+        self.assertEqual(clusters[0], 42)
+        self.assertEqual(clusters[1], clusters[2])
+        self.assertEqual(clusters[1], new_cluster_id("https://example.com/1"))
+        self.assertEqual(
+            len(collection.update_one.call_args_list[0].args[1]["$set"]["product.lsh_bands"]), 16
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,13 @@
+import asyncio
 import unittest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from agents.comparison.agent import ComparisonAgent
 from agents.reviews.agent import ReviewAgent
+from agents.shared.progress import no_progress
 from backend.app.main import rate_limit_exception_handler
 from backend.app.routes.session import router as session_router
 from backend.app.services.cache_service import build_cache_key
@@ -19,8 +21,8 @@ class SessionRouteTests(unittest.TestCase):
         self.app.include_router(session_router)
         self.client = TestClient(self.app)
 
-    @patch("backend.app.routes.session.list_messages_for_session")
-    @patch("backend.app.routes.session.load_session")
+    @patch("backend.app.routes.session.list_messages_for_session_async")
+    @patch("backend.app.routes.session.load_session_async")
     def test_messages_endpoint_passes_limit(self, mock_load_session, mock_list_messages):
         mock_load_session.return_value = {"session_id": "session_1", "status": "active"}
         mock_list_messages.return_value = []
@@ -107,8 +109,8 @@ class AgentStateTests(unittest.TestCase):
 
 class RecommendationFlowTests(unittest.TestCase):
     @patch("backend.app.services.recommendation_service._initialize_recommendation_session")
-    @patch("backend.app.services.recommendation_service.append_user_message")
-    @patch("backend.app.services.recommendation_service.load_session")
+    @patch("backend.app.services.recommendation_service.append_user_message_async")
+    @patch("backend.app.services.recommendation_service.load_session_async")
     @patch("backend.app.services.recommendation_service.enforce_rate_limit")
     def test_empty_recommendation_session_initializes_from_chat(
         self,
@@ -130,7 +132,7 @@ class RecommendationFlowTests(unittest.TestCase):
             "data": {"products": []},
         }
 
-        response = chat_recommendation("user_1", "session_1", "gaming laptop under 1500")
+        response = asyncio.run(chat_recommendation("user_1", "session_1", "gaming laptop under 1500"))
 
         self.assertEqual(response["type"], "recommendations")
         mock_append_user_message.assert_called_once_with(
@@ -143,13 +145,14 @@ class RecommendationFlowTests(unittest.TestCase):
             "user_1",
             "session_1",
             "gaming laptop under 1500",
+            progress=no_progress,
         )
 
     @patch("backend.app.services.recommendation_service._open_reset_recommendation_session")
-    @patch("backend.app.services.recommendation_service.close_session_for_user")
+    @patch("backend.app.services.recommendation_service.close_session_for_user_async")
     @patch("backend.app.services.recommendation_service.RecommendationChatHandler")
-    @patch("backend.app.services.recommendation_service.recent_history")
-    @patch("backend.app.services.recommendation_service.load_session")
+    @patch("backend.app.services.recommendation_service.recent_history_async")
+    @patch("backend.app.services.recommendation_service.load_session_async")
     @patch("backend.app.services.recommendation_service.enforce_rate_limit")
     def test_new_search_opens_new_session(
         self,
@@ -171,19 +174,71 @@ class RecommendationFlowTests(unittest.TestCase):
             },
         }
         mock_recent_history.return_value = []
-        mock_handler_cls.return_value.handle.return_value = {
-            "type": "new_search",
-            "data": {"message": "Starting a new search. What are you looking for?"},
-        }
+        mock_handler_cls.return_value.handle = AsyncMock(
+            return_value={
+                "type": "new_search",
+                "data": {"message": "Starting a new search. What are you looking for?"},
+            }
+        )
         mock_open_reset.return_value = "session_new"
 
-        response = chat_recommendation("user_1", "session_old", "new search")
+        response = asyncio.run(chat_recommendation("user_1", "session_old", "new search"))
 
         self.assertEqual(response["type"], "reset")
         self.assertEqual(response["session_id"], "session_new")
         mock_close_session.assert_called_once_with("user_1", "session_old")
         mock_open_reset.assert_called_once_with("user_1", "new search")
 
+    @patch("backend.app.services.recommendation_service.append_assistant_message_async")
+    @patch("backend.app.services.recommendation_service.append_user_message_async")
+    @patch("backend.app.services.recommendation_service.persist_session_state_async")
+    @patch("backend.app.services.recommendation_service.RecommendationChatHandler")
+    @patch("backend.app.services.recommendation_service.recent_history_async")
+    @patch("backend.app.services.recommendation_service.load_session_async")
+    @patch("backend.app.services.recommendation_service.enforce_rate_limit")
+    def test_refinement_keeps_candidate_pool_in_agent_state(
+        self,
+        _mock_rate_limit,
+        mock_load_session,
+        mock_recent_history,
+        mock_handler_cls,
+        mock_persist,
+        _mock_append_user,
+        mock_append_assistant,
+    ):
+        old_pool = {"format": 1, "products": [{"link": "p1"}], "semantic": [0.5]}
+        new_pool = {"format": 1, "products": [{"link": "p2"}], "semantic": [0.4]}
+        mock_load_session.return_value = {
+            "session_id": "session_1",
+            "agent_type": "recommendation",
+            "status": "active",
+            "agent_state": {
+                "raw_profile_snapshot": {"category": "laptop"},
+                "adapted_profile": {"category": "laptop"},
+                "last_recommendations": [{"link": "p1"}],
+                "candidate_pool": old_pool,
+            },
+        }
+        mock_recent_history.return_value = []
+        mock_handler_cls.return_value.handle = AsyncMock(
+            return_value={
+                "type": "recommendation_update",
+                "data": [{"link": "p2"}],
+                "profile": {"category": "laptop", "budget_max": 900},
+                "candidate_pool": new_pool,
+            }
+        )
+
+        response = asyncio.run(chat_recommendation("user_1", "session_1", "make it cheaper"))
+
+        self.assertEqual(response["type"], "recommendations")
+        handle_kwargs = mock_handler_cls.return_value.handle.call_args.kwargs
+        self.assertEqual(handle_kwargs["candidate_pool"], old_pool)
+
+        saved_state = mock_persist.call_args.args[2]
+        self.assertEqual(saved_state["candidate_pool"], new_pool)
+        self.assertNotIn("candidate_pool", mock_append_assistant.call_args.kwargs["payload"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -39,6 +39,7 @@ class ReviewProductNameTests(unittest.TestCase):
         mock_analyze_reviews.assert_called_once_with(
             "HP EliteBook 845 G8",
             ["Great laptop review transcript"],
+            progress=agent.progress,
         )
         self.assertEqual(result["summary"], "Solid business laptop")
 
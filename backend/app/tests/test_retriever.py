@@ -0,0 +1,134 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from Data_Base import catalog_repo
+from agents.shared.lru_cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTTLTests(unittest.TestCase):
+    def test_entries_expire_and_evictions_are_counted(self):
+        clock = FakeClock()
+        cache = LRUCache(2, ttl=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 5
+        cache.put("b", 2)
+        cache.put("c", 3)
+
+        self.assertIsNone(cache.get("a"))  # evicted by size
+
+        clock.now = 12
+        self.assertEqual(cache.get("b"), 2)
+
+        clock.now = 16
+        self.assertIsNone(cache.get("c"))  # stored at 5, ttl 10
+
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["expirations"], 1)
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+
+class ProductRetrieverCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.snapshots = {1: self._snapshot(1), 2: self._snapshot(2)}
+        self.version = 1
+
+        patches = [
+            patch("agents.recommendation.retriever.ProductVectorIndex"),
+            patch(
+                "agents.recommendation.retriever.get_catalog_snapshot",
+                side_effect=lambda: self.snapshots[self.version],
+            ),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        from agents.recommendation.retriever import ProductRetriever
+
+        self.retriever = ProductRetriever()
+
+    @staticmethod
+    def _snapshot(version):
+        snapshot = MagicMock(version=version)
+        snapshot.rows_for.return_value = np.arange(1)
+        snapshot.products.side_effect = lambda rows: [{"link": f"v{version}"} for _ in rows]
+        return snapshot
+
+    def test_repeated_filter_queries_are_served_from_cache(self):
+        first = self.retriever.retrieve_candidates("laptop", price_max=1000)
+        second = self.retriever.retrieve_candidates("laptop", price_max=1000)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.snapshots[1].products.call_count, 1)
+        self.assertEqual(self.retriever.cache_stats()["hits"], 1)
+
+    def test_new_catalog_version_invalidates_cached_results(self):
+        self.retriever.retrieve_candidates("laptop")
+
+        self.version = 2
+        results = self.retriever.retrieve_candidates("laptop")
+
+        self.assertEqual(results[0]["product"]["link"], "v2")
+        stats = self.retriever.cache_stats()
+        self.assertEqual((stats["invalidations"], stats["catalog_version"]), (1, 2))
+
+    def test_repeated_vector_searches_are_served_from_cache(self):
+        index = MagicMock(catalog_version=1)
+        index.search.return_value = ["a", "b"]
+        embedding = np.ones(4, dtype=np.float32)
+
+        first = self.retriever.vector_links(embedding, "laptop", vector_index=index)
+        second = self.retriever.vector_links(embedding.copy(), "laptop", vector_index=index)
+        self.retriever.vector_links(embedding, "laptop", rows=np.arange(3), vector_index=index)
+
+        self.assertEqual(first, second)
+        self.assertEqual(index.search.call_count, 2)
+
+        index.catalog_version = 2
+        self.retriever.vector_links(embedding, "laptop", vector_index=index)
+
+        self.assertEqual(index.search.call_count, 3)
+        self.assertEqual(self.retriever.cache_stats()["invalidations"], 1)
+
+    def test_empty_vector_search_falls_back_to_the_snapshot_filter(self):
+        self.retriever.vector_index.search_rows.return_value = np.empty(0, dtype=np.int64)
+
+        results = self.retriever.retrieve_candidates("laptop", user_embedding=np.ones(4))
+
+        self.assertEqual(results, [{"product": {"link": "v1"}}])
+        self.snapshots[1].rows_for.assert_called_once_with("laptop", None, None)
+
+
+class CatalogVersionPollingTests(unittest.TestCase):
+    def setUp(self):
+        catalog_repo._cached_version = None
+        self.addCleanup(setattr, catalog_repo, "_cached_version", None)
+
+    @patch("Data_Base.catalog_repo.get_catalog_meta_collection")
+    def test_version_is_read_once_per_poll_window(self, mock_meta):
+        mock_meta.return_value.find_one.return_value = {"version": 4}
+
+        self.assertEqual(catalog_repo.current_catalog_version(max_age=60), 4)
+        self.assertEqual(catalog_repo.current_catalog_version(max_age=60), 4)
+        mock_meta.return_value.find_one.assert_called_once()
+
+        mock_meta.return_value.find_one_and_update.return_value = {"version": 5}
+        catalog_repo.bump_catalog_version()
+
+        self.assertEqual(catalog_repo.current_catalog_version(max_age=60), 5)
+        mock_meta.return_value.find_one.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+from Data_Base.embedding_codec import encode_embedding
+from agents.recommendation.scorer import ProductScorer
+
+
+def _candidate(link, price, embedding):
+    return {"product": {"link": link, "title": link, "price": price, "embedding": embedding}}
+
+
+class ProductScorerTests(unittest.TestCase):
+    def setUp(self):
+        self.scorer = ProductScorer("user_1")
+        self.user = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+    def test_price_and_penalty_terms_match_the_scalar_rules(self):
+        same = [1.0, 0.0, 0.0, 0.0]
+        candidates = [
+            _candidate("within", 500.0, same),
+            _candidate("mild", 1100.0, same),
+            _candidate("strong", 1300.0, same),
+            _candidate("unpriced", None, same),
+        ]
+
+        ranked = self.scorer.rank_products(candidates, self.user, user_price_max=1000.0)
+        by_link = {r["link"]: r for r in ranked}
+
+        # 0.6 * semantic + 0.4 * price_score + penalty (15% tolerance)
+        self.assertEqual(by_link["within"]["final_score"], 1.0 * 0.6 + 0.75 * 0.4 + 0.0)
+        mild_price = max(0.0, 1 - (1.1 - 1))
+        mild_penalty = -0.2 * ((1100.0 - 1000.0) / (1000.0 * 1.15 - 1000.0))
+        self.assertEqual(by_link["mild"]["final_score"], 0.6 + mild_price * 0.4 + mild_penalty)
+        self.assertEqual(by_link["strong"]["final_score"], 0.6 + 0.7 * 0.4 - 0.8)
+        self.assertEqual(by_link["unpriced"]["price_score"], 0.0)
+        self.assertEqual(by_link["unpriced"]["final_score"], 0.6)
+        self.assertEqual([r["link"] for r in ranked], ["within", "mild", "unpriced", "strong"])
+
+    def test_semantic_scores_match_dot_products_for_mixed_storage(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(30, 4)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        candidates = [
+            _candidate(str(i), 100.0, encode_embedding(v) if i % 2 else v.tolist())
+            for i, v in enumerate(vectors)
+        ]
+        ranked = self.scorer.rank_products(candidates, self.user, top_k=30)
+
+        for result in ranked:
+            i = int(result["link"])
+            stored = vectors[i].astype(np.float16).astype(np.float32) if i % 2 else vectors[i]
+            self.assertAlmostEqual(result["semantic_score"], float(np.dot(self.user, stored)), places=6)
+
+        scores = [r["final_score"] for r in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_ties_keep_candidate_order_and_top_k_applies(self):
+        candidates = [_candidate(str(i), 100.0, [0.5, 0.5, 0.5, 0.5]) for i in range(10)]
+
+        ranked = self.scorer.rank_products(candidates, self.user, top_k=3)
+
+        self.assertEqual([r["link"] for r in ranked], ["0", "1", "2"])
+        self.assertEqual(self.scorer.rank_products([], self.user), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import asyncio
 import time
 import unittest
 from unittest.mock import patch
@@ -11,7 +12,7 @@ class SearchServiceTests(unittest.TestCase):
 
     @patch("backend.app.services.search_service.insert_search_history")
     @patch("backend.app.services.search_service.upsert_search_session")
-    @patch("backend.app.services.search_service.ensure_user")
+    @patch("backend.app.services.search_service.ensure_user_async")
     @patch("backend.app.services.search_service.enforce_rate_limit")
     def test_cache_hit_skips_pipeline_and_persists_session_history(
         self,
@@ -26,10 +27,12 @@ class SearchServiceTests(unittest.TestCase):
             "timestamp": time.time(),
         }
 
-        with patch.object(search_service.pipeline, "run") as mock_pipeline_run:
-            response = search_service.run_search(
-                user_id="user_1",
-                message="  Gaming   Laptop Under 1500  ",
+        with patch.object(search_service.pipeline, "arun") as mock_pipeline_run:
+            response = asyncio.run(
+                search_service.run_search(
+                    user_id="user_1",
+                    message="  Gaming   Laptop Under 1500  ",
+                )
             )
 
         self.assertEqual(response["status"], "success")
@@ -50,7 +53,7 @@ class SearchServiceTests(unittest.TestCase):
 
     @patch("backend.app.services.search_service.insert_search_history")
     @patch("backend.app.services.search_service.upsert_search_session")
-    @patch("backend.app.services.search_service.ensure_user")
+    @patch("backend.app.services.search_service.ensure_user_async")
     @patch("backend.app.services.search_service.enforce_rate_limit")
     def test_cache_miss_runs_pipeline_and_populates_cache(
         self,
@@ -61,10 +64,12 @@ class SearchServiceTests(unittest.TestCase):
     ):
         products = [{"title": "Budget Laptop"}, {"title": "Creator Laptop"}]
 
-        with patch.object(search_service.pipeline, "run", return_value=products) as mock_pipeline_run:
-            response = search_service.run_search(
-                user_id="user_2",
-                message="budget laptop",
+        with patch.object(search_service.pipeline, "arun", return_value=products) as mock_pipeline_run:
+            response = asyncio.run(
+                search_service.run_search(
+                    user_id="user_2",
+                    message="budget laptop",
+                )
             )
 
         self.assertEqual(response["status"], "success")
@@ -90,7 +95,7 @@ class SearchServiceTests(unittest.TestCase):
 
     @patch("backend.app.services.search_service.insert_search_history")
     @patch("backend.app.services.search_service.upsert_search_session")
-    @patch("backend.app.services.search_service.ensure_user")
+    @patch("backend.app.services.search_service.ensure_user_async")
     @patch("backend.app.services.search_service.enforce_rate_limit")
     def test_expired_cache_entry_triggers_pipeline(
         self,
@@ -105,10 +110,12 @@ class SearchServiceTests(unittest.TestCase):
         }
         products = [{"title": "Fresh Monitor"}]
 
-        with patch.object(search_service.pipeline, "run", return_value=products) as mock_pipeline_run:
-            response = search_service.run_search(
-                user_id="user_3",
-                message="gaming monitor",
+        with patch.object(search_service.pipeline, "arun", return_value=products) as mock_pipeline_run:
+            response = asyncio.run(
+                search_service.run_search(
+                    user_id="user_3",
+                    message="gaming monitor",
+                )
             )
 
         self.assertEqual(response["status"], "success")
@@ -132,5 +139,34 @@ class SearchServiceTests(unittest.TestCase):
         )
 
 
+class AsyncSearchTests(unittest.TestCase):
+    def setUp(self):
+        search_service._SEARCH_CACHE.clear()
+
+    @patch("backend.app.services.search_service._persist_search_artifacts")
+    @patch("backend.app.services.search_service.ensure_user_async")
+    @patch("backend.app.services.search_service.enforce_rate_limit")
+    def test_concurrent_searches_overlap_on_one_event_loop(self, *_):
+        delay = 0.2
+
+        async def slow_pipeline(query, search_limit, top_k):
+            await asyncio.sleep(delay)
+            return [{"title": query}]
+
+        async def run_all():
+            return await asyncio.gather(
+                *(search_service.run_search(f"user_{i}", f"query {i}") for i in range(50))
+            )
+
+        with patch.object(search_service.pipeline, "arun", side_effect=slow_pipeline):
+            started = time.perf_counter()
+            responses = asyncio.run(run_all())
+            elapsed = time.perf_counter() - started
+
+        self.assertTrue(all(r["status"] == "success" for r in responses))
+        # 50 sequential upstream waits would take 10s
+        self.assertLess(elapsed, 10 * delay)
+
+
 if __name__ == "__main__":
     unittest.main()
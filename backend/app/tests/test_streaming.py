@@ -0,0 +1,185 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agents.shared.progress import astream_chat_completion, no_progress, stream_chat_completion
+from backend.app.routes.recommendation import router as recommendation_router
+from backend.app.routes.review import router as review_router
+from backend.app.services.rate_limit_service import RateLimitExceeded
+from backend.app.services.stream_service import format_sse
+
+REQUEST = {"model": "llama-3.3-70b-versatile", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def _parse_sse(body: str) -> list:
+    events = []
+
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+
+    return events
+
+
+class StreamChatCompletionTests(unittest.TestCase):
+    def test_tokens_are_reported_and_joined(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = iter(
+            [_chunk("Good"), _chunk(None), _chunk(" battery")]
+        )
+        events = []
+
+        text = stream_chat_completion(client, lambda *event: events.append(event), **REQUEST)
+
+        self.assertEqual(text, "Good battery")
+        self.assertEqual(events, [("token", {"text": "Good"}), ("token", {"text": " battery"})])
+        client.chat.completions.create.assert_called_once_with(stream=True, **REQUEST)
+
+    def test_without_progress_the_completion_is_not_streamed(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))]
+        )
+
+        self.assertEqual(stream_chat_completion(client, no_progress, **REQUEST), "ok")
+        client.chat.completions.create.assert_called_once_with(**REQUEST)
+
+    def test_async_client_is_streamed(self):
+        async def chunks():
+            for text in ["a", "b"]:
+                yield _chunk(text)
+
+        async def create(**_):
+            return chunks()
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        events = []
+
+        text = asyncio.run(
+            astream_chat_completion(client, lambda *event: events.append(event), **REQUEST)
+        )
+
+        self.assertEqual(text, "ab")
+        self.assertEqual(len(events), 2)
+
+
+class RecommendationProgressTests(unittest.TestCase):
+    products = [
+        {
+            "link": link,
+            "title": f"Laptop {link}",
+            "price": 900.0,
+            "cluster_id": index,
+            "embedding": [1.0, 0.0],
+        }
+        for index, link in enumerate("abc")
+    ]
+
+    def _agent(self):
+        from agents.recommendation.agent import RecommendationAgent
+
+        agent = RecommendationAgent("user_1", engine=MagicMock())
+        agent.model.encode.return_value = np.array([[1.0, 0.0]], dtype=np.float32)
+        agent.reranker.rerank.side_effect = lambda _, ranked, top_k: ranked
+        return agent
+
+    def test_provisional_products_are_sent_before_the_llm_rerank(self):
+        agent = self._agent()
+        events = []
+        agent.progress = lambda *event: events.append(event)
+
+        def rerank(_, ranked, top_k):
+            events.append(("rerank", None))
+            return ranked
+
+        agent.reranker.rerank.side_effect = rerank
+
+        with patch.object(
+            agent, "_retrieve_hybrid", return_value=[{"product": p} for p in self.products]
+        ):
+            agent.recommend({"category": "laptop", "budget_max": 1000}, top_k=2)
+
+        names = [name for name, _ in events]
+        self.assertLess(names.index("partial"), names.index("rerank"))
+        self.assertEqual(len(events[names.index("partial")][1]["products"]), 2)
+
+    def test_unstreamed_requests_skip_the_provisional_list(self):
+        agent = self._agent()
+
+        with patch.object(
+            agent, "_retrieve_hybrid", return_value=[{"product": p} for p in self.products]
+        ), patch.object(agent, "_finalize", wraps=agent._finalize) as finalize:
+            agent.recommend({"category": "laptop", "budget_max": 1000}, top_k=2)
+
+        finalize.assert_called_once()
+
+
+class StreamRouteTests(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(review_router)
+        app.include_router(recommendation_router)
+        self.client = TestClient(app)
+
+    def test_format_sse_frames_json(self):
+        self.assertEqual(
+            format_sse("token", {"text": "é"}),
+            'event: token\ndata: {"text": "é"}\n\n',
+        )
+
+    @patch("backend.app.routes.review.start_review")
+    def test_review_stream_sends_progress_then_the_result(self, mock_start_review):
+        def start_review(user_id, message, progress):
+            progress("stage", {"stage": "searching"})
+            progress("partial", {"sources": [{"url": "https://youtube.com/watch?v=1"}]})
+            progress("token", {"text": "{"})
+            return {"status": "success", "type": "review", "session_id": "s1", "data": {}}
+
+        mock_start_review.side_effect = start_review
+
+        response = self.client.post(
+            "/review/start/stream",
+            json={"user_id": "user_1", "message": "iphone 15 reviews"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+
+        events = _parse_sse(response.text)
+        self.assertEqual(
+            [event for event, _ in events],
+            ["stage", "stage", "partial", "token", "result"],
+        )
+        self.assertEqual(events[0][1], {"stage": "accepted"})
+        self.assertEqual(events[-1][1]["session_id"], "s1")
+
+    @patch("backend.app.routes.recommendation.chat_recommendation")
+    def test_recommendation_stream_reports_rate_limits_as_error_events(self, mock_chat):
+        async def chat_recommendation(**_):
+            raise RateLimitExceeded("Rate limit exceeded", 20, 12)
+
+        mock_chat.side_effect = chat_recommendation
+
+        response = self.client.post(
+            "/recommendation/chat/stream",
+            json={"user_id": "user_1", "session_id": "s1", "message": "cheaper"},
+        )
+
+        event, data = _parse_sse(response.text)[-1]
+        self.assertEqual(event, "error")
+        self.assertEqual(data["retry_after_seconds"], 12)
+        self.assertEqual(mock_chat.call_args.kwargs["session_id"], "s1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from Data_Base.embedding_codec import decode_embedding, encode_embedding
+from agents.recommendation.catalog_snapshot import build_snapshot
+from agents.recommendation.vector_index import ProductVectorIndex
+
+
+TYPES = ("laptop", "earbuds", "phone")
+
+
+def _catalog(num_products, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(num_products, dim)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        {
+            "product": {
+                "link": f"https://example.com/{i}",
+                "product_type": TYPES[i % len(TYPES)],
+                "price": float(i),
+                # mix of packed Binary and legacy float-array storage
+                "embedding": encode_embedding(vector) if i % 2 else vector.tolist(),
+            }
+        }
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def _collection(products):
+    collection = MagicMock()
+    collection.count_documents.return_value = len(products)
+    collection.distinct.return_value = list(TYPES)
+
+    def find(query, _projection):
+        product_type = query.get("product.product_type")
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.batch_size.side_effect = lambda _size: iter(
+            sorted(
+                (p for p in products if p["product"]["product_type"] == product_type),
+                key=lambda p: p["product"]["link"],
+            )
+        )
+        return cursor
+
+    collection.find.side_effect = find
+    return collection
+
+
+class ProductVectorIndexPersistenceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.products = _catalog(300)
+        self.snapshot = build_snapshot(_collection(self.products), 1)
+
+        root_patch = patch("agents.recommendation.vector_index.FAISS_ROOT", self.root)
+        root_patch.start()
+        self.addCleanup(root_patch.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _query(self, i):
+        return decode_embedding(self.products[i]["product"]["embedding"])
+
+    def test_persisted_index_is_reused_by_a_new_process(self):
+        first = ProductVectorIndex(mode="hnsw")
+        first.build(snapshot=self.snapshot)
+
+        self.assertTrue((self.root / "v00000001-hnsw.faiss").exists())
+
+        # a new process streams its own snapshot of the same catalog
+        second = ProductVectorIndex(mode="hnsw")
+        with patch.object(second, "_build_from_snapshot") as rebuild:
+            second.build(snapshot=build_snapshot(_collection(self.products), 1))
+
+        rebuild.assert_not_called()
+        self.assertEqual(second.search(self._query(5), top_k=1), ["https://example.com/5"])
+        self.assertEqual(
+            second.search(self._query(5), top_k=1, product_type="phone"),
+            ["https://example.com/5"],
+        )
+
+    def test_persisted_index_for_a_different_snapshot_is_rebuilt(self):
+        ProductVectorIndex().build(snapshot=self.snapshot)
+
+        # same version number, but a write landed between the two reads
+        changed = build_snapshot(_collection(self.products[:-1]), 1)
+        index = ProductVectorIndex()
+        with patch.object(
+            index, "_build_from_snapshot", wraps=index._build_from_snapshot
+        ) as rebuild:
+            index.build(snapshot=changed)
+
+        rebuild.assert_called_once()
+        self.assertEqual(len(index.product_links), 299)
+
+    def test_new_catalog_version_triggers_rebuild(self):
+        index = ProductVectorIndex()
+        index.build(snapshot=self.snapshot)
+        index.build(snapshot=self.snapshot)
+
+        index.build(snapshot=build_snapshot(_collection(self.products), 2))
+
+        self.assertEqual(index.catalog_version, 2)
+        self.assertTrue((self.root / "v00000002-flat.faiss").exists())
+
+    def test_switching_product_type_does_not_rebuild(self):
+        index = ProductVectorIndex()
+        index.build(snapshot=self.snapshot)
+        built = index.index
+
+        for product_type in ("laptop", "earbuds", "laptop", "phone"):
+            index.build(product_type, snapshot=self.snapshot)
+            links = index.search(self._query(0), top_k=10, product_type=product_type)
+
+            self.assertEqual(len(links), 10)
+            for link in links:
+                i = int(link.rsplit("/", 1)[1])
+                self.assertEqual(TYPES[i % len(TYPES)], product_type)
+
+        self.assertIs(index.index, built)
+
+    def test_price_filter_restricts_results(self):
+        index = ProductVectorIndex()
+        index.build(snapshot=self.snapshot)
+
+        links = index.search(
+            self._query(0), top_k=50, product_type="laptop", price_min=30, price_max=90
+        )
+
+        # laptops are every third product, priced by position: 30, 33, ..., 90
+        prices = [float(link.rsplit("/", 1)[1]) for link in links]
+        self.assertEqual(len(prices), 21)
+        self.assertTrue(all(30 <= price <= 90 for price in prices))
+        self.assertEqual(index.search(self._query(0), product_type="tv"), [])
+
+    def test_ivfpq_falls_back_to_flat_for_small_catalogs(self):
+        index = ProductVectorIndex(mode="ivfpq")
+        index.build(snapshot=self.snapshot)
+
+        self.assertEqual(index.index_mode, "flat")
+        self.assertEqual(len(index.product_links), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
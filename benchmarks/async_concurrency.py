@@ -0,0 +1,143 @@
+"""
+Concurrency ceiling of sync vs async FastAPI handlers around an LLM call.
+
+Serves two routes that make the same Groq chat completion through the
+shared LLMClientRegistry: a sync `def` route using the sync client (what
+every route used to be) and an `async def` route awaiting the AsyncGroq
+client. Groq is replaced by a transport that answers after --latency
+seconds, so the numbers show how many calls one worker keeps in flight,
+not Groq's speed:
+
+    python -m benchmarks.async_concurrency
+    python -m benchmarks.async_concurrency --requests 1000 --latency 1.0
+
+Requests go through the ASGI app in-process (httpx.ASGITransport), so
+the sync route runs on Starlette's threadpool exactly as under uvicorn.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from agents.shared.llm_clients import LLMClientRegistry
+
+MODEL = "llama-3.3-70b-versatile"
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": MODEL,
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "ok"},
+            "finish_reason": "stop",
+        }
+    ],
+}
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class InFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+    def reset(self):
+        self.current = self.peak = 0
+
+
+class SlowGroq(httpx.BaseTransport):
+    def __init__(self, latency, in_flight):
+        self.latency = latency
+        self.in_flight = in_flight
+
+    def handle_request(self, request):
+        with self.in_flight:
+            time.sleep(self.latency)
+        return httpx.Response(200, json=COMPLETION)
+
+
+class AsyncSlowGroq(httpx.AsyncBaseTransport):
+    def __init__(self, latency, in_flight):
+        self.latency = latency
+        self.in_flight = in_flight
+
+    async def handle_async_request(self, request):
+        with self.in_flight:
+            await asyncio.sleep(self.latency)
+        return httpx.Response(200, json=COMPLETION)
+
+
+def build_app(latency, in_flight):
+    registry = LLMClientRegistry(
+        transport=SlowGroq(latency, in_flight),
+        async_transport=AsyncSlowGroq(latency, in_flight),
+    )
+    app = FastAPI()
+
+    @app.post("/sync")
+    def sync_chat():
+        client = registry.groq("bench.sync", api_key="bench")
+        response = client.chat.completions.create(model=MODEL, messages=MESSAGES)
+        return {"reply": response.choices[0].message.content}
+
+    @app.post("/async")
+    async def async_chat():
+        client = registry.async_groq("bench.async", api_key="bench")
+        response = await client.chat.completions.create(model=MODEL, messages=MESSAGES)
+        return {"reply": response.choices[0].message.content}
+
+    return app
+
+
+async def run(app, path, requests):
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.post(path) for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    assert all(r.status_code == 200 for r in responses)
+
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated Groq seconds")
+    args = parser.parse_args()
+
+    in_flight = InFlight()
+    app = build_app(args.latency, in_flight)
+
+    print(f"{args.requests} concurrent chats, {args.latency}s simulated LLM latency")
+
+    for name, path in [("sync def + Groq", "/sync"), ("async def + AsyncGroq", "/async")]:
+        in_flight.reset()
+        elapsed = asyncio.run(run(app, path, args.requests))
+
+        print(
+            f"  {name:<22} {elapsed:6.2f}s  {args.requests / elapsed:7.1f} req/s  "
+            f"peak in-flight LLM calls: {in_flight.peak}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark the sparse-matrix BM25 engine against rank_bm25.
+
+Uses a synthetic Zipf-distributed catalog so it runs without MongoDB:
+
+    python -m benchmarks.bm25_scoring
+    python -m benchmarks.bm25_scoring --sizes 5000 50000 500000 --reference-max 50000
+
+rank_bm25 keeps one Python dict per document, so at 500k documents it needs
+several GB of RAM; use --reference-max to skip it above a given size.
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+from agents.recommendation.bm25_store import BM25ShardStore
+from agents.recommendation.topk import top_k_indices
+
+VOCAB_SIZE = 30_000
+DOC_LENGTH = (12, 60)
+QUERY_LENGTH = (3, 10)
+
+
+def make_corpus(num_docs, seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(*DOC_LENGTH, size=num_docs)
+    token_ids = (rng.zipf(1.3, size=int(lengths.sum())) - 1) % VOCAB_SIZE
+
+    docs = []
+    offset = 0
+    for length in lengths:
+        docs.append([f"t{t}" for t in token_ids[offset : offset + length]])
+        offset += length
+
+    return docs
+
+
+def make_queries(num_queries, seed=1):
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(num_queries):
+        length = rng.integers(*QUERY_LENGTH)
+        ids = (rng.zipf(1.3, size=length) - 1) % VOCAB_SIZE
+        queries.append([f"t{t}" for t in ids])
+    return queries
+
+
+def _timed(fn, queries):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), results
+
+
+def run(sizes, num_queries, top_k, reference_max):
+    queries = make_queries(num_queries)
+
+    header = (
+        f"{'docs':>8} | {'engine':<10} | {'build s':>8} | "
+        f"{'p50 ms':>8} | {'p95 ms':>8} | {'top-k overlap':>13}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for size in sizes:
+        corpus = make_corpus(size)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BM25ShardStore(root=tmp)
+
+            start = time.perf_counter()
+            store.build("bench", ((str(i), doc) for i, doc in enumerate(corpus)))
+            shard = store.load("bench")
+            build_s = time.perf_counter() - start
+
+            sparse_lat, sparse_top = _timed(
+                lambda q: top_k_indices(shard.get_scores(q), top_k), queries
+            )
+
+            overlap = "n/a"
+
+            if size <= reference_max:
+                start = time.perf_counter()
+                reference = BM25Okapi(corpus)
+                ref_build_s = time.perf_counter() - start
+
+                ref_lat, ref_top = _timed(
+                    lambda q: np.argsort(-reference.get_scores(q), kind="stable")[:top_k],
+                    queries,
+                )
+
+                shared = [
+                    len(set(a.tolist()) & set(b.tolist())) / max(len(b), 1)
+                    for a, b in zip(sparse_top, ref_top)
+                ]
+                overlap = f"{np.mean(shared):.3f}"
+
+                print(
+                    f"{size:>8} | {'rank_bm25':<10} | {ref_build_s:>8.2f} | "
+                    f"{np.percentile(ref_lat, 50):>8.2f} | "
+                    f"{np.percentile(ref_lat, 95):>8.2f} | {'-':>13}"
+                )
+
+            print(
+                f"{size:>8} | {'sparse':<10} | {build_s:>8.2f} | "
+                f"{np.percentile(sparse_lat, 50):>8.2f} | "
+                f"{np.percentile(sparse_lat, 95):>8.2f} | {overlap:>13}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5_000, 50_000, 500_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=40)
+    parser.add_argument(
+        "--reference-max",
+        type=int,
+        default=500_000,
+        help="skip rank_bm25 for corpora larger than this",
+    )
+    args = parser.parse_args()
+
+    run(args.sizes, args.queries, args.top_k, args.reference_max)
+
+
+if __name__ == "__main__":
+    main()
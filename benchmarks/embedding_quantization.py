@@ -0,0 +1,133 @@
+"""
+fp32 vs int8 dynamic-quantized sentence-transformer inference on CPU.
+
+Reports encode throughput (ingestion), single-query latency
+(RecommendationAgent.recommend) and the cosine drift of int8 embeddings
+against fp32 on the same texts:
+
+    python -m benchmarks.embedding_quantization
+    python -m benchmarks.embedding_quantization --threads 4 --texts 2000
+
+The model is downloaded on first use unless --model points to a local copy.
+"""
+
+import argparse
+import copy
+import time
+
+import numpy as np
+
+from agents.recommendation.embedding_model import (
+    MODEL_NAME,
+    configure_threads,
+    cosine_drift,
+    quantize_model,
+)
+
+ADJECTIVES = ["gaming", "wireless", "budget", "premium", "lightweight", "4k", "noise cancelling"]
+PRODUCTS = ["laptop", "earbuds", "phone", "monitor", "keyboard", "headphones", "tablet"]
+DETAILS = [
+    "16GB RAM, 512GB SSD, RTX 4060",
+    "30h battery, ANC, Bluetooth 5.3",
+    "120Hz AMOLED display, 5000mAh battery",
+    "mechanical switches, RGB backlight",
+    "IPS panel, USB-C, height adjustable stand",
+]
+
+
+def make_texts(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        f"Title: {rng.choice(ADJECTIVES)} {rng.choice(PRODUCTS)} {i}\n"
+        f"Details: {rng.choice(DETAILS)}"
+        for i in range(count)
+    ]
+
+
+def _encode(model, texts, batch_size):
+    return model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+
+
+def _measure(model, texts, queries, batch_size):
+    start = time.perf_counter()
+    embeddings = _encode(model, texts, batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        _encode(model, [query], 1)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return embeddings, throughput, np.array(latencies)
+
+
+def run(model_name, num_texts, num_queries, batch_size, threads):
+    from sentence_transformers import SentenceTransformer
+
+    configure_threads(threads)
+
+    fp32 = SentenceTransformer(model_name, device="cpu")
+    int8 = quantize_model(copy.deepcopy(fp32))
+
+    texts = make_texts(num_texts)
+    queries = make_texts(num_queries, seed=1)
+
+    # warm up both models so lazy init is not timed
+    _encode(fp32, texts[:8], batch_size)
+    _encode(int8, texts[:8], batch_size)
+
+    header = (
+        f"{'mode':<5} | {'texts/s':>9} | {'query p50 ms':>12} | {'query p95 ms':>12}"
+    )
+    print(f"{model_name}, {num_texts} texts, batch={batch_size}, threads={threads or 'default'}")
+    print(header)
+    print("-" * len(header))
+
+    results = {}
+
+    for name, model in (("fp32", fp32), ("int8", int8)):
+        embeddings, throughput, latencies = _measure(model, texts, queries, batch_size)
+        results[name] = embeddings
+
+        print(
+            f"{name:<5} | {throughput:>9.1f} | "
+            f"{np.percentile(latencies, 50):>12.2f} | {np.percentile(latencies, 95):>12.2f}"
+        )
+
+    drift = cosine_drift(results["fp32"], results["int8"])
+
+    print(
+        f"\ncosine drift int8 vs fp32: mean={drift['mean']:.5f} "
+        f"p95={drift['p95']:.5f} max={drift['max']:.5f}"
+    )
+
+    # neighbour stability: does each int8 query keep its fp32 top-10?
+    fp32_top = np.argsort(-(results["fp32"] @ results["fp32"][:50].T), axis=0)[:10]
+    int8_top = np.argsort(-(results["int8"] @ results["int8"][:50].T), axis=0)[:10]
+    overlap = np.mean(
+        [len(set(a) & set(b)) / 10 for a, b in zip(fp32_top.T, int8_top.T)]
+    )
+    print(f"top-10 neighbour overlap: {overlap:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0, help="0 keeps the torch default")
+    args = parser.parse_args()
+
+    run(args.model, args.texts, args.queries, args.batch_size, args.threads)
+
+
+if __name__ == "__main__":
+    main()
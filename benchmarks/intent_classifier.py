@@ -0,0 +1,113 @@
+"""
+Accuracy, coverage and latency of the local intent classifier.
+
+Classifies the held-out utterances in fixtures/intent_utterances.json
+(none of them are in INTENT_EXAMPLES) with the real EmbeddingModel and
+reports, per intent, precision and recall of the turns the classifier
+answers itself, how many LLM router calls that saves and how long a
+local classification takes:
+
+    python -m benchmarks.intent_classifier
+    python -m benchmarks.intent_classifier --min-score 0.45 --min-margin 0.03
+
+Recall counts turns passed on to the LLM as misses, so it is the share of
+an intent's turns answered locally and correctly. --llm-ms is the LLM
+router latency used for the time-saved estimate (see
+recommendation.intent_router under GET /llm/clients for the real one).
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from agents.recommendation.embedding_model import get_embedding_model
+from agents.recommendation.intent_classifier import (
+    INTENT_EXAMPLES,
+    MIN_MARGIN,
+    MIN_SCORE,
+    IntentClassifier,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "intent_utterances.json"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES)
+    parser.add_argument("--min-score", type=float, default=MIN_SCORE)
+    parser.add_argument("--min-margin", type=float, default=MIN_MARGIN)
+    parser.add_argument("--llm-ms", type=float, default=600.0, help="LLM router latency")
+    args = parser.parse_args()
+
+    labelled = json.loads(args.fixtures.read_text(encoding="utf-8"))
+    classifier = IntentClassifier(
+        get_embedding_model(), min_score=args.min_score, min_margin=args.min_margin
+    )
+
+    started = time.perf_counter()
+    classifier.centroids()
+    print(
+        f"centroids from {sum(map(len, INTENT_EXAMPLES.values()))} examples: "
+        f"{(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+    latencies = []
+    predicted = Counter()
+    correct = Counter()
+    missed = []
+
+    for item in labelled:
+        started = time.perf_counter()
+        prediction = classifier.classify(item["text"])
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        if not prediction.confident:
+            continue
+
+        predicted[prediction.intent] += 1
+
+        if prediction.intent == item["intent"]:
+            correct[prediction.intent] += 1
+        else:
+            missed.append((item["text"], item["intent"], prediction.intent, prediction.score))
+
+    totals = Counter(item["intent"] for item in labelled)
+    local = sum(predicted.values())
+
+    print(f"\n{len(labelled)} utterances, min score {args.min_score}, min margin {args.min_margin}")
+    print(f"  {'intent':<20} {'precision':>9} {'recall':>7} {'local':>6} {'total':>6}")
+
+    for intent in INTENT_EXAMPLES:
+        precision = correct[intent] / predicted[intent] if predicted[intent] else float("nan")
+        recall = correct[intent] / totals[intent] if totals[intent] else float("nan")
+
+        print(
+            f"  {intent:<20} {precision:9.2f} {recall:7.2f} "
+            f"{predicted[intent]:6d} {totals[intent]:6d}"
+        )
+
+    accuracy = sum(correct.values()) / local if local else float("nan")
+
+    print(
+        f"\n  answered locally   {local}/{len(labelled)} ({local / len(labelled):.0%}), "
+        f"{accuracy:.0%} correct"
+    )
+    print(
+        f"  LLM calls saved    {local} "
+        f"(~{local * args.llm_ms / 1000:.1f}s at {args.llm_ms:.0f} ms/call)"
+    )
+    print(
+        f"  local latency      p50 {np.percentile(latencies, 50):.1f} ms, "
+        f"p95 {np.percentile(latencies, 95):.1f} ms"
+    )
+
+    for text, expected, got, score in missed:
+        print(f"  wrong: {text!r} -> {got} (expected {expected}, score {score})")
+
+
+if __name__ == "__main__":
+    main()
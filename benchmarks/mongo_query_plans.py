@@ -0,0 +1,218 @@
+"""
+explain() plans and latencies for the product retrieval query shapes.
+
+Seeds a throwaway database on a local mongod with synthetic products, runs
+every retrieval query shape without and then with the indexes from
+Data_Base.db.ensure_product_indexes, and prints the winning plan, keys and
+documents examined, and latency:
+
+    mongod --dbpath /tmp/mongo-bench --port 27017
+    python -m benchmarks.mongo_query_plans
+    python -m benchmarks.mongo_query_plans --uri mongodb://localhost:27018 --size 200000
+
+The database (default `retrieval_bench`) is dropped afterwards unless
+--keep is given. Never point this at the production cluster.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from pymongo import ASCENDING, InsertOne, MongoClient
+
+from Data_Base.db import ensure_product_indexes
+from Data_Base.embedding_codec import encode_embedding
+
+TYPES = ["laptop", "earbuds", "phone", "monitor", "keyboard", "headphones", "tablet", "tv"]
+EMBEDDED = {"product.embedding": {"$exists": True}}
+
+
+def seed(collection, size, dim, unembedded_share, seed_value=0):
+    rng = np.random.default_rng(seed_value)
+    batch = []
+
+    for i in range(size):
+        product = {
+            "title": f"Product {i}",
+            "price": float(rng.uniform(20, 3000)),
+            "link": f"https://example.com/{i}",
+            "details_text": "synthetic product " * 10,
+            "category": "electronics",
+            "product_type": TYPES[i % len(TYPES)],
+        }
+
+        # some products are stored before their embedding exists
+        if rng.random() >= unembedded_share:
+            vector = rng.normal(size=dim).astype(np.float32)
+            product["embedding"] = encode_embedding(vector / np.linalg.norm(vector))
+
+        batch.append(InsertOne({"product": product}))
+
+        if len(batch) >= 5000:
+            collection.bulk_write(batch, ordered=False)
+            batch = []
+
+    if batch:
+        collection.bulk_write(batch, ordered=False)
+
+    collection.create_index([("product.link", ASCENDING)], unique=True)
+
+
+def query_shapes(product_type):
+    """
+    (name, callable(collection), explain(collection)) for each retrieval path.
+    """
+    typed = dict(EMBEDDED, **{"product.product_type": product_type})
+    priced = dict(typed, **{"product.price": {"$gte": 300, "$lte": 900}})
+
+    bm25_projection = {
+        "_id": 0,
+        "product.link": 1,
+        "product.title": 1,
+        "product.details_text": 1,
+        "product.category": 1,
+    }
+    vector_projection = {
+        "_id": 0,
+        "product.link": 1,
+        "product.price": 1,
+        "product.embedding": 1,
+    }
+
+    def find_shape(query, projection, limit=0):
+        run = lambda c: list(c.find(query, projection).limit(limit))
+        explain = lambda c: c.find(query, projection).limit(limit).explain()
+        return run, explain
+
+    def explain_command(build):
+        # count/distinct have no cursor, so explain the raw command
+        return lambda c: c.database.command(
+            "explain", build(c.name), verbosity="executionStats"
+        )
+
+    return [
+        ("BM25Index._bootstrap", *find_shape(typed, bm25_projection)),
+        (
+            "ProductVectorIndex types",
+            lambda c: c.distinct("product.product_type", EMBEDDED),
+            explain_command(
+                lambda name: {"distinct": name, "key": "product.product_type", "query": EMBEDDED}
+            ),
+        ),
+        ("ProductVectorIndex stream", *find_shape(typed, vector_projection)),
+        ("retrieve_candidates", *find_shape(priced, None, limit=300)),
+        (
+            "has_enough_products",
+            lambda c: c.count_documents(typed),
+            explain_command(lambda name: {"count": name, "query": typed}),
+        ),
+    ]
+
+
+def _plan_stages(plan):
+    """
+    Flatten a winning plan into 'STAGE(index)' labels, root first.
+    """
+    stages = []
+
+    while plan:
+        label = plan.get("stage", "?")
+        if plan.get("indexName"):
+            label += f"({plan['indexName']})"
+        stages.append(label)
+
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+
+    return " <- ".join(stages)
+
+
+def _summarize(explain):
+    planner = explain.get("queryPlanner", {})
+    winning = planner.get("winningPlan", {})
+    # newer servers wrap the classic plan in queryPlan
+    winning = winning.get("queryPlan", winning)
+    stats = explain.get("executionStats", {})
+
+    return (
+        _plan_stages(winning),
+        stats.get("totalKeysExamined", "-"),
+        stats.get("totalDocsExamined", "-"),
+        stats.get("nReturned", "-"),
+    )
+
+
+def _latency_ms(run, collection, repeats):
+    run(collection)  # warm the cache
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run(collection)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def report(collection, shapes, label, repeats):
+    print(f"\n== {label}")
+
+    for name, run, explain in shapes:
+        plan, keys, docs, returned = _summarize(explain(collection))
+        p50, p95 = _latency_ms(run, collection, repeats)
+
+        print(f"{name}")
+        print(f"  plan: {plan}")
+        print(
+            f"  keys examined={keys} docs examined={docs} returned={returned} "
+            f"p50={p50:.2f} ms p95={p95:.2f} ms"
+        )
+
+
+def run(uri, db_name, size, dim, unembedded_share, repeats, keep):
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    database = client[db_name]
+    collection = database["products_raw"]
+
+    try:
+        database.drop_collection(collection.name)
+
+        start = time.perf_counter()
+        seed(collection, size, dim, unembedded_share)
+        print(
+            f"Seeded {size} products ({unembedded_share:.0%} without embeddings) "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+        shapes = query_shapes(TYPES[0])
+
+        report(collection, shapes, "only the unique product.link index", repeats)
+
+        ensure_product_indexes(collection)
+        report(collection, shapes, "with partial (product_type, price) indexes", repeats)
+    finally:
+        if not keep:
+            client.drop_database(db_name)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="retrieval_bench")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument(
+        "--unembedded-share",
+        type=float,
+        default=0.1,
+        help="fraction of products stored without an embedding",
+    )
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="do not drop the database")
+    args = parser.parse_args()
+
+    run(args.uri, args.db, args.size, args.dim, args.unembedded_share, args.repeats, args.keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Near-duplicate cluster quality and diversity pass time on scraped products.
+
+Reads product titles/specs from MongoDB (the Amazon, Noon and Jumia
+records written by scrapers.run_scraper), from a JSON-lines file of
+scraper records, or generates synthetic colour/storage variants:
+
+    python -m benchmarks.near_duplicate_clusters
+    python -m benchmarks.near_duplicate_clusters --sources amazon noon --limit 20000
+    python -m benchmarks.near_duplicate_clusters --jsonl records.jsonl --thresholds 0.6 0.7 0.8
+    python -m benchmarks.near_duplicate_clusters --synthetic 5000
+
+For each threshold it prints cluster counts, how many clusters span
+several stores, and sample multi-product clusters to eyeball; then it
+times the old quadratic title-signature diversity against the
+single-pass cluster diversity for growing candidate lists.
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from agents.recommendation.near_duplicates import (
+    ClusterIndex,
+    minhash_signature,
+    product_shingles,
+)
+
+SOURCES = ["amazon", "noon", "jumia"]
+
+
+def load_mongo(sources, limit):
+    from Data_Base.db import get_collection
+
+    cursor = get_collection().find(
+        {"metadata.source": {"$in": sources}},
+        {"_id": 0, "metadata.source": 1, "product.link": 1, "product.title": 1, "product.details_text": 1},
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+
+    return [dict(doc["product"], source=doc["metadata"]["source"]) for doc in cursor]
+
+
+def load_jsonl(path, sources, limit):
+    products = []
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            source = (record.get("metadata") or {}).get("source")
+            if source in sources:
+                products.append(dict(record["product"], source=source))
+            if limit and len(products) >= limit:
+                break
+
+    return products
+
+
+def make_synthetic(size, seed=0):
+    rng = random.Random(seed)
+    brands = ["Lenovo IdeaPad", "HP Victus", "Apple iPhone", "Samsung Galaxy", "Xiaomi Redmi"]
+    colours = ["Black", "Silver", "Blue", "Midnight", "Gold"]
+    storage = ["128GB", "256GB", "512 GB", "1TB"]
+
+    products = []
+    for i in range(size):
+        model = rng.randrange(size // 4 or 1)
+        title = (
+            f"{brands[model % len(brands)]} {model} {rng.choice(storage)} "
+            f"{rng.choice(colours)}"
+        )
+        products.append(
+            {
+                "link": f"https://example.com/{i}",
+                "title": title,
+                "details_text": f"model x{model}k",
+                "source": rng.choice(SOURCES),
+            }
+        )
+
+    return products
+
+
+def cluster(products, threshold):
+    index = ClusterIndex(threshold)
+
+    started = time.perf_counter()
+    clusters = [
+        index.assign(p["link"], minhash_signature(product_shingles(p))) for p in products
+    ]
+    elapsed = time.perf_counter() - started
+
+    return clusters, elapsed
+
+
+def report_clusters(products, clusters, elapsed, threshold, samples):
+    members = defaultdict(list)
+    for product, cluster_id in zip(products, clusters):
+        members[cluster_id].append(product)
+
+    sizes = np.array([len(m) for m in members.values()])
+    multi = [m for m in members.values() if len(m) > 1]
+    cross_store = [m for m in multi if len({p["source"] for p in m}) > 1]
+
+    print(
+        f"\n== threshold {threshold}: {len(products)} products -> {len(members)} clusters "
+        f"({1000 * elapsed / max(len(products), 1):.3f} ms/product)"
+    )
+    print(
+        f"  multi-product clusters={len(multi)} covering {int(sizes[sizes > 1].sum())} products, "
+        f"largest={int(sizes.max())}, spanning several stores={len(cross_store)}"
+    )
+
+    for group in sorted(multi, key=len, reverse=True)[:samples]:
+        print(f"  [{len(group)}] " + " | ".join(p["title"][:60] for p in group[:4]))
+
+
+def legacy_diversity(products, top_k):
+    """
+    The quadratic title-signature diversity the cluster pass replaced.
+    """
+    diverse, used = [], []
+
+    for p in products:
+        signature = " ".join((p.get("title") or "").lower().split()[:4])
+
+        if not any(signature in sig or sig in signature for sig in used):
+            diverse.append(p)
+            used.append(signature)
+        elif len(diverse) < top_k:
+            diverse.append(p)
+
+        if len(diverse) >= top_k:
+            break
+
+    return diverse
+
+
+def cluster_diversity(products, top_k):
+    diverse, duplicates, seen = [], [], set()
+
+    for p in products:
+        if p["cluster_id"] in seen:
+            duplicates.append(p)
+            continue
+        seen.add(p["cluster_id"])
+        diverse.append(p)
+        if len(diverse) >= top_k:
+            return diverse
+
+    return diverse + duplicates[: top_k - len(diverse)]
+
+
+def report_diversity(products, clusters, sizes, top_k, repeats):
+    tagged = [dict(p, cluster_id=c) for p, c in zip(products, clusters)]
+    rng = random.Random(1)
+
+    print(f"\n{'candidates':>10} | {'legacy us':>9} | {'cluster us':>10} | {'distinct clusters legacy/cluster':>32}")
+    print("-" * 70)
+
+    for size in sizes:
+        pool = rng.sample(tagged, min(size, len(tagged)))
+        # worst case for the old pass: every slot must be examined
+        k = min(top_k, len(pool)) if top_k else len(pool)
+
+        timings = {}
+        picked = {}
+        for name, fn in (("legacy", legacy_diversity), ("cluster", cluster_diversity)):
+            started = time.perf_counter()
+            for _ in range(repeats):
+                picked[name] = fn(pool, k)
+            timings[name] = (time.perf_counter() - started) * 1e6 / repeats
+
+        distinct = {name: len({p["cluster_id"] for p in chosen}) for name, chosen in picked.items()}
+
+        print(
+            f"{len(pool):>10} | {timings['legacy']:>9.1f} | {timings['cluster']:>10.1f} | "
+            f"{distinct['legacy']:>15}/{distinct['cluster']:<16}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sources", nargs="+", default=SOURCES)
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--jsonl", help="scraper records, one JSON object per line")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate N synthetic products")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8])
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[25, 100, 1000])
+    parser.add_argument("--top-k", type=int, default=0, help="0 = select the whole pool")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        products = make_synthetic(args.synthetic)
+    elif args.jsonl:
+        products = load_jsonl(args.jsonl, args.sources, args.limit)
+    else:
+        products = load_mongo(args.sources, args.limit)
+
+    products = [p for p in products if p.get("link") and p.get("title")]
+    print("products per store:", dict(Counter(p["source"] for p in products)))
+
+    clusters = None
+    for threshold in args.thresholds:
+        clusters, elapsed = cluster(products, threshold)
+        report_clusters(products, clusters, elapsed, threshold, args.samples)
+
+    report_diversity(products, clusters, args.pool_sizes, args.top_k, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Recommendation throughput with per-request vs shared engine construction.
+
+Drives RecommendationAgent.recommend from a thread pool, as concurrent
+FastAPI requests would, against the configured MongoDB catalog:
+
+    python -m benchmarks.recommendation_load
+    python -m benchmarks.recommendation_load --requests 200 --concurrency 8
+    python -m benchmarks.recommendation_load --rerank   # include the Groq call
+
+"per-request" builds a new RecommendationEngine (retriever, reranker and
+Groq clients) for every request, which is what constructing
+RecommendationAgent/RecommendationChatHandler used to do; "shared" reuses
+one engine. Both read the same published index snapshot. The LLM rerank
+is skipped by default so the numbers measure our own work rather than
+Groq latency.
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from agents.recommendation.agent import RecommendationAgent
+from agents.recommendation.engine import RecommendationEngine
+
+PROFILES = [
+    {
+        "category": "laptop",
+        "use_case": "gaming",
+        "budget_max": 60000,
+        "must_have_features": ["ssd"],
+        "priorities": {"performance": "high"},
+    },
+    {
+        "category": "laptop",
+        "use_case": "office work",
+        "budget_min": 15000,
+        "budget_max": 30000,
+    },
+    {
+        "category": "phone",
+        "use_case": "photography",
+        "budget_max": 25000,
+        "priorities": {"camera": "high"},
+    },
+    {
+        "category": "headphones",
+        "use_case": "travel",
+        "must_have_features": ["noise cancelling"],
+    },
+]
+
+
+def _without_rerank(engine):
+    engine.reranker.rerank = lambda query, products, top_k=4: products[:top_k]
+    return engine
+
+
+def make_engine(rerank):
+    engine = RecommendationEngine()
+    return engine if rerank else _without_rerank(engine)
+
+
+def run_mode(mode, requests, concurrency, rerank, seed=0):
+    rng = random.Random(seed)
+    profiles = [rng.choice(PROFILES) for _ in range(requests)]
+    shared = make_engine(rerank) if mode == "shared" else None
+
+    def handle(i):
+        started = time.perf_counter()
+        engine = shared or make_engine(rerank)
+        RecommendationAgent(f"bench-{i}", engine).recommend(dict(profiles[i]))
+        return time.perf_counter() - started
+
+    # one warm-up request so both modes start from a loaded model/snapshot
+    handle(0)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(handle, range(requests))))
+    elapsed = time.perf_counter() - started
+
+    return requests / elapsed, latencies * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rerank", action="store_true", help="include the LLM rerank call")
+    parser.add_argument("--modes", nargs="+", default=["per-request", "shared"])
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+
+    header = f"{'mode':>12} | {'req/s':>7} | {'p50 ms':>8} | {'p95 ms':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for mode in args.modes:
+        rps, latencies = run_mode(mode, args.requests, args.concurrency, args.rerank)
+        print(
+            f"{mode:>12} | {rps:>7.2f} | {np.percentile(latencies, 50):>8.1f} | "
+            f"{np.percentile(latencies, 95):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Vectorized ProductScorer.rank_products vs the original per-product loop.
+
+Synthetic candidates (normalized 384-d embeddings, prices around a budget),
+so it runs without MongoDB:
+
+    python -m benchmarks.scorer_ranking
+    python -m benchmarks.scorer_ranking --sizes 25 1000 50000 --repeats 20
+
+Also reports the largest score difference and whether the top-k order
+matches the loop implementation.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from agents.recommendation.scorer import ProductScorer
+
+BUDGET = 1000.0
+PRIORITIES = {"performance": 0.8, "price": 0.3}
+
+
+def make_candidates(size, dim=384, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    prices = rng.uniform(0.3, 1.6, size=size) * BUDGET
+
+    return [
+        {
+            "product": {
+                "title": f"Product {i}",
+                "price": None if i % 50 == 0 else float(prices[i]),
+                "link": f"https://example.com/{i}",
+                "category": "laptop",
+                "embedding": vectors[i],
+            }
+        }
+        for i in range(size)
+    ]
+
+
+def legacy_rank_products(products, user_embedding, user_price_max, priorities, top_k):
+    """
+    The per-product loop the vectorized scorer replaced.
+    """
+    scored = []
+
+    for item in products:
+        product = item["product"]
+        semantic = float(np.dot(user_embedding, np.array(product["embedding"])))
+        price = product.get("price")
+
+        if price is None:
+            price_score = 0.0
+        else:
+            ratio = price / user_price_max
+            price_score = 0.5 + 0.5 * ratio if ratio <= 1 else max(0.0, 1 - (ratio - 1))
+
+        tolerance = 0.15
+        if priorities.get("performance", 0) > 0.7:
+            tolerance += 0.15
+        if priorities.get("price", 0) > 0.7:
+            tolerance -= 0.05
+        max_allowed = user_price_max * (1 + tolerance)
+
+        if not price or price <= user_price_max:
+            penalty = 0.0
+        elif price <= max_allowed:
+            penalty = -0.2 * ((price - user_price_max) / (max_allowed - user_price_max))
+        else:
+            penalty = -0.8
+
+        semantic_w, price_w = 0.6, 0.4
+        if priorities.get("performance", 0) > 0.7:
+            semantic_w, price_w = 0.75, 0.25
+        elif priorities.get("price", 0) > 0.7:
+            semantic_w, price_w = 0.4, 0.6
+
+        scored.append(
+            {
+                "link": product["link"],
+                "final_score": semantic * semantic_w + price_score * price_w + penalty,
+            }
+        )
+
+    scored.sort(key=lambda x: x["final_score"], reverse=True)
+
+    return scored[:top_k]
+
+
+def _timed(fn, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), result
+
+
+def run(sizes, top_k, repeats):
+    scorer = ProductScorer("bench")
+    user_embedding = make_candidates(1, seed=7)[0]["product"]["embedding"]
+
+    header = (
+        f"{'candidates':>10} | {'loop p50 ms':>11} | {'vector p50 ms':>13} | "
+        f"{'speedup':>7} | {'max |diff|':>10} | {'same top-k':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for size in sizes:
+        candidates = make_candidates(size)
+
+        loop_lat, loop_top = _timed(
+            lambda: legacy_rank_products(candidates, user_embedding, BUDGET, PRIORITIES, top_k),
+            repeats,
+        )
+        vec_lat, vec_top = _timed(
+            lambda: scorer.rank_products(
+                candidates,
+                user_embedding,
+                user_price_max=BUDGET,
+                priorities=PRIORITIES,
+                top_k=top_k,
+            ),
+            repeats,
+        )
+
+        diff = max(
+            abs(a["final_score"] - b["final_score"]) for a, b in zip(loop_top, vec_top)
+        )
+        same = [a["link"] for a in loop_top] == [b["link"] for b in vec_top]
+
+        loop_p50 = np.percentile(loop_lat, 50)
+        vec_p50 = np.percentile(vec_lat, 50)
+
+        print(
+            f"{size:>10} | {loop_p50:>11.2f} | {vec_p50:>13.2f} | "
+            f"{loop_p50 / vec_p50:>6.1f}x | {diff:>10.1e} | {str(same):>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 500, 5_000, 50_000])
+    parser.add_argument("--top-k", type=int, default=25)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    run(args.sizes, args.top_k, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Per-worker memory for a private vs a shared (memory-mapped) catalog snapshot.
+
+Publishes a synthetic snapshot (normalized 384-d embeddings) to a temporary
+GenerationStore, then starts N spawned processes, like uvicorn workers,
+that either load the arrays into private memory or attach through
+catalog_snapshot.load_snapshot. Each worker touches every embedding and
+reports its Rss/Pss growth from /proc/self/smaps_rollup (Linux only):
+
+    python -m benchmarks.snapshot_memory
+    python -m benchmarks.snapshot_memory --size 500000 --workers 8
+
+Pss splits shared pages between the processes mapping them, so the
+shared mode's total Pss stays near one copy of the matrix.
+"""
+
+import argparse
+import multiprocessing as mp
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from agents.recommendation.catalog_snapshot import (
+    CatalogSnapshot,
+    load_snapshot,
+    write_snapshot,
+)
+from agents.recommendation.disk_store import GenerationStore
+
+
+def make_snapshot(size, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(size, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    links = [f"https://example.com/{i}" for i in range(size)]
+
+    return CatalogSnapshot(
+        version=1,
+        links=links,
+        titles=[f"Product {i}" for i in range(size)],
+        categories=["electronics"] * size,
+        details=[None] * size,
+        type_names=["laptop"],
+        type_ids=np.zeros(size, dtype=np.int32),
+        prices=rng.uniform(20, 3000, size=size),
+        seller_scores=np.full(size, np.nan),
+        embeddings=embeddings,
+        type_ranges={"laptop": (0, size)},
+        row_by_link={link: row for row, link in enumerate(links)},
+    )
+
+
+def _memory_kb():
+    stats = {}
+    with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                stats[key] = int(value.split()[0])
+    return stats
+
+
+def _worker(path, mode, barrier, results):
+    before = _memory_kb()
+
+    if mode == "shared":
+        embeddings = load_snapshot(Path(path)).embeddings
+    else:
+        embeddings = np.load(Path(path) / "embeddings.npy")
+
+    # touch every page, as a full scoring pass would
+    float(embeddings.sum())
+
+    # measure while every worker holds the matrix
+    barrier.wait()
+    after = _memory_kb()
+    barrier.wait()
+
+    results.put({key: after[key] - before[key] for key in ("Rss", "Pss")})
+
+
+def run_mode(path, mode, workers):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+
+    procs = [
+        ctx.Process(target=_worker, args=(str(path), mode, barrier, results))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+
+    deltas = [results.get() for _ in procs]
+
+    for proc in procs:
+        proc.join()
+
+    return deltas
+
+
+def run(size, dim, workers):
+    snapshot = make_snapshot(size, dim)
+    matrix_mb = snapshot.embeddings.nbytes / (1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GenerationStore(Path(tmp))
+        path = store.publish(lambda target: write_snapshot(target, snapshot))
+        del snapshot
+
+        print(f"{size} x {dim} float32 embeddings = {matrix_mb:.1f} MB, {workers} workers")
+
+        header = f"{'mode':>8} | {'Rss/worker MB':>13} | {'Pss/worker MB':>13} | {'total Pss MB':>12}"
+        print(header)
+        print("-" * len(header))
+
+        for mode in ("private", "shared"):
+            deltas = run_mode(path, mode, workers)
+            rss = np.mean([d["Rss"] for d in deltas]) / 1024
+            pss = [d["Pss"] / 1024 for d in deltas]
+
+            print(f"{mode:>8} | {rss:>13.1f} | {np.mean(pss):>13.1f} | {sum(pss):>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    run(args.size, args.dim, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Time to first byte of the blocking vs server-sent-events agent endpoints.
+
+Both routes run the same simulated review pipeline: a search stage of
+--stage-latency seconds, then a Groq completion of --tokens tokens
+generated at --token-latency seconds each (the AsyncGroq client is
+served by a transport that produces Groq's streaming format). The
+blocking route returns the JSON envelope at the end; the streamed route
+is backend.app.services.stream_service, as mounted on /review/start/stream.
+Times are taken where the ASGI app hands each body chunk to the server:
+
+    python -m benchmarks.stream_ttfb
+    python -m benchmarks.stream_ttfb --tokens 400 --stage-latency 3
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from agents.shared.llm_clients import LLMClientRegistry
+from agents.shared.progress import astream_chat_completion, no_progress
+from backend.app.services.stream_service import event_stream_response
+
+MODEL = "llama-3.3-70b-versatile"
+MESSAGES = [{"role": "user", "content": "summarize the reviews"}]
+
+
+def _completion(text):
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": 0,
+        "model": MODEL,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+        ],
+    }
+
+
+def _chunk(text):
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": MODEL,
+        "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+    }
+
+
+class TokenStream(httpx.AsyncByteStream):
+    def __init__(self, tokens, latency):
+        self.tokens = tokens
+        self.latency = latency
+
+    async def __aiter__(self):
+        for index in range(self.tokens):
+            await asyncio.sleep(self.latency)
+            yield f"data: {json.dumps(_chunk(f'w{index} '))}\n\n".encode()
+
+        yield b"data: [DONE]\n\n"
+
+
+class SlowGroq(httpx.AsyncBaseTransport):
+    def __init__(self, tokens, latency):
+        self.tokens = tokens
+        self.latency = latency
+
+    async def handle_async_request(self, request):
+        if json.loads(request.content).get("stream"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                stream=TokenStream(self.tokens, self.latency),
+            )
+
+        await asyncio.sleep(self.tokens * self.latency)
+        text = "".join(f"w{index} " for index in range(self.tokens))
+
+        return httpx.Response(200, json=_completion(text))
+
+
+def build_app(args):
+    registry = LLMClientRegistry(async_transport=SlowGroq(args.tokens, args.token_latency))
+    client = registry.async_groq("bench.stream", api_key="bench")
+
+    async def pipeline(progress):
+        progress("stage", {"stage": "searching"})
+        await asyncio.sleep(args.stage_latency)
+        progress("partial", {"sources": [{"url": "https://youtube.com/watch?v=bench"}]})
+        progress("stage", {"stage": "analyzing"})
+
+        summary = await astream_chat_completion(client, progress, model=MODEL, messages=MESSAGES)
+
+        return {"status": "success", "type": "review", "data": {"summary": summary}}
+
+    app = FastAPI()
+
+    @app.post("/blocking")
+    async def blocking():
+        return await pipeline(no_progress)
+
+    @app.post("/stream")
+    async def stream():
+        return event_stream_response("bench.review", pipeline)
+
+    return app
+
+
+async def measure(app, path):
+    """
+    Drive the ASGI app directly and timestamp every body message it
+    sends (httpx.ASGITransport buffers the whole response).
+    """
+    timing = {"first_byte": None, "first_token": None}
+    requested = False
+    started = time.perf_counter()
+
+    async def receive():
+        nonlocal requested
+
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] != "http.response.body" or not message.get("body"):
+            return
+
+        elapsed = time.perf_counter() - started
+
+        if timing["first_byte"] is None:
+            timing["first_byte"] = elapsed
+        if b"event: token" in message["body"] and timing["first_token"] is None:
+            timing["first_token"] = elapsed
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    await app(scope, receive, send)
+    timing["total"] = time.perf_counter() - started
+
+    return timing
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--token-latency", type=float, default=0.01, help="seconds per token")
+    parser.add_argument("--stage-latency", type=float, default=1.5, help="search stage seconds")
+    args = parser.parse_args()
+
+    app = build_app(args)
+
+    print(
+        f"{args.stage_latency}s search stage + {args.tokens} tokens at "
+        f"{args.token_latency * 1000:.0f} ms/token"
+    )
+
+    for name, path in [("blocking JSON", "/blocking"), ("SSE stream", "/stream")]:
+        timing = asyncio.run(measure(app, path))
+        first_token = timing["first_token"] or timing["total"]
+
+        print(
+            f"  {name:<14} first byte {timing['first_byte']:6.3f}s  "
+            f"first answer text {first_token:6.3f}s  complete {timing['total']:6.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
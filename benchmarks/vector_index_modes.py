@@ -0,0 +1,126 @@
+"""
+Recall@k vs latency for the FAISS index modes (flat, ivfpq, hnsw).
+
+Uses synthetic clustered, L2-normalized 384-d vectors (the shape of
+all-MiniLM-L6-v2 embeddings), so it runs without MongoDB:
+
+    python -m benchmarks.vector_index_modes
+    python -m benchmarks.vector_index_modes --size 500000 --nprobe 8 16 32 64
+
+Exact Flat search is the ground truth for recall.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+from agents.recommendation.vector_index import _mmap_flag, create_index
+
+
+def make_vectors(num_vectors, dim, noise=0.35, num_clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(num_clusters, dim)).astype("float32")
+    labels = rng.integers(0, num_clusters, size=num_vectors)
+    vectors = centers[labels] + noise * rng.normal(size=(num_vectors, dim)).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _search(index, queries, top_k):
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(ids[0])
+    return np.array(latencies), np.array(found)
+
+
+def _recall(found, truth):
+    hits = [len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]
+    return float(np.mean(hits))
+
+
+def _disk_mb(index, mode):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.faiss")
+        faiss.write_index(index, path)
+        size = os.path.getsize(path) / (1024 * 1024)
+
+        # make sure the persisted file loads back memory-mapped
+        faiss.read_index(path, _mmap_flag(mode))
+
+    return size
+
+
+def run(size, dim, noise, num_queries, top_k, nprobes, ef_searches):
+    vectors = make_vectors(size, dim, noise)
+    queries = make_vectors(num_queries, dim, noise, seed=1)
+
+    header = (
+        f"{'mode':<8} | {'param':<13} | {'build s':>8} | {'disk MB':>8} | "
+        f"{'p50 ms':>7} | {'p95 ms':>7} | {f'recall@{top_k}':>9}"
+    )
+    print(f"{size} vectors, dim={dim}, {num_queries} queries")
+    print(header)
+    print("-" * len(header))
+
+    truth = None
+
+    for mode in ("flat", "ivfpq", "hnsw"):
+        start = time.perf_counter()
+        index, effective, train_size = create_index(mode, dim, size)
+        if train_size:
+            index.train(vectors[:train_size])
+        index.add(vectors)
+        build_s = time.perf_counter() - start
+
+        disk_mb = _disk_mb(index, effective)
+
+        if effective == "ivfpq":
+            settings = [("nprobe", n) for n in nprobes]
+        elif effective == "hnsw":
+            settings = [("efSearch", ef) for ef in ef_searches]
+        else:
+            settings = [(None, None)]
+
+        for name, value in settings:
+            if name:
+                faiss.ParameterSpace().set_index_parameter(index, name, value)
+
+            latencies, found = _search(index, queries, top_k)
+
+            if truth is None:
+                truth = found
+
+            label = f"{name}={value}" if name else "exact"
+            print(
+                f"{effective:<8} | {label:<13} | {build_s:>8.2f} | {disk_mb:>8.1f} | "
+                f"{np.percentile(latencies, 50):>7.3f} | "
+                f"{np.percentile(latencies, 95):>7.3f} | {_recall(found, truth):>9.3f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument(
+        "--noise", type=float, default=0.35, help="spread of vectors around cluster centers"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 128])
+    args = parser.parse_args()
+
+    run(args.size, args.dim, args.noise, args.queries, args.top_k, args.nprobe, args.ef_search)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from Data_base.db import get_profile_collection
 from agents.profile.agent import run_profile_agent
@@ -14,7 +15,7 @@ from agents.recommendation.profile_adapter import adapt_profile
 logger = logging.getLogger(__name__)
 
 
-def chat_with_profile_agent():
+def chat_with_profile_agent(runner: asyncio.Runner):
     user_id = input("Enter user id: ")
     history = []
     mode = "discovery"
@@ -50,8 +51,8 @@ def chat_with_profile_agent():
             output, raw = run_profile_agent(user_input, history, current_profile)
 
         elif mode == "recommendation":
-            result = rec_handler.handle(
-                user_input, current_profile_data or {}, last_recommendations
+            result = runner.run(
+                rec_handler.handle(user_input, current_profile_data or {}, last_recommendations)
             )
 
             if result["type"] == "recommendation_update":
@@ -198,4 +199,6 @@ def chat_with_profile_agent():
 
 
 if __name__ == "__main__":
-    chat_with_profile_agent()
+    # one event loop per session, so async clients keep their connections
+    with asyncio.Runner() as runner:
+        chat_with_profile_agent(runner)
@@ -7,7 +7,10 @@ import os
 import re
 from typing import Any
 
-import requests
+import httpx
+
+from agents.shared.llm_cache import get_llm_cache
+from agents.shared.llm_clients import get_async_http_client, get_http_client
 
 
 DEFAULT_GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
@@ -31,11 +34,18 @@ class GroqProductExtractor:
         model: str = DEFAULT_GROQ_MODEL,
         api_url: str = DEFAULT_GROQ_API_URL,
         timeout: int = 45,
+        http_client: httpx.Client | None = None,
+        async_http_client: httpx.AsyncClient | None = None,
     ) -> None:
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         self.model = model
         self.api_url = api_url
         self.timeout = timeout
+        # keep-alive connections shared with every other LLM caller
+        self.http_client = http_client or get_http_client("search_pipeline.extractor")
+        self.async_http_client = async_http_client or get_async_http_client(
+            "search_pipeline.extractor"
+        )
 
     def extract(
         self,
@@ -47,11 +57,45 @@ class GroqProductExtractor:
         if not search_results:
             return []
 
+        payload = self._build_payload(query, search_results, max_products)
+
+        content = get_llm_cache().get_or_call(
+            "search_pipeline.extractor",
+            payload,
+            lambda: self._complete(payload),
+            # answers without usable products are retried next time, not cached
+            validate=self._normalized_products,
+        )
+
+        return self._products_from_content(content, max_products)
+
+    async def aextract(
+        self,
+        query: str,
+        search_results: list[dict],
+        max_products: int = 10,
+    ) -> list[dict]:
+        """Async version of extract() for the API's event loop."""
+        if not search_results:
+            return []
+
+        payload = self._build_payload(query, search_results, max_products)
+
+        content = await get_llm_cache().aget_or_call(
+            "search_pipeline.extractor",
+            payload,
+            lambda: self._acomplete(payload),
+            validate=self._normalized_products,
+        )
+
+        return self._products_from_content(content, max_products)
+
+    def _build_payload(self, query: str, search_results: list[dict], max_products: int) -> dict:
         if not self.api_key:
             raise ExtractionError("GROQ_API_KEY is required for product extraction.")
 
         prompt = self._build_prompt(query=query, search_results=search_results, max_products=max_products)
-        payload = {
+        return {
             "model": self.model,
             "temperature": 0,
             "messages": [
@@ -69,44 +113,69 @@ class GroqProductExtractor:
             ],
         }
 
-        headers = {
+    def _normalized_products(self, content: str) -> list[dict]:
+        parsed_payload = self._parse_json_payload(content)
+        products = self._coerce_product_list(parsed_payload)
+        normalized = [self._normalize_product(item) for item in products if isinstance(item, dict)]
+        return [item for item in normalized if item]
+
+    def _products_from_content(self, content: str, max_products: int) -> list[dict]:
+        normalized = self._normalized_products(content)
+
+        if not normalized:
+            raise ExtractionError("Groq returned no usable products.")
+
+        _log(f"Extracted {len(normalized)} product candidates from Groq.")
+        return normalized[:max_products]
+
+    def _headers(self) -> dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
+    def _complete(self, payload: dict[str, Any]) -> str:
         try:
-            response = requests.post(
+            response = self.http_client.post(
                 self.api_url,
-                headers=headers,
+                headers=self._headers(),
                 json=payload,
                 timeout=self.timeout,
             )
+        except httpx.HTTPError as exc:
+            raise ExtractionError(f"Groq request failed: {exc}") from exc
+
+        return self._response_content(response)
+
+    async def _acomplete(self, payload: dict[str, Any]) -> str:
+        try:
+            response = await self.async_http_client.post(
+                self.api_url,
+                headers=self._headers(),
+                json=payload,
+                timeout=self.timeout,
+            )
+        except httpx.HTTPError as exc:
+            raise ExtractionError(f"Groq request failed: {exc}") from exc
+
+        return self._response_content(response)
+
+    def _response_content(self, response: httpx.Response) -> str:
+        try:
             response.raise_for_status()
-        except requests.HTTPError as exc:
-            body = exc.response.text[:300] if exc.response is not None else ""
-            status_code = exc.response.status_code if exc.response is not None else "unknown"
+        except httpx.HTTPStatusError as exc:
+            body = exc.response.text[:300]
+            status_code = exc.response.status_code
             raise ExtractionError(
                 f"Groq request failed with status {status_code}: {body}",
             ) from exc
-        except requests.RequestException as exc:
-            raise ExtractionError(f"Groq request failed: {exc}") from exc
 
         try:
             response_data = response.json()
         except ValueError as exc:
             raise ExtractionError("Groq returned invalid JSON.") from exc
 
-        content = self._extract_message_content(response_data)
-        parsed_payload = self._parse_json_payload(content)
-        products = self._coerce_product_list(parsed_payload)
-        normalized = [self._normalize_product(item) for item in products if isinstance(item, dict)]
-        normalized = [item for item in normalized if item]
-
-        if not normalized:
-            raise ExtractionError("Groq returned no usable products.")
-
-        _log(f"Extracted {len(normalized)} product candidates from Groq.")
-        return normalized[:max_products]
+        return self._extract_message_content(response_data)
 
     def _build_prompt(self, query: str, search_results: list[dict], max_products: int) -> str:
         compact_results = json.dumps(search_results[:max_products], ensure_ascii=False, indent=2)
@@ -8,6 +8,13 @@ import os
 import sys
 from pathlib import Path
 
+# direct script execution: the pipeline imports the repo's shared helpers
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+from agents.shared.concurrency import run_blocking
+
 try:
     from search_pipeline.cleaner import clean_products
     from search_pipeline.extractor import ExtractionError, GroqProductExtractor
@@ -69,6 +76,53 @@ class SearchPipeline:
         except ExtractionError as exc:
             _log(f"Extractor failed. Using direct search fallback. Reason: {exc}")
 
+        return self._clean_and_rank(cleaned_query, extracted_products, search_results, top_k)
+
+    async def arun(
+        self,
+        query: str,
+        search_limit: int = 10,
+        top_k: int = 5,
+        gl: str | None = None,
+        hl: str | None = None,
+    ) -> list[dict]:
+        """Async version of run(): Serper and Groq calls are awaited."""
+        cleaned_query = (query or "").strip()
+        if not cleaned_query:
+            raise ValueError("query must not be blank.")
+
+        search_results = await self.search_client.asearch(
+            query=cleaned_query,
+            num_results=search_limit,
+            gl=gl,
+            hl=hl,
+        )
+        if not search_results:
+            _log("Search returned no results.")
+            return []
+
+        extracted_products: list[dict] = []
+        try:
+            extracted_products = await self.extractor.aextract(
+                query=cleaned_query,
+                search_results=search_results,
+                max_products=search_limit,
+            )
+        except ExtractionError as exc:
+            _log(f"Extractor failed. Using direct search fallback. Reason: {exc}")
+
+        # link cleanup follows redirects with blocking requests
+        return await run_blocking(
+            self._clean_and_rank, cleaned_query, extracted_products, search_results, top_k
+        )
+
+    def _clean_and_rank(
+        self,
+        query: str,
+        extracted_products: list[dict],
+        search_results: list[dict],
+        top_k: int,
+    ) -> list[dict]:
         if not extracted_products:
             extracted_products = self._build_fallback_products(search_results)
 
@@ -80,7 +134,7 @@ class SearchPipeline:
             _log("No products remained after cleaning.")
             return []
 
-        return self.ranker.rank(query=cleaned_query, products=cleaned_products, top_k=top_k)
+        return self.ranker.rank(query=query, products=cleaned_products, top_k=top_k)
 
     @staticmethod
     def _build_fallback_products(search_results: list[dict]) -> list[dict]:
@@ -6,8 +6,11 @@ import os
 from typing import Any
 from urllib.parse import urlparse
 
+import httpx
 import requests
 
+from agents.shared.llm_clients import get_async_http_client
+
 
 DEFAULT_SERPER_BASE_URL = "https://google.serper.dev"
 
@@ -24,6 +27,7 @@ class SerperSearchClient:
         api_key: str | None = None,
         base_url: str = DEFAULT_SERPER_BASE_URL,
         timeout: int = 20,
+        async_http_client: httpx.AsyncClient | None = None,
     ) -> None:
         self.api_key = api_key or os.getenv("SERPER_API_KEY")
         if not self.api_key:
@@ -31,6 +35,10 @@ class SerperSearchClient:
 
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # per-event-loop keep-alive connections from the shared registry
+        self.async_http_client = async_http_client or get_async_http_client(
+            "search_pipeline.serper"
+        )
 
     def search(
         self,
@@ -40,32 +48,68 @@ class SerperSearchClient:
         hl: str | None = None,
     ) -> list[dict]:
         """Search Serper shopping results first, then fall back to organic search."""
+        payload = self._build_payload(query, num_results, gl, hl)
+
+        _log(f"Searching shopping results for query: {payload['q']!r}")
+        shopping_results = self._shopping_results(self._post("/shopping", payload), payload["num"])
+        if shopping_results is not None:
+            return shopping_results
+
+        _log("No usable shopping results. Falling back to organic search.")
+        return self._organic_results(self._post("/search", payload), payload["num"])
+
+    async def asearch(
+        self,
+        query: str,
+        num_results: int = 10,
+        gl: str | None = None,
+        hl: str | None = None,
+    ) -> list[dict]:
+        """Async version of search() for the API's event loop."""
+        payload = self._build_payload(query, num_results, gl, hl)
+
+        _log(f"Searching shopping results for query: {payload['q']!r}")
+        shopping_payload = await self._apost("/shopping", payload)
+        shopping_results = self._shopping_results(shopping_payload, payload["num"])
+        if shopping_results is not None:
+            return shopping_results
+
+        _log("No usable shopping results. Falling back to organic search.")
+        return self._organic_results(await self._apost("/search", payload), payload["num"])
+
+    @staticmethod
+    def _build_payload(
+        query: str,
+        num_results: int,
+        gl: str | None,
+        hl: str | None,
+    ) -> dict[str, Any]:
         cleaned_query = (query or "").strip()
         if not cleaned_query:
             raise ValueError("query must not be blank.")
 
-        requested_results = max(1, int(num_results))
-        payload = {"q": cleaned_query, "num": requested_results}
+        payload = {"q": cleaned_query, "num": max(1, int(num_results))}
         if gl:
             payload["gl"] = gl
         if hl:
             payload["hl"] = hl
+        return payload
 
-        _log(f"Searching shopping results for query: {cleaned_query!r}")
-        shopping_payload = self._post("/shopping", payload)
+    def _shopping_results(self, shopping_payload: dict[str, Any], requested_results: int) -> list[dict] | None:
         shopping_results = self._normalize_shopping_results(
             shopping_payload.get("shopping", []),
         )
-        if shopping_results:
-            limited_results = shopping_results[:requested_results]
-            _log(
-                f"Found {len(shopping_results)} shopping results. "
-                f"Returning top {len(limited_results)}.",
-            )
-            return limited_results
+        if not shopping_results:
+            return None
 
-        _log("No usable shopping results. Falling back to organic search.")
-        organic_payload = self._post("/search", payload)
+        limited_results = shopping_results[:requested_results]
+        _log(
+            f"Found {len(shopping_results)} shopping results. "
+            f"Returning top {len(limited_results)}.",
+        )
+        return limited_results
+
+    def _organic_results(self, organic_payload: dict[str, Any], requested_results: int) -> list[dict]:
         organic_results = self._normalize_organic_results(
             organic_payload.get("organic", []),
         )
@@ -76,17 +120,19 @@ class SerperSearchClient:
         )
         return limited_results
 
-    def _post(self, endpoint: str, payload: dict[str, Any]) -> dict[str, Any]:
-        headers = {
+    def _headers(self) -> dict[str, str]:
+        return {
             "X-API-KEY": self.api_key,
             "Content-Type": "application/json",
         }
+
+    def _post(self, endpoint: str, payload: dict[str, Any]) -> dict[str, Any]:
         url = f"{self.base_url}{endpoint}"
 
         try:
             response = requests.post(
                 url,
-                headers=headers,
+                headers=self._headers(),
                 json=payload,
                 timeout=self.timeout,
             )
@@ -100,6 +146,31 @@ class SerperSearchClient:
         except requests.RequestException as exc:
             raise RuntimeError(f"Serper request failed: {exc}") from exc
 
+        return self._response_data(response)
+
+    async def _apost(self, endpoint: str, payload: dict[str, Any]) -> dict[str, Any]:
+        url = f"{self.base_url}{endpoint}"
+
+        try:
+            response = await self.async_http_client.post(
+                url,
+                headers=self._headers(),
+                json=payload,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            body = exc.response.text[:300]
+            raise RuntimeError(
+                f"Serper request failed with status {exc.response.status_code}: {body}",
+            ) from exc
+        except httpx.HTTPError as exc:
+            raise RuntimeError(f"Serper request failed: {exc}") from exc
+
+        return self._response_data(response)
+
+    @staticmethod
+    def _response_data(response: Any) -> dict[str, Any]:
         try:
             data = response.json()
         except ValueError as exc:
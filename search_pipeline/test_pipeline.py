@@ -8,6 +8,11 @@ import os
 import sys
 from pathlib import Path
 
+# direct script execution: the extractor imports the repo's shared LLM clients
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
 try:
     from search_pipeline.cleaner import clean_products
     import search_pipeline.cleaner as cleaner_module
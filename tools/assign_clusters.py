@@ -0,0 +1,97 @@
+"""
+Assign near-duplicate cluster ids to every stored product.
+
+    python -m tools.assign_clusters
+    python -m tools.assign_clusters --threshold 0.8 --batch-size 500
+
+Ingestion clusters new and updated products; this backfills products
+stored before clustering existed, or re-clusters the whole catalog after
+changing the threshold. Products are processed in link order, so the
+result does not depend on insertion order.
+"""
+
+import argparse
+import logging
+
+from bson.binary import Binary
+from pymongo import UpdateOne
+
+from Data_Base.catalog_repo import bump_catalog_version
+from Data_Base.db import get_collection
+from agents.recommendation.near_duplicates import (
+    SIMILARITY_THRESHOLD,
+    ClusterIndex,
+    band_keys,
+    minhash_signature,
+    pack_signature,
+    product_shingles,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def assign_clusters(threshold=SIMILARITY_THRESHOLD, batch_size=1000):
+    collection = get_collection()
+    index = ClusterIndex(threshold)
+
+    cursor = (
+        collection.find(
+            {}, {"_id": 1, "product.link": 1, "product.title": 1, "product.details_text": 1}
+        )
+        .sort("product.link", 1)
+        .batch_size(batch_size)
+    )
+
+    processed = 0
+    operations = []
+    clusters = set()
+
+    for doc in cursor:
+        product = doc.get("product") or {}
+        link = product.get("link")
+
+        if not link:
+            continue
+
+        signature = minhash_signature(product_shingles(product))
+        cluster_id = index.assign(link, signature)
+        clusters.add(cluster_id)
+
+        update = {"product.cluster_id": cluster_id}
+        if signature is not None:
+            update["product.minhash"] = Binary(pack_signature(signature))
+            update["product.lsh_bands"] = band_keys(signature)
+
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        processed += 1
+
+        if len(operations) >= batch_size:
+            collection.bulk_write(operations, ordered=False)
+            operations = []
+            logger.info(f"[Clusters] {processed} products")
+
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+    # snapshots carry cluster ids, so they must be rebuilt
+    if processed:
+        bump_catalog_version()
+
+    logger.info(f"[Clusters] Done: {processed} products in {len(clusters)} clusters")
+
+    return processed, len(clusters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    assign_clusters(args.threshold, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Rewrite legacy float-array product embeddings as packed Binary.
+
+    python -m tools.migrate_embeddings
+    python -m tools.migrate_embeddings --format int8 --batch-size 500
+
+Only documents whose product.embedding is still a BSON array are touched,
+so the script can be interrupted and re-run safely.
+"""
+
+import argparse
+import logging
+
+from pymongo import UpdateOne
+
+from Data_Base.catalog_repo import bump_catalog_version
+from Data_Base.db import get_collection
+from Data_Base.embedding_codec import STORAGE_FORMAT, STORAGE_FORMATS, encode_embedding
+
+logger = logging.getLogger(__name__)
+
+
+def migrate(storage_format=STORAGE_FORMAT, batch_size=1000):
+    collection = get_collection()
+
+    query = {"product.embedding": {"$type": "array"}}
+    total = collection.count_documents(query)
+
+    logger.info(f"[Migrate] {total} products with float-array embeddings")
+
+    cursor = collection.find(query, {"_id": 1, "product.embedding": 1}).batch_size(
+        batch_size
+    )
+
+    migrated = 0
+    operations = []
+
+    for doc in cursor:
+        packed = encode_embedding(doc["product"]["embedding"], storage_format)
+        operations.append(
+            UpdateOne({"_id": doc["_id"]}, {"$set": {"product.embedding": packed}})
+        )
+
+        if len(operations) >= batch_size:
+            migrated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+            logger.info(f"[Migrate] {migrated}/{total}")
+
+    if operations:
+        migrated += collection.bulk_write(operations, ordered=False).modified_count
+
+    # stored vectors changed, so version-keyed indexes must rebuild
+    if migrated:
+        bump_catalog_version()
+
+    logger.info(f"[Migrate] Done: {migrated} embeddings packed as {storage_format}")
+
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--format", choices=STORAGE_FORMATS, default=STORAGE_FORMAT)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    migrate(args.format, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+import streamlit as st
+
+
+def _render_partial(data: dict) -> None:
+    for product in data.get("products") or []:
+        name = product.get("title") or product.get("product_clean")
+        if name:
+            st.write(f"- {name}")
+
+    for source in data.get("sources") or []:
+        st.caption(source.get("title") or source.get("url") or "")
+
+
+def stream_progress(label: str) -> Callable[[str, Any], None]:
+    """
+    on_event callback for the streaming api_client calls: shows the
+    current stage, the partial product/source list and the LLM answer as
+    it is generated.
+    """
+    status = st.status(label, expanded=True)
+    partial = status.empty()
+    answer = status.empty()
+    tokens: list[str] = []
+
+    def on_event(event: str, data: Any) -> None:
+        if not isinstance(data, dict):
+            return
+
+        if event == "stage":
+            stage = str(data.get("stage") or "").replace("_", " ")
+            status.update(label=f"{label}: {stage}")
+        elif event == "partial":
+            with partial.container():
+                _render_partial(data)
+        elif event == "token":
+            tokens.append(str(data.get("text") or ""))
+            answer.text("".join(tokens))
+
+    return on_event
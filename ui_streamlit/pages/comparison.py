@@ -9,6 +9,7 @@ if str(UI_ROOT) not in sys.path:
 
 from components.chat_box import render_chat_history, render_chat_input
 from components.comparison_table import render_comparison_result
+from components.stream_progress import stream_progress
 from config import APP_TITLE
 from services.api_client import ApiClientError, chat_comparison, start_comparison
 from services.session_state import (
@@ -50,6 +51,7 @@ if start_clicked:
             response = start_comparison(
                 user_id=st.session_state.user_id,
                 message=comparison_query,
+                on_event=stream_progress("Comparing products"),
             )
             if response.get("status") != "success":
                 st.error(response.get("message", "Comparison request failed."))
@@ -92,6 +94,7 @@ if comparison_chat_message:
                 user_id=st.session_state.user_id,
                 session_id=comparison_session_id,
                 message=comparison_chat_message,
+                on_event=stream_progress("Answering"),
             )
             if response.get("status") != "success":
                 st.session_state.comparison_messages.pop()
@@ -11,6 +11,7 @@ from components.chat_box import render_chat_history, render_chat_input
 from components.comparison_table import render_comparison_result
 from components.product_cards import render_product_cards
 from components.review_section import render_review_result
+from components.stream_progress import stream_progress
 from config import APP_TITLE
 from services.api_client import (
     ApiClientError,
@@ -145,6 +146,7 @@ if start_clicked:
             response = start_recommendation(
                 user_id=st.session_state.user_id,
                 message=initial_message,
+                on_event=stream_progress("Finding products"),
             )
             if response.get("status") != "success":
                 st.error(response.get("message", "Recommendation request failed."))
@@ -206,6 +208,7 @@ if products:
                 response = start_comparison(
                     user_id=st.session_state.user_id,
                     message=query,
+                    on_event=stream_progress("Comparing products"),
                 )
                 if response.get("status") != "success":
                     st.error(response.get("message", "Comparison request failed."))
@@ -237,6 +240,7 @@ if products:
                     response = start_review(
                         user_id=st.session_state.user_id,
                         message=review_prompt,
+                        on_event=stream_progress("Collecting reviews"),
                     )
                     if response.get("status") != "success":
                         st.error(response.get("message", "Review request failed."))
@@ -279,6 +283,7 @@ if recommendation_chat_message:
                 user_id=st.session_state.user_id,
                 session_id=recommendation_session_id,
                 message=recommendation_chat_message,
+                on_event=stream_progress("Thinking"),
             )
             if response.get("status") != "success":
                 st.error(response.get("message", "Recommendation chat failed."))
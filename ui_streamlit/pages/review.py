@@ -9,6 +9,7 @@ if str(UI_ROOT) not in sys.path:
 
 from components.chat_box import render_chat_history, render_chat_input
 from components.review_section import render_review_result
+from components.stream_progress import stream_progress
 from config import APP_TITLE
 from services.api_client import ApiClientError, chat_review, start_review
 from services.session_state import (
@@ -50,6 +51,7 @@ if start_clicked:
             response = start_review(
                 user_id=st.session_state.user_id,
                 message=review_query,
+                on_event=stream_progress("Collecting reviews"),
             )
             if response.get("status") != "success":
                 st.error(response.get("message", "Review request failed."))
@@ -92,6 +94,7 @@ if review_chat_message:
                 user_id=st.session_state.user_id,
                 session_id=review_session_id,
                 message=review_chat_message,
+                on_event=stream_progress("Answering"),
             )
             if response.get("status") != "success":
                 st.session_state.review_messages.pop()
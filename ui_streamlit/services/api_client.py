@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+import time
+from typing import Any, Callable, Iterator
 
 import requests
 
@@ -67,6 +68,79 @@ def _request(
     return payload
 
 
+def _iter_sse(response: requests.Response) -> Iterator[tuple[str, Any]]:
+    event, data_lines = "message", []
+
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event = value
+            elif field == "data":
+                data_lines.append(value)
+            continue
+
+        if data_lines:
+            yield event, json.loads("\n".join(data_lines))
+        event, data_lines = "message", []
+
+
+def _stream_request(
+    path: str,
+    json_body: dict[str, Any],
+    on_event: Callable[[str, Any], None] | None = None,
+) -> dict[str, Any]:
+    """
+    POST to a server-sent-events endpoint, passing each stage/partial/token
+    event to `on_event`, and return the final result like _request().
+    The result carries "timing": time to first byte, to the first LLM
+    token and to the result, in milliseconds.
+    """
+    url = f"{BACKEND_BASE_URL}{path}"
+    started = time.perf_counter()
+    timing: dict[str, float | None] = {"ttfb_ms": None, "first_token_ms": None}
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    try:
+        with requests.post(
+            url,
+            json=json_body,
+            stream=True,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            headers={"Accept": "text/event-stream"},
+        ) as response:
+            if not response.ok:
+                raise ApiClientError(_extract_error_message(response))
+
+            for event, data in _iter_sse(response):
+                if timing["ttfb_ms"] is None:
+                    timing["ttfb_ms"] = elapsed_ms()
+
+                if event == "token" and timing["first_token_ms"] is None:
+                    timing["first_token_ms"] = elapsed_ms()
+
+                if event == "result":
+                    if not isinstance(data, dict):
+                        raise ApiClientError("Backend returned an unexpected response shape.")
+                    return {**data, "timing": {**timing, "total_ms": elapsed_ms()}}
+
+                if event == "error":
+                    message = data.get("message") if isinstance(data, dict) else None
+                    raise ApiClientError(message or "Request failed.")
+
+                if on_event is not None:
+                    on_event(event, data)
+    except requests.RequestException as exc:
+        raise ApiClientError(f"Could not connect to backend: {exc}") from exc
+    except ValueError as exc:
+        raise ApiClientError("Backend returned invalid JSON.") from exc
+
+    raise ApiClientError("Backend closed the stream before sending a result.")
+
+
 def create_guest_user() -> dict[str, Any]:
     return _request("POST", "/users/guest")
 
@@ -95,51 +169,78 @@ def get_current_user(user_id: str) -> dict[str, Any]:
     return _request("GET", "/auth/me", params={"user_id": user_id})
 
 
-def start_recommendation(user_id: str, message: str) -> dict[str, Any]:
-    return _request(
-        "POST",
-        "/recommendation/start",
-        json_body={"user_id": user_id, "message": message},
+def start_recommendation(
+    user_id: str,
+    message: str,
+    on_event: Callable[[str, Any], None] | None = None,
+) -> dict[str, Any]:
+    return _stream_request(
+        "/recommendation/start/stream",
+        {"user_id": user_id, "message": message},
+        on_event,
     )
 
 
-def chat_recommendation(user_id: str, session_id: str, message: str) -> dict[str, Any]:
-    return _request(
-        "POST",
-        "/recommendation/chat",
-        json_body={"user_id": user_id, "session_id": session_id, "message": message},
+def chat_recommendation(
+    user_id: str,
+    session_id: str,
+    message: str,
+    on_event: Callable[[str, Any], None] | None = None,
+) -> dict[str, Any]:
+    return _stream_request(
+        "/recommendation/chat/stream",
+        {"user_id": user_id, "session_id": session_id, "message": message},
+        on_event,
     )
 
 
-def start_comparison(user_id: str, message: str) -> dict[str, Any]:
-    return _request(
-        "POST",
-        "/comparison/start",
-        json_body={"user_id": user_id, "message": message},
+def start_comparison(
+    user_id: str,
+    message: str,
+    on_event: Callable[[str, Any], None] | None = None,
+) -> dict[str, Any]:
+    return _stream_request(
+        "/comparison/start/stream",
+        {"user_id": user_id, "message": message},
+        on_event,
     )
 
 
-def chat_comparison(user_id: str, session_id: str, message: str) -> dict[str, Any]:
-    return _request(
-        "POST",
-        "/comparison/chat",
-        json_body={"user_id": user_id, "session_id": session_id, "message": message},
+def chat_comparison(
+    user_id: str,
+    session_id: str,
+    message: str,
+    on_event: Callable[[str, Any], None] | None = None,
+) -> dict[str, Any]:
+    return _stream_request(
+        "/comparison/chat/stream",
+        {"user_id": user_id, "session_id": session_id, "message": message},
+        on_event,
     )
 
 
-def start_review(user_id: str, message: str) -> dict[str, Any]:
-    return _request(
-        "POST",
-        "/review/start",
-        json_body={"user_id": user_id, "message": message},
+def start_review(
+    user_id: str,
+    message: str,
+    on_event: Callable[[str, Any], None] | None = None,
+) -> dict[str, Any]:
+    return _stream_request(
+        "/review/start/stream",
+        {"user_id": user_id, "message": message},
+        on_event,
     )
 
 
-def chat_review(user_id: str, session_id: str, message: str) -> dict[str, Any]:
-    return _request(
-        "POST",
-        "/review/chat",
-        json_body={"user_id": user_id, "session_id": session_id, "message": message},
+def chat_review(
+    user_id: str,
+    session_id: str,
+    message: str,
+    on_event: Callable[[str, Any], None] | None = None,
+) -> dict[str, Any]:
+    return _stream_request(
+        "/review/chat/stream",
+        {"user_id": user_id, "session_id": session_id, "message": message},
+        on_event,
     )
 
 